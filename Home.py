@@ -12,16 +12,17 @@ Features include:
 '''
 
 import streamlit as st
-import json
-import os
+import html
 import hashlib
 import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from PIL import Image
 import random
-import time
+from utils.storage import get_storage
+from utils.rollups import get_ledger_rollups
+from utils.columnar import get_ledger_columns
+from utils.charts import render_chart
+from utils.lazy import get_numpy, get_pyplot
+from utils.styles import inject_styles
+from utils.money import to_paise, to_rupees, format_money
 # Set page configuration
 st.set_page_config(
     page_title="Horizonite Bank",
@@ -30,366 +31,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for elegant UI
-st.markdown("""
-<style>
-    body {
-        background-color: #1a1c23;
-        color: #e4e6eb;
-    }
-    .main .block-container {
-        background-color: #1a1c23;
-        padding: 1rem;
-    }
-    .main-header {
-        font-size: 2.5rem;
-        color: #3dbfff;
-        font-weight: 700;
-        margin-bottom: 1rem;
-    }
-    .sub-header {
-        font-size: 1.5rem;
-        color: #3dbfff;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    }
-    .card {
-        padding: 1.5rem;
-        border-radius: 0.5rem;
-        background-color: #2d303e;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.2), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-        margin-bottom: 1rem;
-        transition: transform 0.2s ease;
-    }
-    .card:hover {
-        transform: translateY(-3px);
-    }
-    .success-msg {
-        padding: 0.75rem;
-        border-radius: 0.25rem;
-        background-color: rgba(76, 175, 80, 0.15);
-        color: #4CAF50;
-        margin-bottom: 1rem;
-    }
-    .error-msg {
-        padding: 0.75rem;
-        border-radius: 0.25rem;
-        background-color: rgba(229, 57, 53, 0.15);
-        color: #e53935;
-        margin-bottom: 1rem;
-    }
-    .info-msg {
-        padding: 0.75rem;
-        border-radius: 0.25rem;
-        background-color: rgba(61, 191, 255, 0.15);
-        color: #3dbfff;
-        margin-bottom: 1rem;
-    }
-    .btn-primary {
-        background-color: #3dbfff;
-        color: #1a1c23;
-        padding: 0.5rem 1rem;
-        border-radius: 0.25rem;
-        border: none;
-        cursor: pointer;
-        transition: background-color 0.2s ease;
-    }
-    .btn-primary:hover {
-        background-color: #61cdff;
-    }
-    .btn-secondary {
-        background-color: #3e4251;
-        color: #e4e6eb;
-        padding: 0.5rem 1rem;
-        border-radius: 0.25rem;
-        border: none;
-        cursor: pointer;
-        transition: background-color 0.2s ease;
-    }
-    .btn-secondary:hover {
-        background-color: #4c506b;
-    }
-    .sidebar .sidebar-content {
-        background-color: #252836;
-        color: #e4e6eb;
-    }
-    /* Make sidebar buttons match dark theme */
-    .sidebar .stButton button {
-        background-color: #3e4251;
-        color: #e4e6eb;
-        border: none;
-        width: 100%;
-        text-align: left;
-        margin-bottom: 0.5rem;
-        border-radius: 0.25rem;
-        padding: 0.5rem 1rem;
-        transition: background-color 0.2s ease;
-    }
-    .sidebar .stButton button:hover {
-        background-color: #4c506b;
-    }
-    .account-balance {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #3dbfff;
-    }
-    .transaction {
-        padding: 0.75rem;
-        border-bottom: 1px solid #3e4251;
-    }
-    .transaction-amount-credit {
-        color: #4CAF50;
-        font-weight: 600;
-    }
-    .transaction-amount-debit {
-        color: #e53935;
-        font-weight: 600;
-    }
-    /* Form styling */
-    input, select, textarea {
-        background-color: #2d303e !important;
-        border: 1px solid #3e4251 !important;
-        border-radius: 0.375rem !important;
-        color: #e4e6eb !important;
-    }
-    input:focus, select:focus, textarea:focus {
-        border-color: #3dbfff !important;
-        box-shadow: 0 0 0 3px rgba(61, 191, 255, 0.1) !important;
-    }
-    /* Button styling */
-    button[kind="primary"] {
-        background-color: #3dbfff !important;
-        border-color: #3dbfff !important;
-    }
-    button[kind="primary"]:hover {
-        background-color: #61cdff !important;
-        border-color: #61cdff !important;
-    }
-    /* Checkbox and Radio styling */
-    .stCheckbox > label > div[role="checkbox"],
-    .stRadio > label > div[role="radio"] {
-        background-color: #2d303e !important;
-        border-color: #3e4251 !important;
-    }
-    /* Slider styling */
-    .stSlider > div > div > div {
-        background-color: #3dbfff !important;
-    }
-    /* Tabs styling */
-    .stTabs [data-baseweb="tab-list"] {
-        background-color: #1a1c23 !important;
-    }
-    .stTabs [data-baseweb="tab"] {
-        color: #b8bac0 !important;
-    }
-    .stTabs [aria-selected="true"] {
-        color: #3dbfff !important;
-        border-bottom-color: #3dbfff !important;
-    }
-    /* Override Streamlit elements */
-    .stTextInput > label, .stNumberInput > label, .stSelectbox > label, .stTextArea > label {
-        color: #b8bac0 !important;
-    }
-    .css-1adrfps {
-        background-color: #2d303e !important;
-    }
-    /* Login and registration page styling */
-    .login-container {
-        background-color: #2d303e !important;
-    }
-    .login-divider {
-        border-top: 1px solid #3e4251;
-        position: relative;
-        margin: 1.5rem 0;
-        text-align: center;
-    }
-    .login-divider-text {
-        position: relative;
-        top: -0.7rem;
-        background-color: #2d303e;
-        padding: 0 0.5rem;
-    }
-    a {
-        color: #3dbfff !important;
-        text-decoration: none !important;
-    }
-    a:hover {
-        text-decoration: underline !important;
-    }
-    /* Fix header and other elements */
-    h1, h2, h3, h4, h5, h6 {
-        color: #e4e6eb !important;
-    }
-    p {
-        color: #b8bac0 !important;
-    }
-    .stMarkdown {
-        color: #b8bac0 !important;
-    }
-    .profile-container {
-        padding: 1.5rem;
-        background-color: #1a1c23;
-    }
-    .profile-header {
-        background: linear-gradient(90deg, #1E3A8A 0%, #2c4ec9 100%);
-        padding: 2rem;
-        border-radius: 12px;
-        color: white;
-        margin-bottom: 2rem;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
-        position: relative;
-        overflow: hidden;
-    }
-    .profile-header h1 {
-        font-size: 1.8rem;
-        margin-bottom: 0.5rem;
-        color: white !important;
-    }
-    .profile-header p {
-        opacity: 0.9;
-        color: #e4e6eb !important;
-    }
-    .profile-avatar {
-        width: 80px;
-        height: 80px;
-        background-color: #3dbfff;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-size: 2rem;
-        font-weight: 600;
-        margin-bottom: 1rem;
-    }
-    .info-card {
-        background-color: #2d303e;
-        border-radius: 12px;
-        padding: 1.5rem;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-        margin-bottom: 2rem;
-        transition: transform 0.2s;
-        position: relative;
-        overflow: hidden;
-    }
-    .info-card:hover {
-        transform: translateY(-5px);
-    }
-    .info-card h3 {
-        font-size: 1.2rem;
-        margin-bottom: 1.5rem;
-        color: #e4e6eb !important;
-        border-bottom: 1px solid #3e4251;
-        padding-bottom: 0.5rem;
-    }
-    .info-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 5px;
-        height: 100%;
-        background-color: #3dbfff;
-    }
-    .account-card::before {
-        background-color: #4CAF50;
-    }
-    .info-item {
-        display: flex;
-        justify-content: space-between;
-        margin-bottom: 1rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 1px solid #3e4251;
-    }
-    .info-item:last-child {
-        border-bottom: none;
-    }
-    .info-label {
-        color: #a0a3ad;
-        font-weight: 400;
-    }
-    .info-value {
-        color: #e4e6eb;
-        font-weight: 500;
-    }
-    .highlight-value {
-        color: #3dbfff;
-        font-weight: 600;
-        font-size: 1.2rem;
-    }
-    .edit-form-container {
-        background-color: #2d303e;
-        border-radius: 12px;
-        padding: 1.5rem;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-    }
-    .edit-form-header {
-        font-size: 1.2rem;
-        margin-bottom: 1.5rem;
-        color: #e4e6eb !important;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    .section-icon {
-        display: inline-flex;
-        width: 30px;
-        height: 30px;
-        background-color: rgba(61, 191, 255, 0.15);
-        color: #3dbfff;
-        border-radius: 50%;
-        align-items: center;
-        justify-content: center;
-        margin-right: 8px;
-    }
-    .update-button {
-        width: 100%;
-        padding: 0.75rem;
-        background-color: #3dbfff;
-        color: #1a1c23;
-        border: none;
-        border-radius: 8px;
-        font-weight: 600;
-        cursor: pointer;
-        margin-top: 1rem;
-        transition: background-color 0.2s;
-    }
-    .update-button:hover {
-        background-color: #61cdff;
-    }
-    .clickable-card {
-        cursor: pointer;
-        transition: transform 0.3s, box-shadow 0.3s;
-    }
-    .clickable-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 20px rgba(0, 0, 0, 0.2);
-    }
-    .auth-btn {
-        background: linear-gradient(135deg, #3182CE 0%, #2C5282 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 12px 20px;
-        font-weight: 500;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        width: 100%;
-        margin-bottom: 8px;
-        text-align: center;
-        box-shadow: 0 2px 6px rgba(0, 0, 0, 0.15);
-    }
-    .auth-btn:hover {
-        box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-        transform: translateY(-2px);
-    }
-    .auth-btn.secondary {
-        background: #2e3346;
-        border: 1px solid #3e4251;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # Initialize session state variables
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -402,58 +43,44 @@ if 'notification' not in st.session_state:
 if 'notification_type' not in st.session_state:
     st.session_state.notification_type = None
 
-# File paths
-DATA_DIR = "data"
-USERS_FILE = os.path.join(DATA_DIR, "users.json")
-ACCOUNTS_FILE = os.path.join(DATA_DIR, "accounts.json")
-TRANSACTIONS_FILE = os.path.join(DATA_DIR, "transactions.json")
+# Storage backend for users, accounts and transactions
+storage = get_storage()
 
-# Create data directory if it doesn't exist
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+# Daily and monthly rollups of the ledger, loaded before any posting
+rollups = get_ledger_rollups().load()
 
-# Initialize data files if they don't exist
-def initialize_data_files():
-    if not os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'w') as f:
-            json.dump({}, f)
-    
-    if not os.path.exists(ACCOUNTS_FILE):
-        with open(ACCOUNTS_FILE, 'w') as f:
-            json.dump({}, f)
-    
-    if not os.path.exists(TRANSACTIONS_FILE):
-        with open(TRANSACTIONS_FILE, 'w') as f:
-            json.dump({}, f)
+# Columnar copy of the ledger for admin analytics, loaded before any posting
+ledger_columns = get_ledger_columns().load()
 
-initialize_data_files()
+# Transaction history paging
+TRANSACTIONS_PAGE_SIZE = 20
+TRANSACTIONS_PAGE_SIZES = [20, 50, 100]
+TRANSACTION_SORTS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Amount (High to Low)": "amount_desc",
+    "Amount (Low to High)": "amount_asc"
+}
+
+# Stylesheets of each page in assets/css, on top of home_base and the sidebar's
+PAGE_STYLESHEETS = {
+    "home": "home_landing",
+    "dashboard": "home_dashboard",
+    "account_details": "home_account_details",
+    "emi_calculator": "home_emi_calculator"
+}
 
 # Helper functions
 def hash_password(password):
     """Hash a password for storing."""
     return hashlib.sha256(password.encode()).hexdigest()
 
-def load_data(file_path):
-    """Load data from a JSON file."""
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-def save_data(data, file_path):
-    """Save data to a JSON file."""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
-
 def register_user(username, password, email, full_name, address, phone):
     """Register a new user."""
-    users = load_data(USERS_FILE)
-    
-    if username in users:
+    if storage.get_user(username) is not None:
         return False, "Username already exists"
     
-    users[username] = {
+    user = {
         "password": hash_password(password),
         "email": email,
         "full_name": full_name,
@@ -462,102 +89,218 @@ def register_user(username, password, email, full_name, address, phone):
         "created_at": datetime.datetime.now().isoformat()
     }
     
-    save_data(users, USERS_FILE)
-    
     # Create an account for the user
-    accounts = load_data(ACCOUNTS_FILE)
-    account_number = f"NB{random.randint(10000000, 99999999)}"
-    
-    accounts[username] = {
-        "account_number": account_number,
+    account = {
+        "account_number": f"NB{random.randint(10000000, 99999999)}",
         "balance": 0,
         "account_type": "Savings",
         "status": "Active",
         "created_at": datetime.datetime.now().isoformat()
     }
     
-    save_data(accounts, ACCOUNTS_FILE)
-    
-    return True, "Registration successful"
+    return storage.create_user(username, user, account)
 
 def authenticate_user(username, password):
     """Authenticate a user."""
-    users = load_data(USERS_FILE)
+    user = storage.get_user(username)
     
-    if username not in users:
+    if user is None:
         return False, "Invalid username or password"
     
-    if users[username]["password"] != hash_password(password):
+    if user["password"] != hash_password(password):
         return False, "Invalid username or password"
     
     return True, "Login successful"
 
 def get_account_details(username):
     """Get account details for a user."""
-    accounts = load_data(ACCOUNTS_FILE)
-    
-    if username not in accounts:
-        return None
-    
-    return accounts[username]
+    return storage.get_account(username)
 
 def get_user_details(username):
     """Get user details."""
-    users = load_data(USERS_FILE)
+    user = storage.get_user(username)
     
-    if username not in users:
+    if user is None:
         return None
     
-    user_data = users[username].copy()
+    user_data = user.copy()
     user_data.pop("password", None)  # Remove password for security
     
     return user_data
 
 def get_transactions(username):
     """Get transactions for a user."""
-    transactions = load_data(TRANSACTIONS_FILE)
-    
-    if username not in transactions:
-        return []
-    
-    return transactions[username]
+    return storage.get_transactions(username)
+
+def get_transactions_page(username, cursor=None, limit=20, tx_type=None, sort="newest"):
+    """Get one page of transactions for a user, newest first by default."""
+    return storage.get_transactions_page(username, cursor, limit, tx_type, sort)
+
+def get_transaction_totals(username):
+    """Get total credits and debits for a user."""
+    return storage.get_transaction_totals(username)
+
+def get_range_totals(username, start, end):
+    """Get credit and debit totals for a user in the window [start, end)."""
+    return storage.get_range_totals(username, start, end)
 
 def add_transaction(username, transaction_type, amount, description):
-    """Add a transaction for a user."""
-    transactions = load_data(TRANSACTIONS_FILE)
-    
-    if username not in transactions:
-        transactions[username] = []
-    
-    transaction = {
-        "id": len(transactions[username]) + 1,
-        "type": transaction_type,
-        "amount": amount,
-        "description": description,
-        "timestamp": datetime.datetime.now().isoformat()
-    }
-    
-    transactions[username].append(transaction)
-    save_data(transactions, TRANSACTIONS_FILE)
-    
-    # Update account balance
-    accounts = load_data(ACCOUNTS_FILE)
-    
-    if transaction_type == "credit":
-        accounts[username]["balance"] += amount
-    else:
-        accounts[username]["balance"] -= amount
-    
-    save_data(accounts, ACCOUNTS_FILE)
+    """Add a transaction of `amount` paise for a user."""
+    transaction = storage.add_transaction(username, transaction_type, amount, description)
+    rollups.record(username, transaction)
+    ledger_columns.record(username, transaction)
 
-def calculate_emi(principal, rate, time):
-    """Calculate EMI."""
-    rate = rate / (12 * 100)  # Monthly interest rate
-    time = time * 12  # Total number of months
-    
-    emi = (principal * rate * (1 + rate) ** time) / ((1 + rate) ** time - 1)
-    
-    return emi
+# Chart drawing functions, rendered through utils.charts.render_chart
+def draw_credit_debit_pie(total_credits, total_debits):
+    """Draw the credits vs debits pie chart."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots()
+    ax.pie([total_credits, total_debits], labels=["Credits", "Debits"], autopct='%1.1f%%', colors=["#047857", "#b91c1c"])
+    ax.set_title("Credits vs Debits")
+    return fig
+
+def draw_recent_transactions(labels, amounts, colors):
+    """Draw the recent transactions bar chart."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots()
+    ax.bar(labels, amounts, color=colors)
+    ax.set_title("Recent Transactions")
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45, ha="right")
+    return fig
+
+def draw_loan_breakdown(loan_amount, total_interest, total_payment):
+    """Draw the principal vs interest donut chart of the EMI calculator."""
+    plt = get_pyplot()
+    fig = plt.figure(figsize=(12, 7))
+    ax = fig.add_subplot(111)
+    
+    # Custom colors
+    colors = ['#3182CE', '#9F7AEA']
+    
+    # Create data
+    labels = ["Principal", "Interest"]
+    sizes = [loan_amount, total_interest]
+    
+    # Create pie chart with custom styling
+    wedges, texts, autotexts = ax.pie(
+        sizes, 
+        labels=labels, 
+        autopct='%1.1f%%', 
+        startangle=90, 
+        colors=colors,
+        wedgeprops={'width': 0.4, 'edgecolor': 'white', 'linewidth': 1},
+        textprops={'fontsize': 12, 'color': 'white'}
+    )
+    
+    # Style pie chart
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        
+    ax.set_title("Loan Breakdown", color='white', fontsize=16, pad=20)
+    
+    # Set background color
+    fig.patch.set_facecolor('#252836')
+    ax.set_facecolor('#252836')
+    
+    # Equal aspect ratio for circular pie
+    ax.axis('equal')
+    
+    # Add total values
+    ax.annotate(
+        f"Principal: ₹{loan_amount:,.0f}\nInterest: ₹{total_interest:,.0f}\nTotal: ₹{total_payment:,.0f}",
+        xy=(0, -0.1),
+        xycoords='axes fraction',
+        ha='center',
+        va='center',
+        color='white',
+        fontsize=12
+    )
+    
+    return fig
+
+def draw_principal_schedule(years, remaining_principal, emi, simulated_principal=None):
+    """Draw the remaining principal line chart of the EMI calculator."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(12, 7))
+    
+    # Plot the line chart with improved styling
+    ax.plot(years, remaining_principal, marker='o', markersize=6, linewidth=3, color='#3182CE')
+    
+    # Overlay the simulated loan when prepayments or rate resets are set
+    if simulated_principal is not None:
+        ax.plot(years, simulated_principal, marker='o', markersize=6, linewidth=3, linestyle='--', color='#9F7AEA', label="With prepayment / reset")
+        ax.legend(facecolor='#252836', labelcolor='white')
+    
+    # Add monthly payment annotation
+    ax.annotate(
+        f"Monthly Payment: ₹{emi:,.2f}",
+        xy=(years[len(years)//2], remaining_principal[len(years)//2]),
+        xytext=(0, 30),
+        textcoords='offset points',
+        color='white',
+        fontsize=12,
+        bbox=dict(boxstyle="round,pad=0.3", facecolor='#3949AB', alpha=0.8),
+        arrowprops=dict(arrowstyle='->', color='white')
+    )
+    
+    # Style the chart
+    ax.set_xlabel("Years", color='white', fontsize=12)
+    ax.set_ylabel("Remaining Principal (₹)", color='white', fontsize=12)
+    ax.set_title("Principal Remaining Over Time", color='white', fontsize=16, pad=20)
+    
+    # Format y-axis labels
+    ax.get_yaxis().set_major_formatter(
+        plt.FuncFormatter(lambda x, loc: f"₹{int(x):,}")
+    )
+    
+    # Style grid
+    ax.grid(True, linestyle='--', alpha=0.3)
+    
+    # Style ticks
+    ax.tick_params(colors='white', which='both')
+    
+    # Set background color
+    fig.patch.set_facecolor('#252836')
+    ax.set_facecolor('#252836')
+    
+    # Style spines
+    for spine in ax.spines.values():
+        spine.set_edgecolor('#3f4663')
+    
+    return fig
+
+def draw_emi_heatmap(loan_amount, compare_rates, compare_terms, emi_grid):
+    """Draw the rate vs term EMI heatmap of the EMI calculator."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(12, 7))
+    heatmap = ax.imshow(emi_grid, cmap='Blues', aspect='auto')
+    
+    # Label every cell with its EMI
+    for i in range(len(compare_rates)):
+        for j in range(len(compare_terms)):
+            ax.text(j, i, f"₹{emi_grid[i, j]:,.0f}", ha='center', va='center', fontsize=9,
+                    color='white' if emi_grid[i, j] > emi_grid.mean() else '#1e2130')
+    
+    # Style the chart
+    ax.set_xticks(range(len(compare_terms)))
+    ax.set_xticklabels([f"{term} yrs" for term in compare_terms])
+    ax.set_yticks(range(len(compare_rates)))
+    ax.set_yticklabels([f"{rate:.1f}%" for rate in compare_rates])
+    ax.set_xlabel("Loan Term", color='white', fontsize=12)
+    ax.set_ylabel("Interest Rate", color='white', fontsize=12)
+    ax.set_title(f"Monthly Payment for ₹{loan_amount:,.0f}", color='white', fontsize=16, pad=20)
+    ax.tick_params(colors='white', which='both')
+    
+    colorbar = fig.colorbar(heatmap, ax=ax)
+    colorbar.ax.tick_params(colors='white')
+    
+    # Set background color
+    fig.patch.set_facecolor('#252836')
+    ax.set_facecolor('#252836')
+    
+    return fig
 
 # Navigation functions
 def navigate_to(page):
@@ -638,54 +381,6 @@ def display_sidebar():
             # Enhanced navigation styling with active state indicator
             current_page = st.session_state.current_page
             
-            st.markdown('''
-            <style>
-            .sidebar .stButton button {
-                background-color: #1e2130;
-                border: 1px solid #2e3346;
-                border-radius: 10px;
-                padding: 12px 15px;
-                margin-bottom: 10px;
-                color: #ffffff;
-                display: flex;
-                align-items: center;
-                font-size: 14px;
-                font-weight: normal;
-                width: 100%;
-                transition: all 0.2s ease;
-                position: relative;
-                overflow: hidden;
-                text-align: left;
-            }
-            .sidebar .stButton button:hover {
-                background-color: #2a2e3d;
-                transform: translateY(-2px);
-                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-            }
-            .sidebar .stButton button:active {
-                transform: translateY(0px);
-            }
-            .nav-icon {
-                display: inline-block;
-                margin-right: 10px;
-                width: 20px;
-                text-align: center;
-            }
-            .active-nav-item {
-                background: linear-gradient(135deg, #2c3251 0%, #262c41 100%) !important;
-                border-left: 3px solid #3182CE !important;
-            }
-            
-            /* Always show button outline */
-            .sidebar .stButton button[kind="secondary"] {
-                border-left: 3px solid #2e3346 !important;
-            }
-            .sidebar .stButton button[kind="secondary"]:hover {
-                border-left: 3px solid #3182CE !important;
-            }
-            </style>
-            ''', unsafe_allow_html=True)
-            
             # Navigation section title
             st.markdown('<p style="color: #8A94A6; font-size: 12px; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px; font-weight: 600;">MAIN NAVIGATION</p>', unsafe_allow_html=True)
             
@@ -801,32 +496,6 @@ def display_sidebar():
                 
         else:
             # Login and Register buttons
-            st.markdown('''
-            <style>
-            .auth-btn {
-                background: linear-gradient(135deg, #3182CE 0%, #2C5282 100%);
-                color: white;
-                border: none;
-                border-radius: 10px;
-                padding: 12px 20px;
-                font-weight: 500;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                width: 100%;
-                margin-bottom: 8px;
-                text-align: center;
-                box-shadow: 0 2px 6px rgba(0, 0, 0, 0.15);
-            }
-            .auth-btn:hover {
-                box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-                transform: translateY(-2px);
-            }
-            .auth-btn.secondary {
-                background: #2e3346;
-                border: 1px solid #3e4251;
-            }
-            </style>
-            ''', unsafe_allow_html=True)
             
             col1, col2 = st.columns(2)
             
@@ -852,140 +521,6 @@ def display_sidebar():
             ''', unsafe_allow_html=True)
 
 def account_details_page():
-    st.markdown("""
-    <style>
-        .profile-container {
-            padding: 1.5rem;
-            background-color: #1a1c23;
-        }
-        .profile-header {
-            background: linear-gradient(90deg, #1E3A8A 0%, #2c4ec9 100%);
-            padding: 2rem;
-            border-radius: 12px;
-            color: white;
-            margin-bottom: 2rem;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
-            position: relative;
-            overflow: hidden;
-        }
-        .profile-header h1 {
-            font-size: 1.8rem;
-            margin-bottom: 0.5rem;
-            color: white !important;
-        }
-        .profile-header p {
-            opacity: 0.9;
-            color: #e4e6eb !important;
-        }
-        .profile-avatar {
-            width: 80px;
-            height: 80px;
-            background-color: #3dbfff;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-size: 2rem;
-            font-weight: 600;
-            margin-bottom: 1rem;
-        }
-        .info-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            transition: transform 0.2s;
-            position: relative;
-            overflow: hidden;
-        }
-        .info-card:hover {
-            transform: translateY(-5px);
-        }
-        .info-card h3 {
-            font-size: 1.2rem;
-            margin-bottom: 1.5rem;
-            color: #e4e6eb !important;
-            border-bottom: 1px solid #3e4251;
-            padding-bottom: 0.5rem;
-        }
-        .info-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 5px;
-            height: 100%;
-            background-color: #3dbfff;
-        }
-        .account-card::before {
-            background-color: #4CAF50;
-        }
-        .info-item {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 1rem;
-            padding-bottom: 0.5rem;
-            border-bottom: 1px solid #3e4251;
-        }
-        .info-item:last-child {
-            border-bottom: none;
-        }
-        .info-label {
-            color: #a0a3ad;
-            font-weight: 400;
-        }
-        .info-value {
-            color: #e4e6eb;
-            font-weight: 500;
-        }
-        .highlight-value {
-            color: #3dbfff;
-            font-weight: 600;
-            font-size: 1.2rem;
-        }
-        .edit-form-container {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-        }
-        .edit-form-header {
-            font-size: 1.2rem;
-            margin-bottom: 1.5rem;
-            color: #e4e6eb !important;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-        .section-icon {
-            display: inline-flex;
-            width: 30px;
-            height: 30px;
-            background-color: rgba(61, 191, 255, 0.15);
-            color: #3dbfff;
-            border-radius: 50%;
-            align-items: center;
-            justify-content: center;
-            margin-right: 8px;
-        }
-        .update-button {
-            width: 100%;
-            padding: 0.75rem;
-            background-color: #3dbfff;
-            color: #1a1c23;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            margin-top: 1rem;
-            transition: background-color 0.2s;
-        }
-        .update-button:hover {
-            background-color: #61cdff;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-    
     account = get_account_details(st.session_state.username)
     user = get_user_details(st.session_state.username)
     
@@ -1077,7 +612,7 @@ def account_details_page():
             </div>
             <div class="info-item">
                 <span class="info-label">Current Balance</span>
-                <span class="highlight-value">₹{account["balance"]:,.2f}</span>
+                <span class="highlight-value">{format_money(account["balance"])}</span>
             </div>
         </div>
         ''', unsafe_allow_html=True)
@@ -1112,12 +647,11 @@ def account_details_page():
         
         if submit_button:
             # Update user details
-            users = load_data(USERS_FILE)
-            users[st.session_state.username]["email"] = email
-            users[st.session_state.username]["phone"] = phone
-            users[st.session_state.username]["address"] = address
-            
-            save_data(users, USERS_FILE)
+            storage.update_user(st.session_state.username, {
+                "email": email,
+                "phone": phone,
+                "address": address
+            })
             
             show_notification("Profile updated successfully", "success")
     
@@ -1125,66 +659,84 @@ def account_details_page():
     
     st.markdown('</div>', unsafe_allow_html=True)  # Close profile container
 
+# Function to build the transaction history markup
+def transaction_history_html(transactions):
+    """
+    Build the HTML of one page of transaction history, so the page is sent
+    to the browser as a single element however many rows it holds
+    """
+    rows = []
+    
+    for transaction in transactions:
+        if transaction["type"] == "credit":
+            amount = f'<p class="transaction-amount-credit">+{format_money(transaction["amount"])}</p>'
+        else:
+            amount = f'<p class="transaction-amount-debit">-{format_money(transaction["amount"])}</p>'
+        
+        rows.append(
+            '<div class="transaction transaction-row">'
+            f'<div><p>{html.escape(transaction["description"])}</p>'
+            f'<p style="font-size: 0.8rem; color: #6b7280;">{html.escape(transaction["timestamp"])}</p></div>'
+            f'{amount}'
+            f'<p>{html.escape(transaction["type"].capitalize())}</p>'
+            '</div>'
+        )
+    
+    return f'<div class="card">{"".join(rows)}</div>'
+
 def transactions_page():
     st.markdown('<h2 class="sub-header">Transaction History</h2>', unsafe_allow_html=True)
     
-    transactions = get_transactions(st.session_state.username)
+    username = st.session_state.username
+    totals = get_transaction_totals(username)
     
-    if not transactions:
+    if not get_transactions_page(username, limit=1)[0]:
         st.info("No transactions found")
         return
     
     # Filter options
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns([2, 2, 1])
     
     with col1:
         transaction_type = st.selectbox("Filter by Type", ["All", "Credit", "Debit"])
     
     with col2:
-        sort_by = st.selectbox("Sort by", ["Newest First", "Oldest First", "Amount (High to Low)", "Amount (Low to High)"])
+        sort_by = st.selectbox("Sort by", list(TRANSACTION_SORTS))
     
-    # Apply filters
-    filtered_transactions = transactions.copy()
+    with col3:
+        page_size = st.selectbox("Rows per page", TRANSACTIONS_PAGE_SIZES, index=TRANSACTIONS_PAGE_SIZES.index(TRANSACTIONS_PAGE_SIZE))
     
-    if transaction_type != "All":
-        filtered_transactions = [t for t in filtered_transactions if t["type"].lower() == transaction_type.lower()]
+    tx_type = None if transaction_type == "All" else transaction_type.lower()
+    sort = TRANSACTION_SORTS[sort_by]
     
-    # Apply sorting
-    if sort_by == "Newest First":
-        filtered_transactions = sorted(filtered_transactions, key=lambda x: x["timestamp"], reverse=True)
-    elif sort_by == "Oldest First":
-        filtered_transactions = sorted(filtered_transactions, key=lambda x: x["timestamp"])
-    elif sort_by == "Amount (High to Low)":
-        filtered_transactions = sorted(filtered_transactions, key=lambda x: x["amount"], reverse=True)
-    elif sort_by == "Amount (Low to High)":
-        filtered_transactions = sorted(filtered_transactions, key=lambda x: x["amount"])
+    # Keep a stack of page cursors; start over when the filters change
+    if st.session_state.get("tx_page_filters") != (tx_type, sort, page_size):
+        st.session_state.tx_page_filters = (tx_type, sort, page_size)
+        st.session_state.tx_page_cursors = [None]
     
-    # Display transactions
-    st.markdown('<div class="card">', unsafe_allow_html=True)
+    cursors = st.session_state.tx_page_cursors
+    page_transactions, next_cursor = get_transactions_page(
+        username, cursors[-1], page_size, tx_type, sort
+    )
     
-    for transaction in filtered_transactions:
-        col1, col2, col3 = st.columns([3, 1, 1])
-        
-        with col1:
-            st.markdown(f'<div class="transaction">', unsafe_allow_html=True)
-            st.markdown(f'<p>{transaction["description"]}</p>', unsafe_allow_html=True)
-            st.markdown(f'<p style="font-size: 0.8rem; color: #6b7280;">{transaction["timestamp"]}</p>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f'<div class="transaction">', unsafe_allow_html=True)
-            if transaction["type"] == "credit":
-                st.markdown(f'<p class="transaction-amount-credit">+₹{transaction["amount"]:,.2f}</p>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<p class="transaction-amount-debit">-₹{transaction["amount"]:,.2f}</p>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f'<div class="transaction">', unsafe_allow_html=True)
-            st.markdown(f'<p>{transaction["type"].capitalize()}</p>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+    # Display transactions as one element, whatever the page size
+    st.markdown(transaction_history_html(page_transactions), unsafe_allow_html=True)
     
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Page navigation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        if len(cursors) > 1 and st.button("← Previous", key="tx_prev_page"):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.markdown(f'<p style="text-align: center; color: #6b7280;">Page {len(cursors)}</p>', unsafe_allow_html=True)
+    
+    with col3:
+        if next_cursor is not None and st.button("Next →", key="tx_next_page"):
+            cursors.append(next_cursor)
+            st.rerun()
     
     # Transaction Summary
     st.markdown('<h3>Transaction Summary</h3>', unsafe_allow_html=True)
@@ -1192,19 +744,16 @@ def transactions_page():
     col1, col2 = st.columns(2)
     
     with col1:
-        # Calculate total credits and debits
-        total_credits = sum(t["amount"] for t in transactions if t["type"] == "credit")
-        total_debits = sum(t["amount"] for t in transactions if t["type"] == "debit")
+        # Total credits and debits
+        total_credits = totals["credit"]
+        total_debits = totals["debit"]
         
-        # Create a pie chart
-        fig, ax = plt.subplots()
-        ax.pie([total_credits, total_debits], labels=["Credits", "Debits"], autopct='%1.1f%%', colors=["#047857", "#b91c1c"])
-        ax.set_title("Credits vs Debits")
-        st.pyplot(fig)
+        # Create a pie chart (served from the chart cache while totals are unchanged)
+        st.image(render_chart(draw_credit_debit_pie, total_credits, total_debits), use_column_width=True)
     
     with col2:
         # Create a bar chart of recent transactions
-        recent_transactions = sorted(transactions, key=lambda x: x["timestamp"], reverse=True)[:5]
+        recent_transactions, _ = get_transactions_page(username, limit=5)
         
         amounts = []
         labels = []
@@ -1212,10 +761,10 @@ def transactions_page():
         
         for t in recent_transactions:
             if t["type"] == "credit":
-                amounts.append(t["amount"])
+                amounts.append(to_rupees(t["amount"]))
                 colors.append("#047857")
             else:
-                amounts.append(-t["amount"])
+                amounts.append(-to_rupees(t["amount"]))
                 colors.append("#b91c1c")
             
             # Truncate description if too long
@@ -1225,11 +774,7 @@ def transactions_page():
             
             labels.append(desc)
         
-        fig, ax = plt.subplots()
-        ax.bar(labels, amounts, color=colors)
-        ax.set_title("Recent Transactions")
-        ax.set_xticklabels(labels, rotation=45, ha="right")
-        st.pyplot(fig)
+        st.image(render_chart(draw_recent_transactions, labels, amounts, colors), use_column_width=True)
 
 def transfer_page():
     st.markdown('<h2 class="sub-header">Transfer Money</h2>', unsafe_allow_html=True)
@@ -1241,7 +786,7 @@ def transfer_page():
         navigate_to("login")
         return
     
-    st.markdown(f'<p>Current Balance: <span class="account-balance">₹{account["balance"]:,.2f}</span></p>', unsafe_allow_html=True)
+    st.markdown(f'<p>Current Balance: <span class="account-balance">{format_money(account["balance"])}</span></p>', unsafe_allow_html=True)
     
     with st.form("transfer_form"):
         recipient_account = st.text_input("Recipient Account Number")
@@ -1253,15 +798,15 @@ def transfer_page():
         if submit_button:
             if not recipient_account or amount <= 0:
                 show_notification("Please fill in all fields with valid values", "error")
-            elif amount > account["balance"]:
+            elif to_paise(amount) > account["balance"]:
                 show_notification("Insufficient balance", "error")
             else:
                 # Add debit transaction for sender
-                add_transaction(st.session_state.username, "debit", amount, f"Transfer to {recipient_account}: {description}")
+                add_transaction(st.session_state.username, "debit", to_paise(amount), f"Transfer to {recipient_account}: {description}")
                 
                 # For demo purposes, we'll just show a success message
                 # In a real app, you would verify the recipient account and add a credit transaction for them
-                show_notification(f"Successfully transferred ₹{amount:,.2f} to {recipient_account}", "success")
+                show_notification(f"Successfully transferred {format_money(to_paise(amount))} to {recipient_account}", "success")
                 
                 # Refresh the page to show updated balance
                 st.rerun()
@@ -1273,131 +818,32 @@ def transfer_page():
     
     with col1:
         if st.button("Add ₹1,000"):
-            add_transaction(st.session_state.username, "credit", 1000, "Quick Add")
+            add_transaction(st.session_state.username, "credit", to_paise(1000), "Quick Add")
             show_notification("Added ₹1,000 to your account", "success")
             st.rerun()
     
     with col2:
         if st.button("Add ₹5,000"):
-            add_transaction(st.session_state.username, "credit", 5000, "Quick Add")
+            add_transaction(st.session_state.username, "credit", to_paise(5000), "Quick Add")
             show_notification("Added ₹5,000 to your account", "success")
             st.rerun()
     
     with col3:
         if st.button("Add ₹10,000"):
-            add_transaction(st.session_state.username, "credit", 10000, "Quick Add")
+            add_transaction(st.session_state.username, "credit", to_paise(10000), "Quick Add")
             show_notification("Added ₹10,000 to your account", "success")
             st.rerun()
 
 def emi_calculator_page():
-    # Add custom CSS to make this page wider
-    st.markdown('''
-    <style>
-        /* Make the calculator page wider */
-        .main .block-container {
-            max-width: 1200px;
-            padding-left: 1rem;
-            padding-right: 1rem;
-            width: 100%;
-        }
-    </style>
-    ''', unsafe_allow_html=True)
+    # NumPy and the amortization engine are only loaded by the calculator
+    from utils.amortization import calculate_emi, calculate_emi_grid, amortization_schedule, balance_at, simulate_loan
+    np = get_numpy()
     
     st.markdown('''
     <h2 class="sub-header">EMI Calculator</h2>
     <p style="margin-bottom: 20px; color: #8A94A6;">Calculate and visualize your loan EMI with detailed breakdown</p>
     ''', unsafe_allow_html=True)
     
-    # Custom CSS for the EMI calculator
-    st.markdown('''
-    <style>
-        .emi-card {
-            background: linear-gradient(145deg, #1e2130 0%, #252836 100%);
-            border-radius: 16px;
-            padding: 30px;
-            margin-bottom: 25px;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
-            border: 1px solid #2e3346;
-        }
-        .emi-result {
-            background: linear-gradient(145deg, #2B3990 0%, #3949AB 100%);
-            border-radius: 12px;
-            padding: 25px;
-            color: white;
-            text-align: center;
-            margin-top: 25px;
-            margin-bottom: 25px;
-        }
-        .emi-amount {
-            font-size: 26px;
-            font-weight: 700;
-            margin-bottom: 10px;
-        }
-        .emi-details {
-            display: flex;
-            justify-content: space-between;
-            margin-top: 15px;
-        }
-        .emi-detail-item {
-            text-align: center;
-            flex: 1;
-            padding: 10px;
-            border-radius: 8px;
-            background-color: rgba(255, 255, 255, 0.1);
-            margin: 0 5px;
-        }
-        .emi-detail-value {
-            font-size: 18px;
-            font-weight: 600;
-            margin-bottom: 5px;
-        }
-        .emi-detail-label {
-            font-size: 12px;
-            opacity: 0.8;
-        }
-        .tab-container {
-            margin-top: 20px;
-        }
-        .amortization-table {
-            margin-top: 20px;
-            width: 100%;
-            border-collapse: collapse;
-        }
-        .amortization-table th, .amortization-table td {
-            padding: 10px;
-            text-align: right;
-            border-bottom: 1px solid #2e3346;
-        }
-        .amortization-table th {
-            background-color: #1e2130;
-            color: #8A94A6;
-            font-weight: 600;
-        }
-        .amortization-table tr:hover {
-            background-color: #252836;
-        }
-        .comparison-card {
-            background-color: #1e2130;
-            border-radius: 12px;
-            padding: 15px;
-            margin-bottom: 15px;
-            border: 1px solid #2e3346;
-        }
-        .comparison-title {
-            font-size: 16px;
-            font-weight: 600;
-            margin-bottom: 10px;
-            color: #fff;
-        }
-        .comparison-value {
-            font-size: 22px;
-            font-weight: 700;
-            margin-bottom: 5px;
-            color: #3182CE;
-        }
-    </style>
-    ''', unsafe_allow_html=True)
-    
     # Top row layout
     col1, col2 = st.columns([1, 1], gap="large")
     
@@ -1541,121 +987,86 @@ def emi_calculator_page():
             ''', unsafe_allow_html=True)
             
         st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Prepayment and rate reset simulation
+        st.markdown('<div class="emi-card">', unsafe_allow_html=True)
+        st.markdown('<h3 style="margin-bottom: 20px; font-size: 20px;">Prepayment & Rate Reset</h3>', unsafe_allow_html=True)
+        
+        tenure_months = round(loan_term * 12)
+        col_p1, col_p2 = st.columns(2)
+        with col_p1:
+            prepayment_amount = st.number_input("Lump-sum prepayment (₹)", min_value=0, max_value=int(loan_amount), value=0, step=10000)
+            prepayment_month = st.number_input("Prepay after month", min_value=1, max_value=tenure_months, value=min(12, tenure_months), step=1)
+        with col_p2:
+            reset_rate = st.number_input("Reset rate to (%)", min_value=0.0, max_value=20.0, value=interest_rate, step=0.1, format="%.1f")
+            reset_month = st.number_input("Reset after month", min_value=1, max_value=tenure_months, value=min(24, tenure_months), step=1)
+        reduce_choice = st.radio("After each event, reduce:", ["Tenure", "EMI"], horizontal=True)
+        
+        loan_events = []
+        if prepayment_amount > 0:
+            loan_events.append({"month": prepayment_month, "type": "prepayment", "amount": prepayment_amount, "reduce": reduce_choice.lower()})
+        if reset_rate != interest_rate:
+            loan_events.append({"month": reset_month, "type": "rate_change", "rate": reset_rate, "reduce": reduce_choice.lower()})
+        
+        simulated = simulate_loan(loan_amount, interest_rate, tenure_months, loan_events)
+        simulated_interest = simulated["interest"].sum()
+        interest_diff = total_interest - simulated_interest
+        
+        col_s1, col_s2 = st.columns(2)
+        with col_s1:
+            st.markdown(f'''
+            <div class="comparison-card">
+                <div style="font-size: 14px; color: #8A94A6;">New EMI / Tenure</div>
+                <div class="comparison-value">₹{simulated["emi"][-1]:,.2f}</div>
+                <div style="font-size: 14px; color: #8A94A6;">{len(simulated["month"])} months (was {tenure_months})</div>
+            </div>
+            ''', unsafe_allow_html=True)
+        with col_s2:
+            st.markdown(f'''
+            <div class="comparison-card">
+                <div style="font-size: 14px; color: #8A94A6;">Total Interest</div>
+                <div class="comparison-value">₹{simulated_interest:,.0f}</div>
+                <div style="font-size: 14px; color: {'#4ADE80' if interest_diff >= 0 else '#F87171'};">
+                    {'-' if interest_diff >= 0 else '+'}₹{abs(interest_diff):,.0f} overall
+                </div>
+            </div>
+            ''', unsafe_allow_html=True)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="emi-card">', unsafe_allow_html=True)
         st.markdown('<h3 style="margin-bottom: 20px; font-size: 20px;">Loan Visualization</h3>', unsafe_allow_html=True)
         
         # Create tabs for different visualizations
-        tab1, tab2 = st.tabs(["Payment Breakdown", "Payment Schedule"])
+        tab1, tab2, tab3 = st.tabs(["Payment Breakdown", "Payment Schedule", "Rate vs Term"])
         
         with tab1:
             # Create a pie chart for EMI breakdown with improved styling
-            fig = plt.figure(figsize=(12, 7))
-            ax = fig.add_subplot(111)
-            
-            # Custom colors
-            colors = ['#3182CE', '#9F7AEA']
-            
-            # Create data
-            labels = ["Principal", "Interest"]
-            sizes = [loan_amount, total_interest]
-            
-            # Create pie chart with custom styling
-            wedges, texts, autotexts = ax.pie(
-                sizes, 
-                labels=labels, 
-                autopct='%1.1f%%', 
-                startangle=90, 
-                colors=colors,
-                wedgeprops={'width': 0.4, 'edgecolor': 'white', 'linewidth': 1},
-                textprops={'fontsize': 12, 'color': 'white'}
-            )
-            
-            # Style pie chart
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-                
-            ax.set_title("Loan Breakdown", color='white', fontsize=16, pad=20)
-            
-            # Set background color
-            fig.patch.set_facecolor('#252836')
-            ax.set_facecolor('#252836')
-            
-            # Equal aspect ratio for circular pie
-            ax.axis('equal')
-            
-            # Add total values
-            plt.annotate(
-                f"Principal: ₹{loan_amount:,.0f}\nInterest: ₹{total_interest:,.0f}\nTotal: ₹{total_payment:,.0f}",
-                xy=(0, -0.1),
-                xycoords='axes fraction',
-                ha='center',
-                va='center',
-                color='white',
-                fontsize=12
-            )
-            
-            st.pyplot(fig)
+            st.image(render_chart(draw_loan_breakdown, loan_amount, total_interest, total_payment), use_column_width=True)
         
         with tab2:
-            # Create a line chart for payment schedule
-            fig, ax = plt.subplots(figsize=(12, 7))
-            
             # Create data for the payment schedule
             years = list(range(1, int(loan_term) + 2)) if loan_term > 1 else [0.25, 0.5, 0.75, 1, 1.25]
-            remaining_principal = [loan_amount]
-            
-            # Calculate remaining principal over time
-            principal_remaining = loan_amount
-            for _ in range(1, len(years)):
-                for __ in range(12):  # 12 months in a year
-                    interest_for_month = principal_remaining * (interest_rate / (12 * 100))
-                    principal_for_month = emi - interest_for_month
-                    principal_remaining = max(0, principal_remaining - principal_for_month)
-                remaining_principal.append(principal_remaining)
-            
-            # Plot the line chart with improved styling
-            ax.plot(years, remaining_principal, marker='o', markersize=6, linewidth=3, color='#3182CE')
-            
-            # Add monthly payment annotation
-            ax.annotate(
-                f"Monthly Payment: ₹{emi:,.2f}",
-                xy=(years[len(years)//2], remaining_principal[len(years)//2]),
-                xytext=(0, 30),
-                textcoords='offset points',
-                color='white',
-                fontsize=12,
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='#3949AB', alpha=0.8),
-                arrowprops=dict(arrowstyle='->', color='white')
-            )
-            
-            # Style the chart
-            ax.set_xlabel("Years", color='white', fontsize=12)
-            ax.set_ylabel("Remaining Principal (₹)", color='white', fontsize=12)
-            ax.set_title("Principal Remaining Over Time", color='white', fontsize=16, pad=20)
-            
-            # Format y-axis labels
-            ax.get_yaxis().set_major_formatter(
-                plt.FuncFormatter(lambda x, loc: f"₹{int(x):,}")
-            )
+            year_months = [12 * i for i in range(len(years))]
             
-            # Style grid
-            ax.grid(True, linestyle='--', alpha=0.3)
+            # Remaining principal at each yearly step, read from the cached schedule
+            schedule = amortization_schedule(loan_amount, interest_rate, round(loan_term * 12))
+            remaining_principal = balance_at(schedule, year_months).tolist()
             
-            # Style ticks
-            ax.tick_params(colors='white', which='both')
+            # Overlay the simulated loan when prepayments or rate resets are set
+            simulated_principal = balance_at(simulated, year_months).tolist() if loan_events else None
             
-            # Set background color
-            fig.patch.set_facecolor('#252836')
-            ax.set_facecolor('#252836')
-            
-            # Style spines
-            for spine in ax.spines.values():
-                spine.set_edgecolor('#3f4663')
+            # Create a line chart for payment schedule
+            st.image(render_chart(draw_principal_schedule, years, remaining_principal, emi, simulated_principal), use_column_width=True)
+        
+        with tab3:
+            # EMI for the chosen amount across nearby rates and common terms, in one grid call
+            compare_rates = np.round(np.arange(max(interest_rate - 3, 1.0), min(interest_rate + 3, 20.0) + 0.01, 0.5), 1)
+            compare_terms = np.array([5, 10, 15, 20, 25, 30])
+            emi_grid = calculate_emi_grid(loan_amount, compare_rates[:, None], compare_terms[None, :])["emi"]
             
-            st.pyplot(fig)
+            st.image(render_chart(draw_emi_heatmap, loan_amount, compare_rates, compare_terms, emi_grid), use_column_width=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1789,293 +1200,6 @@ def register_page():
         st.markdown('</div>', unsafe_allow_html=True)
 
 def dashboard_page():
-    # Custom CSS for dashboard with dark theme
-    st.markdown("""
-    <style>
-        body {
-            background-color: #1a1c23;
-            color: #e4e6eb;
-        }
-        .main .block-container {
-            background-color: #1a1c23;
-            padding: 1rem;
-        }
-        .dashboard-container {
-            padding: 1.5rem;
-            background-color: #1a1c23;
-        }
-        .welcome-header {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            margin-bottom: 2rem;
-            background: linear-gradient(90deg, #1E3A8A 0%, #2c4ec9 100%);
-            padding: 1.5rem 2rem;
-            border-radius: 12px;
-            color: white;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
-        }
-        .welcome-text h1 {
-            font-size: 1.8rem;
-            font-weight: 700;
-            margin: 0;
-            color: white;
-        }
-        .welcome-text p {
-            font-size: 1rem;
-            margin: 0.5rem 0 0 0;
-            opacity: 0.9;
-        }
-        .date-time {
-            font-size: 0.9rem;
-            opacity: 0.8;
-        }
-        .balance-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-            height: 100%;
-            border-left: 5px solid #4CAF50;
-            transition: transform 0.2s;
-        }
-        .balance-card:hover {
-            transform: translateY(-5px);
-        }
-        .balance-card h2 {
-            font-size: 1.2rem;
-            color: #b8bac0;
-            margin-bottom: 1rem;
-            font-weight: 600;
-        }
-        .balance-amount {
-            font-size: 2.5rem;
-            font-weight: 700;
-            color: #3dbfff;
-            margin-bottom: 0.5rem;
-        }
-        .account-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-            height: 100%;
-            border-left: 5px solid #3dbfff;
-            transition: transform 0.2s;
-        }
-        .account-card:hover {
-            transform: translateY(-5px);
-        }
-        .account-card h2 {
-            font-size: 1.2rem;
-            color: #b8bac0;
-            margin-bottom: 1rem;
-            font-weight: 600;
-        }
-        .account-detail {
-            margin-bottom: 0.5rem;
-            display: flex;
-            justify-content: space-between;
-        }
-        .account-label {
-            color: #a0a3ad;
-        }
-        .account-value {
-            font-weight: 500;
-            color: #e4e6eb;
-        }
-        .action-cards {
-            display: flex;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }
-        .action-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            flex: 1;
-            text-align: center;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-            transition: transform 0.3s;
-            cursor: pointer;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            margin-bottom: 1rem;
-            border-top: 3px solid #2d303e;
-        }
-        .action-card:hover {
-            transform: translateY(-5px);
-            border-top-color: #3dbfff;
-        }
-        .action-icon {
-            width: 50px;
-            height: 50px;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin-bottom: 1rem;
-        }
-        .action-icon.transfer {
-            background-color: rgba(61, 191, 255, 0.15);
-            color: #3dbfff;
-        }
-        .action-icon.calculator {
-            background-color: rgba(255, 196, 0, 0.15);
-            color: #ffc400;
-        }
-        .action-icon.transactions {
-            background-color: rgba(76, 175, 80, 0.15);
-            color: #4CAF50;
-        }
-        .action-title {
-            font-weight: 600;
-            font-size: 1.1rem;
-            margin-bottom: 0.5rem;
-            color: #e4e6eb;
-        }
-        .action-description {
-            font-size: 0.9rem;
-            color: #a0a3ad;
-            margin-bottom: 1rem;
-        }
-        .action-btn {
-            background-color: #3e4251;
-            color: #b8bac0;
-            padding: 0.5rem 1rem;
-            border-radius: 6px;
-            font-size: 0.9rem;
-            font-weight: 500;
-            text-decoration: none;
-            transition: background-color 0.3s;
-        }
-        .action-btn:hover {
-            background-color: #4c506b;
-        }
-        .transactions-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-            margin-top: 2rem;
-        }
-        .transactions-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1.5rem;
-        }
-        .transactions-title {
-            font-size: 1.2rem;
-            font-weight: 600;
-            color: #b8bac0;
-        }
-        .view-all {
-            font-size: 0.9rem;
-            color: #3dbfff;
-            text-decoration: none;
-            font-weight: 500;
-        }
-        .transaction-item {
-            display: flex;
-            align-items: center;
-            padding: 1rem 0;
-            border-bottom: 1px solid #3e4251;
-        }
-        .transaction-icon {
-            width: 40px;
-            height: 40px;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin-right: 1rem;
-            flex-shrink: 0;
-        }
-        .transaction-icon.credit {
-            background-color: rgba(76, 175, 80, 0.15);
-            color: #4CAF50;
-        }
-        .transaction-icon.debit {
-            background-color: rgba(229, 57, 53, 0.15);
-            color: #e53935;
-        }
-        .transaction-details {
-            flex: 1;
-        }
-        .transaction-title {
-            font-weight: 500;
-            margin-bottom: 0.25rem;
-            color: #e4e6eb;
-        }
-        .transaction-date {
-            font-size: 0.8rem;
-            color: #a0a3ad;
-        }
-        .transaction-amount {
-            font-weight: 600;
-        }
-        .transaction-amount.credit {
-            color: #4CAF50;
-        }
-        .transaction-amount.debit {
-            color: #e53935;
-        }
-        .quick-stats {
-            display: flex;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }
-        .stat-card {
-            background-color: #2d303e;
-            border-radius: 12px;
-            padding: 1.5rem;
-            flex: 1;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-            transition: transform 0.2s;
-            border-bottom: 3px solid #3dbfff;
-        }
-        .stat-card:hover {
-            transform: translateY(-5px);
-        }
-        .stat-label {
-            font-size: 0.9rem;
-            color: #a0a3ad;
-            margin-bottom: 0.5rem;
-        }
-        .stat-value {
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #3dbfff;
-        }
-        .stat-trend {
-            font-size: 0.8rem;
-            margin-top: 0.5rem;
-            color: #a0a3ad;
-        }
-        .trend-up {
-            color: #4CAF50;
-        }
-        .trend-down {
-            color: #e53935;
-        }
-        /* Override Streamlit elements for dark mode */
-        .stButton button {
-            background-color: #3e4251;
-            color: #e4e6eb;
-            border: none;
-        }
-        .stButton button:hover {
-            background-color: #4c506b;
-            color: #ffffff;
-        }
-        .element-container, div.row-widget.stButton, div.row-widget.stDownloadButton {
-            background-color: transparent !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-    
     account = get_account_details(st.session_state.username)
     user = get_user_details(st.session_state.username)
     
@@ -2130,7 +1254,7 @@ def dashboard_page():
         st.markdown(f'''
         <div class="balance-card">
             <h2>Current Balance</h2>
-            <div class="balance-amount">₹{account["balance"]:,.2f}</div>
+            <div class="balance-amount">{format_money(account["balance"])}</div>
             <p style="color: #a0a3ad;">Available to spend</p>
         </div>
         ''', unsafe_allow_html=True)
@@ -2138,45 +1262,19 @@ def dashboard_page():
     # Quick stats
     st.markdown('<div class="quick-stats">', unsafe_allow_html=True)
     
-    # Get transaction data for stats
-    transactions = get_transactions(st.session_state.username)
-    
-    # Calculate monthly income (credits in the current month)
-    current_month = datetime.datetime.now().month
-    current_year = datetime.datetime.now().year
-    
-    monthly_income = sum([
-        tx["amount"] for tx in transactions 
-        if tx["type"] == "credit" 
-        and datetime.datetime.fromisoformat(tx["timestamp"]).month == current_month
-        and datetime.datetime.fromisoformat(tx["timestamp"]).year == current_year
-    ])
-    
-    # Calculate monthly expenses (debits in the current month)
-    monthly_expenses = sum([
-        tx["amount"] for tx in transactions 
-        if tx["type"] == "debit" 
-        and datetime.datetime.fromisoformat(tx["timestamp"]).month == current_month
-        and datetime.datetime.fromisoformat(tx["timestamp"]).year == current_year
-    ])
-    
-    # Calculate previous month stats for trends
-    prev_month = current_month - 1 if current_month > 1 else 12
-    prev_year = current_year if current_month > 1 else current_year - 1
-    
-    prev_income = sum([
-        tx["amount"] for tx in transactions 
-        if tx["type"] == "credit" 
-        and datetime.datetime.fromisoformat(tx["timestamp"]).month == prev_month
-        and datetime.datetime.fromisoformat(tx["timestamp"]).year == prev_year
-    ])
-    
-    prev_expenses = sum([
-        tx["amount"] for tx in transactions 
-        if tx["type"] == "debit" 
-        and datetime.datetime.fromisoformat(tx["timestamp"]).month == prev_month
-        and datetime.datetime.fromisoformat(tx["timestamp"]).year == prev_year
-    ])
+    # Month windows for this month and last month
+    now = datetime.datetime.now()
+    month_start = datetime.datetime(now.year, now.month, 1)
+    prev_month_start = datetime.datetime(now.year - (now.month == 1), (now.month - 2) % 12 + 1, 1)
+    
+    # Monthly income and expenses (credits and debits in each month's rollup bucket)
+    current_totals = rollups.user_bucket(st.session_state.username, "month", month_start.strftime("%Y-%m"))
+    prev_totals = rollups.user_bucket(st.session_state.username, "month", prev_month_start.strftime("%Y-%m"))
+    
+    monthly_income = current_totals["credit"]
+    monthly_expenses = current_totals["debit"]
+    prev_income = prev_totals["credit"]
+    prev_expenses = prev_totals["debit"]
     
     # Calculate trend percentages
     income_trend = ((monthly_income - prev_income) / max(prev_income, 1)) * 100 if prev_income > 0 else 100
@@ -2186,7 +1284,7 @@ def dashboard_page():
     st.markdown(f'''
     <div class="stat-card">
         <div class="stat-label">Monthly Income</div>
-        <div class="stat-value">₹{monthly_income:,.2f}</div>
+        <div class="stat-value">{format_money(monthly_income)}</div>
         <div class="stat-trend {'trend-up' if income_trend >= 0 else 'trend-down'}">
             {'+' if income_trend >= 0 else ''}{income_trend:.1f}% from last month
         </div>
@@ -2197,7 +1295,7 @@ def dashboard_page():
     st.markdown(f'''
     <div class="stat-card">
         <div class="stat-label">Monthly Expenses</div>
-        <div class="stat-value">₹{monthly_expenses:,.2f}</div>
+        <div class="stat-value">{format_money(monthly_expenses)}</div>
         <div class="stat-trend {'trend-down' if expense_trend <= 0 else 'trend-up'}">
             {'+' if expense_trend >= 0 else ''}{expense_trend:.1f}% from last month
         </div>
@@ -2292,89 +1390,8 @@ def dashboard_page():
         if st.button("View Transactions", key="dashboard_transactions_btn"):
             navigate_to("transactions")
         
-    # Add CSS to style the new cards and hide the buttons but keep them functional
-    st.markdown("""
-    <style>
-    /* Quick action cards styling */
-    .action-card {
-        background: rgba(40, 45, 55, 0.8);
-        border-radius: 16px;
-        padding: 20px;
-        display: flex;
-        align-items: center;
-        margin-bottom: 1rem;
-        transition: all 0.3s ease;
-        border: 1px solid rgba(50, 55, 75, 0.5);
-        box-shadow: 0 4px 10px rgba(0, 0, 0, 0.1);
-    }
-
-    .hoverable:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 20px rgba(0, 0, 0, 0.2);
-        border-color: rgba(77, 171, 247, 0.5);
-    }
-
-    .action-icon-container {
-        margin-right: 15px;
-    }
-
-    .action-icon {
-        width: 50px;
-        height: 50px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-    }
-
-    .action-icon.transfer {
-        background: rgba(0, 150, 255, 0.15);
-        color: #0096ff;
-    }
-
-    .action-icon.calculator {
-        background: rgba(255, 184, 0, 0.15);
-        color: #FFB800;
-    }
-
-    .action-icon.transactions {
-        background: rgba(0, 214, 143, 0.15);
-        color: #00d68f;
-    }
-
-    .action-content {
-        flex: 1;
-    }
-
-    .action-title {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #ffffff;
-        margin-bottom: 4px;
-    }
-
-    .action-description {
-        font-size: 0.85rem;
-        color: #a0a3ad;
-    }
-
-    /* Hide the button text but keep the button functional */
-    .stButton button {
-        color: transparent;
-        background-color: transparent !important;
-        border-color: transparent !important;
-        width: 100%;
-        height: 30px;
-        padding: 0;
-        margin-top: -20px;
-        position: relative;
-        z-index: 10;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Recent Transactions
-    transactions = get_transactions(st.session_state.username)
+    recent_transactions, _ = get_transactions_page(st.session_state.username, limit=5)
     
     st.markdown('''
     <div class="transactions-card">
@@ -2384,12 +1401,10 @@ def dashboard_page():
         </div>
     ''', unsafe_allow_html=True)
     
-    if not transactions:
+    if not recent_transactions:
         st.markdown('<p style="text-align: center; padding: 2rem; color: #a0a3ad;">No transactions found</p>', unsafe_allow_html=True)
     else:
         # Display only the 5 most recent transactions
-        recent_transactions = sorted(transactions, key=lambda x: x["timestamp"], reverse=True)[:5]
-        
         for transaction in recent_transactions:
             # Format transaction date
             tx_date = datetime.datetime.fromisoformat(transaction["timestamp"]).strftime("%d %b, %Y • %I:%M %p")
@@ -2412,7 +1427,7 @@ def dashboard_page():
                     <div class="transaction-date">{tx_date}</div>
                 </div>
                 <div class="transaction-amount {transaction["type"]}">
-                    {'+' if transaction["type"] == "credit" else '-'}₹{transaction["amount"]:,.2f}
+                    {'+' if transaction["type"] == "credit" else '-'}{format_money(transaction["amount"])}
                 </div>
             </div>
             '''
@@ -2430,7 +1445,7 @@ def dashboard_page():
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Matplotlib styling for dark theme
-    plt.style.use('dark_background')
+    get_pyplot().style.use('dark_background')
 
 def home_page():
     # Use Streamlit's native components for the header section instead of HTML
@@ -2439,48 +1454,8 @@ def home_page():
         st.title("Welcome to Horizonite Bank")
         st.markdown("Your trusted partner for secure, innovative, and customer-focused banking solutions.")
         
-        # Custom CSS for buttons
+        # Script to make buttons respond on the first click
         st.markdown("""
-        <style>
-        /* Style Streamlit buttons */
-        .stButton button {
-            border-radius: 50px !important;
-            font-weight: 600 !important;
-            padding: 10px 15px !important;
-            font-size: 16px !important;
-            transition: all 0.3s ease !important;
-            box-shadow: 0 4px 10px rgba(0, 0, 0, 0.1) !important;
-            margin-top: 20px !important;
-            cursor: pointer !important;
-            position: relative !important;
-            z-index: 10 !important; /* Ensure button is above any potential overlays */
-        }
-        .stButton button:hover {
-            transform: translateY(-2px) !important;
-            box-shadow: 0 6px 15px rgba(0, 0, 0, 0.2) !important;
-        }
-        .stButton button:active {
-            transform: translateY(1px) !important; /* Add feedback on press */
-        }
-        /* Primary button (Create Account) */
-        [data-testid="stHorizontalBlock"] [data-testid="column"]:first-child .stButton button {
-            background: linear-gradient(135deg, #4F46E5 0%, #2563EB 100%) !important;
-            border: none !important;
-            color: white !important;
-        }
-        /* Secondary button (Login) */
-        [data-testid="stHorizontalBlock"] [data-testid="column"]:last-child .stButton button {
-            background: rgba(255, 255, 255, 0.1) !important;
-            border: 1px solid rgba(255, 255, 255, 0.2) !important;
-            color: white !important;
-        }
-        /* Ensure no invisible overlays */
-        [data-testid="stHorizontalBlock"] [data-testid="column"] {
-            position: relative !important;
-            z-index: 5 !important;
-        }
-        </style>
-        
         <script>
         // Fix for button click issues - ensure they respond on first click
         document.addEventListener('DOMContentLoaded', function() {
@@ -2521,41 +1496,6 @@ def home_page():
     # Create three columns for features
     feat_col1, feat_col2, feat_col3 = st.columns(3)
     
-    # Custom CSS for feature cards
-    st.markdown("""
-    <style>
-    .feature-card {
-        background-color: #2d303e;
-        border-radius: 12px;
-        padding: 25px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        text-align: center;
-        height: 100%;
-    }
-    .feature-icon {
-        width: 60px;
-        height: 60px;
-        margin: 0 auto 15px auto;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-    }
-    .secure-icon {
-        background-color: rgba(61, 191, 255, 0.15);
-        color: #3dbfff;
-    }
-    .transfer-icon {
-        background-color: rgba(76, 175, 80, 0.15);
-        color: #4CAF50;
-    }
-    .mobile-icon {
-        background-color: rgba(255, 184, 0, 0.15);
-        color: #FFB800;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Feature 1
     with feat_col1:
         st.markdown("""
@@ -2606,59 +1546,6 @@ def home_page():
     st.subheader("What Our Customers Say")
     test_col1, test_col2 = st.columns(2)
     
-    # Custom CSS for testimonials
-    st.markdown("""
-    <style>
-    .testimonial-card {
-        background-color: #2d303e;
-        border-radius: 12px;
-        padding: 25px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        position: relative;
-        height: 100%;
-    }
-    .testimonial-quote {
-        font-size: 48px;
-        position: absolute;
-        top: 10px;
-        left: 15px;
-        opacity: 0.1;
-    }
-    .testimonial-content {
-        color: #a0a3ad;
-        font-size: 16px;
-        margin-bottom: 20px;
-        position: relative;
-        z-index: 1;
-    }
-    .testimonial-author {
-        display: flex;
-        align-items: center;
-    }
-    .author-avatar {
-        width: 50px;
-        height: 50px;
-        border-radius: 50%;
-        color: white;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        margin-right: 15px;
-        font-weight: bold;
-    }
-    .author-info h4 {
-        margin: 0;
-        color: #e4e6eb;
-        font-size: 16px;
-    }
-    .author-info p {
-        margin: 0;
-        color: #6b7280;
-        font-size: 14px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Testimonial 1
     with test_col1:
         st.markdown("""
@@ -2700,24 +1587,6 @@ def home_page():
     # Pure Streamlit components for the call to action section
     cta_col1, cta_col2, cta_col3 = st.columns([1, 3, 1])
     with cta_col2:
-        # Custom CSS for CTA section to apply gradient background
-        st.markdown("""
-        <style>
-        .cta-container {
-            background: linear-gradient(135deg, #3949AB 0%, #1E3A8A 100%);
-            border-radius: 16px;
-            padding: 40px 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 6px 20px rgba(0, 0, 0, 0.15);
-            text-align: center;
-        }
-        .cta-content {
-            padding: 20px;
-            color: white;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
         # Container with content directly inside
         st.markdown("""
         <div class="cta-container">
@@ -2735,26 +1604,6 @@ def home_page():
     footer_col1, footer_col2, footer_col3 = st.columns([1, 3, 1])
     with footer_col2:
         st.markdown("""
-        <style>
-        .footer-container {
-            padding: 30px 0;
-            text-align: center;
-            border-top: 1px solid #3e4251;
-            margin-top: 40px;
-        }
-        .footer-links {
-            display: flex;
-            justify-content: center;
-            gap: 15px;
-            margin-top: 15px;
-        }
-        .footer-link {
-            color: #a0a3ad;
-            text-decoration: none;
-            font-size: 14px;
-        }
-        </style>
-        
         <div class="footer-container">
             <p style="color: #6b7280; font-size: 14px;">© 2025 Horizonite Bank. All rights reserved.</p>
             <div class="footer-links">
@@ -2778,6 +1627,13 @@ def main():
             st.session_state.current_page = "home"
             st.session_state.home_page_visited = True
     
+    # All styles of the page go out as one element (see utils.styles)
+    inject_styles(
+        "home_base",
+        "home_sidebar_nav" if st.session_state.logged_in else "home_sidebar_auth",
+        PAGE_STYLESHEETS.get(st.session_state.current_page)
+    )
+    
     if st.session_state.current_page == "home":
         home_page()
     elif st.session_state.current_page == "login":
@@ -0,0 +1,115 @@
+"""
+Benchmark building the admin transaction-monitoring DataFrame.
+
+Synthetic transactions.json / users.json / accounts.json contents
+(round-tripped through JSON as the admin page used to load them;
+1,000,000 transactions over 5,000 users by default) are flattened with
+the old per-row loop (copy every dict, look up user and account per row,
+then a second .apply over user_id). The same ledger is backfilled into a
+scratch utils.columnar.ColumnarLedger, and the frame is built the way
+pages/Admin.py builds it: utils.frames.columns_frame over one columns()
+snapshot. The two frames are checked against each other, and time and
+memory use of each are reported.
+
+Usage: python benchmarks/bench_admin_frame.py [TRANSACTIONS USERS]
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from utils.columnar import ColumnarLedger
+from utils.frames import columns_frame
+
+TRANSACTIONS = 1_000_000
+USERS = 5_000
+
+def make_data(n_transactions, n_users):
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    user_ids = [f"user{i:05d}" for i in range(n_users)]
+    users = {user_id: {"full_name": f"Customer {i}"} for i, user_id in enumerate(user_ids)}
+    accounts = {user_id: {"account_number": f"{1000000000 + i}"} for i, user_id in enumerate(user_ids)}
+    transactions = {user_id: [] for user_id in user_ids}
+
+    for i in range(n_transactions):
+        user_id = user_ids[rng.randrange(n_users)]
+        transactions[user_id].append({
+            "id": f"tx{i}",
+            "type": "credit" if rng.random() < 0.5 else "debit",
+            "amount": rng.randrange(1000, 10000000),
+            "description": rng.choice(["Deposit", "Withdrawal", "Transfer", "Loan EMI"]),
+            "timestamp": (start + timedelta(seconds=rng.randrange(365 * 86400))).isoformat()
+        })
+
+    # Round-trip through JSON so the objects are laid out as load_json_data would leave them
+    return tuple(json.loads(json.dumps(data)) for data in (transactions, users, accounts))
+
+def loop_frame(transactions, users, accounts):
+    # The per-row flattening show_transaction_monitoring used before
+    processed_transactions = []
+    for user_id, tx_list in transactions.items():
+        for tx in tx_list:
+            tx_copy = tx.copy()
+            tx_copy['transaction_id'] = tx_copy.get('id', '')
+            tx_copy['user_id'] = user_id
+            tx_copy['user_name'] = users.get(user_id, {}).get('full_name', 'Unknown User')
+            tx_copy['account_number'] = accounts.get(user_id, {}).get('account_number', 'N/A')
+            tx_copy.setdefault('type', 'N/A')
+            tx_copy.setdefault('amount', 0)
+            tx_copy.setdefault('description', 'N/A')
+            tx_copy.setdefault('timestamp', None)
+            processed_transactions.append(tx_copy)
+
+    df = pd.DataFrame(processed_transactions)
+    df['account_number'] = df['user_id'].apply(lambda uid: accounts.get(uid, {}).get('account_number', 'N/A'))
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+def snapshot_frame(store, users, accounts):
+    # What show_transaction_monitoring does with the columnar ledger
+    columns = store.columns()
+    return columns_frame(columns, store.users(), store.descriptions(), users, accounts)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    n_transactions, n_users = [int(arg) for arg in sys.argv[1:3]] or (TRANSACTIONS, USERS)
+    transactions, users, accounts = make_data(n_transactions, n_users)
+
+    loop_time, loop_df = timed(loop_frame, transactions, users, accounts)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_root:
+        # The columnar store lives under data/ relative to the working directory
+        os.chdir(data_root)
+        store = ColumnarLedger("bench", lambda: (
+            (user_id, tx) for user_id, tx_list in transactions.items() for tx in tx_list
+        )).load()
+        frame_time, frame_df = timed(snapshot_frame, store, users, accounts)
+        os.chdir(cwd)
+
+    # The columnar store keeps no transaction ids; every other column must match
+    columns = ["user_id", "user_name", "account_number", "type", "amount", "description", "timestamp"]
+    expected = loop_df[columns].reset_index(drop=True)
+    actual = frame_df[columns].astype({"user_id": object, "user_name": object, "account_number": object, "type": object})
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+    print(f"{n_transactions:,} transactions over {n_users:,} users")
+    print(f"{'method':>20} {'time (ms)':>10} {'memory (MB)':>12}")
+    for name, elapsed, df in [("per-row loop", loop_time, loop_df), ("columns_frame", frame_time, frame_df)]:
+        memory = df.memory_usage(deep=True).sum() / 1024 / 1024
+        print(f"{name:>20} {elapsed * 1000:>10.0f} {memory:>12.1f}")
+    print(f"speedup: {loop_time / frame_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark utils.amortization.calculate_emi_grid against calling
+calculate_emi once per loan.
+
+A grid of principal x rate x tenure combinations (100 x 100 x 30 by
+default, rates starting at 0% to cover the zero-rate case) is computed
+both ways, the results are checked against each other and the throughput
+of each is reported in loans per second.
+
+Usage: python benchmarks/bench_emi_grid.py [PRINCIPALS RATES TENURES]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils.amortization import calculate_emi, calculate_emi_grid
+
+GRID = (100, 100, 30)
+REPEATS = 5
+
+def best_of(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    n_principals, n_rates, n_tenures = [int(arg) for arg in sys.argv[1:4]] or GRID
+    principals = np.linspace(100_000, 10_000_000, n_principals)
+    rates = np.linspace(0.0, 20.0, n_rates)
+    tenures = np.arange(1, n_tenures + 1)
+    loans = n_principals * n_rates * n_tenures
+
+    grid_time, grid = best_of(lambda: calculate_emi_grid(
+        principals[:, None, None], rates[None, :, None], tenures[None, None, :]
+    ), REPEATS)
+
+    scalar_time, scalar = best_of(lambda: [
+        calculate_emi(principal, rate, tenure)
+        for principal in principals.tolist()
+        for rate in rates.tolist()
+        for tenure in tenures.tolist()
+    ], 1)
+
+    assert np.allclose(grid["emi"].ravel(), scalar), "grid and scalar EMIs differ"
+
+    print(f"grid of {n_principals} x {n_rates} x {n_tenures} = {loans:,} loans")
+    print(f"{'method':>20} {'time (ms)':>10} {'loans/s':>14}")
+    print(f"{'calculate_emi loop':>20} {scalar_time * 1000:>10.2f} {loans / scalar_time:>14,.0f}")
+    print(f"{'calculate_emi_grid':>20} {grid_time * 1000:>10.2f} {loans / grid_time:>14,.0f}")
+    print(f"speedup: {scalar_time / grid_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark cold-start import time of the app entry points with
+`python -X importtime`.
+
+Every entry point is executed in a fresh interpreter (in a scratch data
+directory, with Streamlit in bare mode), and the importtime report is
+summed per top-level import. The report lists total import time, wall
+time and which of the heavy plotting/data libraries were loaded. With
+lazy imports the login page should not load any of them.
+
+Usage: python benchmarks/bench_startup.py [ENTRY_POINT ...]
+"""
+import os
+import re
+import sys
+import time
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["Home.py", "main.py"]
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib.pyplot", "plotly.express", "plotly.graph_objects", "PIL.Image", "pyotp"]
+
+WORKER = """
+import sys, runpy
+sys.path.insert(0, {repo!r})
+try:
+    runpy.run_path({script!r}, run_name="__main__")
+except BaseException as e:
+    print(f"{{type(e).__name__}}: {{e}}", file=sys.stdout)
+"""
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure(entry_point):
+    """
+    Run one entry point under -X importtime
+    Returns (wall seconds, total import microseconds, {module: cumulative us}, error)
+    """
+    script = os.path.join(REPO_DIR, entry_point)
+
+    with tempfile.TemporaryDirectory() as data_root:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", WORKER.format(repo=REPO_DIR, script=script)],
+            cwd=data_root, capture_output=True, text=True
+        )
+        wall = time.perf_counter() - start
+
+    total = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules[name] = cumulative
+        # Only top-level imports count towards the total; nested ones are in their parents
+        if len(indent) == 1:
+            total += cumulative
+
+    return wall, total, modules, result.stdout.strip().splitlines()[-1:] or None
+
+def main():
+    entry_points = sys.argv[1:] or ENTRY_POINTS
+
+    for entry_point in entry_points:
+        wall, total, modules, error = measure(entry_point)
+        print(f"{entry_point}: wall {wall * 1000:.0f} ms, imports {total / 1000:.0f} ms")
+        if error:
+            print(f"  stopped at: {error[0]}")
+        for name in HEAVY_MODULES:
+            loaded = f"{modules[name] / 1000:8.1f} ms" if name in modules else "    not loaded"
+            print(f"  {name:<22} {loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark transfer latency of utils.db.transfer_funds against the size of
+the customer base.
+
+For every size a scratch data directory is prepared with a sender, a
+recipient and an account-number index holding N accounts, and the transfer
+is timed in a fresh process. With the index, latency should stay flat
+from 1k to 1M accounts.
+
+Usage: python benchmarks/bench_transfer.py [N ...]
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TRANSFERS = 200
+
+WORKER = """
+import sys, time
+sys.path.insert(0, {repo!r})
+from utils import db
+
+# Load the index before timing, as a warm server would have it in memory
+start = time.perf_counter()
+len(db.ACCOUNT_INDEX)
+load_time = time.perf_counter() - start
+
+start = time.perf_counter()
+for _ in range({transfers}):
+    success, message = db.transfer_funds("sender", 0, "NB99999999", 1, "bench")
+    assert success, message
+elapsed = time.perf_counter() - start
+print(load_time, elapsed / {transfers})
+"""
+
+def make_user(user_id, account_number, balance):
+    return {
+        "user_id": user_id,
+        "full_name": user_id,
+        "email": f"{user_id}@example.com",
+        "accounts": [{"account_number": account_number, "balance": balance, "transactions": []}]
+    }
+
+def prepare(data_root, size):
+    users_dir = os.path.join(data_root, "data", "users")
+    index_dir = os.path.join(data_root, "data", "indexes")
+    os.makedirs(users_dir)
+    os.makedirs(index_dir)
+
+    # Fixtures are written in paise, so mark the install as already converted
+    with open(os.path.join(data_root, "data", "money.json"), 'w') as f:
+        json.dump({"unit": "paise"}, f)
+
+    for user in [make_user("sender", "NB00000000", 10 ** 9), make_user("recipient", "NB99999999", 0)]:
+        with open(os.path.join(users_dir, f"{user['user_id']}.json"), 'w') as f:
+            json.dump(user, f)
+
+    # Synthetic index entries stand in for the rest of the customer base
+    with open(os.path.join(index_dir, "account_numbers.jsonl"), 'w') as f:
+        f.write('["NB00000000",["sender",0]]\n["NB99999999",["recipient",0]]\n')
+        for i in range(1, size - 1):
+            f.write(f'["NB{i:08d}",["user{i}",0]]\n')
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'accounts':>10} {'index load (s)':>15} {'transfer (ms)':>14}")
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_root:
+            prepare(data_root, size)
+            output = subprocess.run(
+                [sys.executable, "-c", WORKER.format(repo=REPO_DIR, transfers=TRANSFERS)],
+                cwd=data_root, capture_output=True, text=True, check=True
+            ).stdout
+            load_time, per_transfer = map(float, output.split())
+            print(f"{size:>10,} {load_time:>15.3f} {per_transfer * 1000:>14.3f}")
+
+if __name__ == "__main__":
+    main()
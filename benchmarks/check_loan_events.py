@@ -0,0 +1,62 @@
+"""
+Regression check for utils.amortization.simulate_loan with events at
+every month of the loan, including the last one.
+
+The EMI calculator lets an event fall on any month up to the tenure, so
+for a set of loans every month is tried with a rate reset and with a
+prepayment, re-planning both the tenure and the EMI. Every schedule must
+be finite, end at a zero balance and repay exactly the principal. A rate
+reset after the last EMI (e.g. Rs 10,000 at 8.5% over 240 months, reset
+at month 240) used to re-plan over zero months and divide by zero.
+
+Usage: python benchmarks/check_loan_events.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils.amortization import simulate_loan
+
+PRINCIPALS = [10_000, 2_500_000]
+RATES = [0.0, 8.5]
+TENURES = [1, 12, 240]
+
+def events_for(principal, rate, month):
+    """Yield the event lists tried at one month."""
+    for reduce in ("tenure", "emi"):
+        for new_rate in (0.0, rate + 0.5, 20.0):
+            yield [{"month": month, "type": "rate_change", "rate": new_rate, "reduce": reduce}]
+        for amount in (principal / 2, principal):
+            yield [{"month": month, "type": "prepayment", "amount": amount, "reduce": reduce}]
+
+def check(principal, rate, tenure_months, events):
+    schedule = simulate_loan(principal, rate, tenure_months, events)
+    label = f"{principal} at {rate}% over {tenure_months} months with {events}"
+
+    assert all(np.isfinite(column).all() for column in schedule.values()), f"non-finite schedule: {label}"
+    assert schedule["balance"][-1] == 0.0, f"balance left: {label}"
+    repaid = schedule["principal"].sum() + schedule["prepayment"].sum()
+    assert abs(repaid - principal) < 0.01, f"repaid {repaid:.2f}: {label}"
+
+def main():
+    # The case that used to raise ZeroDivisionError
+    check(10_000, 8.5, 240, [{"month": 240, "type": "rate_change", "rate": 9.0, "reduce": "emi"}])
+
+    start = time.perf_counter()
+    runs = 0
+    for principal in PRINCIPALS:
+        for rate in RATES:
+            for tenure_months in TENURES:
+                for month in range(1, tenure_months + 1):
+                    for events in events_for(principal, rate, month):
+                        check(principal, rate, tenure_months, events)
+                        runs += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{runs:,} simulations in {elapsed:.2f}s, all schedules repay the principal")
+
+if __name__ == "__main__":
+    main()
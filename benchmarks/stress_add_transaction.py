@@ -0,0 +1,110 @@
+"""
+Stress test for per-user locking in utils.db.atomic_transaction.
+
+Many threads (optionally spread over several processes) call
+utils.db.add_transaction concurrently against a handful of users. Every
+credit is 1, so once all workers finish each user's balance and transaction
+count, and the bank-wide monthly rollups, must equal the number of postings
+made; any lost update shows up as a shortfall.
+
+Usage: python benchmarks/stress_add_transaction.py [--users N] [--threads N]
+       [--processes N] [--postings N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_threads(data_root, users, threads, postings):
+    os.chdir(data_root)
+    sys.path.insert(0, REPO_DIR)
+    from utils import db
+
+    errors = []
+
+    def worker(worker_id):
+        for i in range(postings):
+            user_id = f"user{(worker_id + i) % users}"
+            success, message = db.add_transaction(user_id, 0, "credit", 1, f"stress {worker_id}/{i}")
+            if not success:
+                errors.append(message)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} postings failed, first: {errors[0]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--postings", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_root:
+        users_dir = os.path.join(data_root, "data", "users")
+        os.makedirs(users_dir)
+
+        # Fixtures are written in paise, so mark the install as already converted
+        with open(os.path.join(data_root, "data", "money.json"), 'w') as f:
+            json.dump({"unit": "paise"}, f)
+
+        for n in range(args.users):
+            with open(os.path.join(users_dir, f"user{n}.json"), 'w') as f:
+                json.dump({"user_id": f"user{n}", "accounts": [{"account_number": f"NB{n:08d}", "balance": 0}]}, f)
+
+        start = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=run_threads, args=(data_root, args.users, args.threads, args.postings))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        if any(process.exitcode != 0 for process in processes):
+            sys.exit("A worker process failed")
+
+        expected = args.processes * args.threads * args.postings
+        total_balance = 0
+        total_transactions = 0
+        for n in range(args.users):
+            with open(os.path.join(users_dir, f"user{n}.json"), 'r') as f:
+                account = json.load(f)["accounts"][0]
+            total_balance += account["balance"]
+            total_transactions += len(account.get("transactions", []))
+
+        # Read the rollups the workers maintained, from the same data directory
+        os.chdir(data_root)
+        sys.path.insert(0, REPO_DIR)
+        from utils.rollups import get_account_rollups
+        buckets = get_account_rollups().bank_buckets("month").values()
+        rollup_credit = sum(bucket["credit"] for bucket in buckets)
+        rollup_count = sum(bucket["credit_count"] for bucket in buckets)
+
+        print(f"{expected} postings in {elapsed:.2f}s ({expected / elapsed:,.0f}/s)")
+        print(f"balance total: {total_balance}, transactions: {total_transactions}")
+        print(f"monthly rollups: {rollup_credit} credited in {rollup_count} postings")
+
+        if total_balance != expected or total_transactions != expected:
+            sys.exit(f"Lost updates: expected {expected}")
+        if rollup_credit != expected or rollup_count != expected:
+            sys.exit(f"Lost rollup increments: expected {expected}")
+
+        print("No lost updates")
+
+if __name__ == "__main__":
+    main()
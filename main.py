@@ -1,17 +1,10 @@
 import streamlit as st
 import os
-import json
 import hashlib
 import base64
 import time
 import uuid
 from datetime import datetime, timedelta
-import pyotp
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
 import re
 import smtplib
 from email.mime.text import MIMEText
@@ -20,8 +13,11 @@ import random
 import string
 from streamlit_option_menu import option_menu
 from utils.auth import login_user, register_user, verify_otp, generate_otp, send_otp_email
-from utils.db import save_user_data, load_user_data, get_all_users, atomic_transaction
+from utils.db import load_user_data, get_all_users, atomic_transaction, revalidate_user_data
 from utils.security import hash_password, verify_password, generate_session_id
+from utils.styles import inject_styles
+from utils.activity_log import get_activity_logger
+from utils.money import to_paise, format_money, ensure_paise
 from pages.dashboard import show_dashboard
 from pages.transactions import show_transactions, perform_transfer
 from pages.Loans import show_loans, show_emi_calculator
@@ -30,6 +26,9 @@ from pages.Admin import show_admin_panel
 from pages.Help import show_help
 from home import *
 
+# Amounts are stored in paise; an older install is converted before any user file is read
+ensure_paise()
+
 # Set page configuration
 st.set_page_config(
     page_title="Nuvana Bank",
@@ -38,11 +37,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load custom CSS
+# Load custom CSS (read from disk once per process, see utils.styles)
 css_file = "assets/css/style.css"
 try:
-    with open(css_file) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    inject_styles("style")
 except FileNotFoundError:
     st.warning(f"CSS file {css_file} not found. Some styles may not be applied correctly.")
     # Use basic styles as fallback
@@ -61,6 +59,8 @@ if 'user_id' not in st.session_state:
     st.session_state.user_id = None
 if 'user_data' not in st.session_state:
     st.session_state.user_data = None
+if 'user_data_signature' not in st.session_state:
+    st.session_state.user_data_signature = None
 if 'session_id' not in st.session_state:
     st.session_state.session_id = None
 if 'last_activity' not in st.session_state:
@@ -125,29 +125,16 @@ def set_notification(message, type="info"):
 
 # Function to log activity
 def log_activity(user_id, activity_type, details=None):
-    timestamp = datetime.now().isoformat()
-    log_entry = {
-        "timestamp": timestamp,
+    """
+    Queue an activity entry for the background logger (see utils.activity_log);
+    never blocks on disk
+    """
+    get_activity_logger().log({
+        "timestamp": datetime.now().isoformat(),
         "user_id": user_id,
         "activity_type": activity_type,
         "details": details
-    }
-    
-    log_file = f"data/logs/activity_log_{datetime.now().strftime('%Y%m%d')}.json"
-    
-    try:
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        logs.append(log_entry)
-        
-        with open(log_file, 'w') as f:
-            json.dump(logs, f, indent=4)
-    except Exception as e:
-        print(f"Error logging activity: {e}")
+    })
 
 # Login page
 def show_login_page():
@@ -332,6 +319,9 @@ def show_registration_page():
                 elif not terms:
                     st.error("Please agree to the terms and conditions")
                 else:
+                    # Amounts are stored in paise
+                    initial_deposit = to_paise(initial_deposit)
+                    
                     # Create user data
                     user_data = {
                         "user_id": str(uuid.uuid4()),
@@ -379,8 +369,8 @@ def show_registration_page():
                         "role": "user"  # Default role
                     }
                     
-                    # Save user data
-                    success, message = save_user_data(user_data)
+                    # Register the user, which reserves the email and account number first
+                    success, message = register_user(user_data)
                     
                     if success:
                         log_activity(user_data["user_id"], "registration", {"email": email})
@@ -416,8 +406,12 @@ def main():
             show_login_page()
         return
     
-    # Load user data
-    user_data = load_user_data(st.session_state.user_id)
+    # Reuse the session's copy of the user data unless another writer has saved a newer version
+    user_data, st.session_state.user_data_signature = revalidate_user_data(
+        st.session_state.user_id,
+        st.session_state.user_data,
+        st.session_state.user_data_signature
+    )
     if not user_data:
         st.session_state.logged_in = False
         st.error("User data not found. Please log in again.")
@@ -433,7 +427,7 @@ def main():
         # Display account number and balance
         primary_account = user_data["accounts"][0]
         st.markdown(f"<p>Account: {primary_account['account_number']}</p>", unsafe_allow_html=True)
-        st.markdown(f"<p class='balance'>Balance: ₹{primary_account['balance']:,.2f}</p>", unsafe_allow_html=True)
+        st.markdown(f"<p class='balance'>Balance: {format_money(primary_account['balance'])}</p>", unsafe_allow_html=True)
         
         # Navigation menu
         selected = option_menu(
@@ -8,46 +8,20 @@ except:
 
 import pandas as pd
 from datetime import datetime, timedelta
-import json
-import os
-import json
-# Handle missing utils module gracefully
-try:
-    from utils.db import get_all_users
-except ModuleNotFoundError:
-    # Define a fallback function if the module is missing
-    def get_all_users():
-        return {}  # Return empty data
-    
+from utils.storage import get_storage
+from utils.columnar import get_ledger_columns
+from utils.styles import inject_styles
+from utils.messages import get_contact_store
+from utils.frames import columns_frame, with_display_columns
+from utils.money import format_money
 import plotly.express as px
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
-USERS_FILE = os.path.join(DATA_DIR, 'users.json')
-ACCOUNTS_FILE = os.path.join(DATA_DIR, 'accounts.json')
-TRANSACTIONS_FILE = os.path.join(DATA_DIR, 'transactions.json')
-CONTACT_MESSAGES_FILE = os.path.join(DATA_DIR, 'contact_messages.json')
-
 # Initialize session state for login persistence
 if 'admin_logged_in' not in st.session_state:
     st.session_state.admin_logged_in = False
 
-def load_json_data(file_path):
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        st.error(f"Error decoding JSON from {os.path.basename(file_path)}")
-        return {}
-
-def save_json_data(file_path, data):
-    try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
-        return True, "Data saved successfully"
-    except Exception as e:
-        return False, f"Error saving data: {e}"
+# Storage backend shared with Home.py for users, accounts and transactions
+storage = get_storage()
 
 # Predefined admin credentials
 ADMIN_CREDENTIALS = {
@@ -70,23 +44,8 @@ def show_login_form():
                 st.error("Invalid email or password")
 
 def show_admin_page():
-    # Add custom CSS to provide more spacing above the title
-    st.markdown("""
-    <style>
-    .main > div:first-child {
-        padding-top: 30px;
-    }
-    div[data-testid="stAppViewBlockContainer"] > div:first-child {
-        margin-top: 20px;
-    }
-    h1:first-of-type {
-        margin-top: 20px;
-        padding-top: 20px;
-        font-size: 36px;
-        font-weight: 600;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Page styles, plus the panel's once logged in (assets/css/admin_*.css)
+    inject_styles("admin_base", "admin_panel" if st.session_state.admin_logged_in else None)
     
     # Add some vertical space before the title
     st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
@@ -105,47 +64,6 @@ def show_admin_page():
         show_login_form()
 
 def show_admin_panel_content():
-    # Add CSS for better tab styling
-    st.markdown("""
-    <style>
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        margin-bottom: 20px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 45px;
-        white-space: pre-wrap;
-        font-size: 28px;
-        font-weight: 900;
-        background-color: #262730;
-        border-radius: 4px;
-        padding: 5px 10px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        min-width: 200px;
-        max-width: 250px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #4F4FD3 !important;
-        color: white !important;
-    }
-    /* Custom styling for tab text */
-    .stTabs [data-baseweb="tab-highlight"] {
-        display: none;
-    }
-    .stTabs [data-baseweb="tab"] [data-testid="stMarkdownContainer"] p {
-        font-weight: 900;
-        margin: 0;
-        padding: 0;
-        line-height: 1;
-        transform: scale(1.1);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Create tabs for different admin functions with larger font and better styling
     tab1, tab2, tab3 = st.tabs(["User Management", "Transaction Monitoring", "Contact Messages"])
     
@@ -162,254 +80,17 @@ def show_user_management():
     # Import pandas locally to ensure it's available in this function
     import pandas as pd
     
-    # Add enhanced styling for user management section
-    st.markdown("""
-    <style>
-    /* User Management Section Styling */
-    .user-management-header {
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        margin-bottom: 20px;
-    }
-    .user-management-title {
-        font-size: 24px;
-        font-weight: 600;
-        color: #ffffff;
-        margin: 0;
-    }
-    .user-card {
-        background-color: #1E1E1E;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        margin-bottom: 20px;
-        border-left: 4px solid #4F4FD3;
-    }
-    .user-metrics {
-        display: flex;
-        gap: 15px;
-        margin-bottom: 20px;
-        flex-wrap: nowrap;
-        overflow-x: auto;
-        white-space: nowrap;
-        padding-bottom: 10px;
-    }
-    .metric-card {
-        background-color: #1e1e2d;
-        border-radius: 8px;
-        padding: 20px 25px;
-        flex: 1 0 auto; /* Don't shrink, grow if possible, start at auto */
-        min-width: 200px; /* Minimum width to prevent excessive narrowing */
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .metric-card.green {
-        border-left: 5px solid #4CAF50;
-    }
-    .metric-card.red {
-        border-left: 5px solid #F44336;
-    }
-    .metric-card h4 {
-        margin: 0;
-        color: #ffffff;
-        font-size: 18px;
-        font-weight: 500;
-    }
-    .metric-card p {
-        margin: 15px 0 0 0;
-        font-size: 28px;
-        font-weight: bold;
-        color: #ffffff;
-    }
-    .user-filters {
-        background-color: #262730;
-        border-radius: 8px;
-        padding: 15px;
-        margin-bottom: 20px;
-    }
-    .user-table {
-        background-color: #1E1E1E;
-        border-radius: 8px;
-        padding: 20px;
-        margin-bottom: 30px;
-    }
-    .user-details-container {
-        display: flex;
-        gap: 20px;
-    }
-    .user-profile {
-        background-color: #1E1E1E;
-        border-radius: 8px;
-        padding: 20px;
-        width: 100%;
-    }
-    .user-avatar {
-        width: 100px;
-        height: 100px;
-        border-radius: 50%;
-        background-color: #4F4FD3;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        margin: 0 auto 20px;
-        font-size: 40px;
-        color: white;
-        font-weight: bold;
-    }
-    .profile-header {
-        text-align: center;
-        margin-bottom: 30px;
-    }
-    .profile-header h3 {
-        margin: 10px 0;
-        font-size: 22px;
-        font-weight: 600;
-    }
-    .profile-header p {
-        margin: 0;
-        color: #AAAAAA;
-        font-size: 15px;
-    }
-    .profile-section {
-        margin-bottom: 25px;
-    }
-    .profile-section h4 {
-        font-size: 16px;
-        font-weight: 600;
-        margin-bottom: 15px;
-        color: #CCCCCC;
-        border-bottom: 1px solid #333333;
-        padding-bottom: 8px;
-    }
-    .profile-field {
-        display: flex;
-        margin-bottom: 12px;
-    }
-    .field-label {
-        flex: 0 0 120px;
-        color: #AAAAAA;
-        font-size: 14px;
-    }
-    .field-value {
-        flex: 1;
-        font-size: 14px;
-        font-weight: 500;
-    }
-    .action-buttons {
-        display: flex;
-        gap: 15px;
-        margin-top: 20px;
-    }
-    .action-button {
-        flex: 1;
-        text-align: center;
-        padding: 10px;
-        border-radius: 5px;
-        font-weight: 500;
-        cursor: pointer;
-        transition: background-color 0.3s;
-    }
-    .action-button.primary {
-        background-color: #4F4FD3;
-        color: white;
-    }
-    .action-button.danger {
-        background-color: #E53935;
-        color: white;
-    }
-    .action-button.secondary {
-        background-color: #333333;
-        color: white;
-    }
-    .status-badge {
-        display: inline-block;
-        padding: 3px 8px;
-        border-radius: 4px;
-        font-size: 12px;
-        font-weight: 500;
-    }
-    .status-active {
-        background-color: #4CAF50;
-        color: white;
-    }
-    .status-blocked {
-        background-color: #F44336;
-        color: white;
-    }
-    .status-pending {
-        background-color: #FF9800;
-        color: white;
-    }
-    .search-box {
-        background-color: #262730;
-        border-radius: 8px;
-        padding: 15px 20px;
-        margin-bottom: 20px;
-    }
-    /* Styling for the data table control buttons */
-    .stButton > button {
-        background-color: #2e3346;
-        color: white;
-        border: 1px solid #3e4251;
-        border-radius: 6px;
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        background-color: #4F4FD3;
-        border-color: #4F4FD3;
-        transform: translateY(-2px);
-    }
-    /* Buttons that already have a primary style */
-    button[kind="primary"] {
-        background-color: #4F4FD3 !important;
-        border-color: #4F4FD3 !important;
-    }
-    /* Add styles for the full-screen mode */
-    .dataframe-fullscreen {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        z-index: 9999;
-        background-color: #1a1c23;
-        padding: 20px;
-        overflow: auto;
-    }
-    /* Style for print view */
-    @media print {
-        body * {
-            visibility: hidden;
-        }
-        .user-table, .user-table * {
-            visibility: visible;
-        }
-        .user-table {
-            position: absolute;
-            left: 0;
-            top: 0;
-            width: 100%;
-        }
-        /* Hide elements not needed in print */
-        .stButton, .stSelectbox, .stDownloadButton {
-            display: none !important;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     # Header with metrics
     st.markdown('<div class="user-management-header">', unsafe_allow_html=True)
     st.markdown('<h2 class="user-management-title">User Management</h2>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-    # Load data directly from JSON files
-    users_data = load_json_data(USERS_FILE)
-    accounts_data = load_json_data(ACCOUNTS_FILE)
+    # Load users and accounts (with current balances) through the storage backend
+    users_data = storage.get_users()
+    accounts_data = storage.get_accounts()
 
     if not users_data:
-        st.info("No users found in users.json")
+        st.info("No users found")
         return
 
     # Create a list of user summaries
@@ -474,7 +155,7 @@ def show_user_management():
         st.markdown(f"""
         <div class="metric-card green">
             <h4>Total Balance</h4>
-            <p>₹{total_balance:,.2f}</p>
+            <p>{format_money(total_balance)}</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -499,7 +180,7 @@ def show_user_management():
         else:
             df["joined_date"] = "N/A"
             
-        df["balance_formatted"] = df["balance"].apply(lambda x: f"₹{x:,.2f}")
+        df["balance_formatted"] = df["balance"].apply(format_money)
         
         # Apply search filter if provided
         if search_query:
@@ -846,7 +527,7 @@ def show_user_management():
                         account_fields = [
                             ("Account Number", account_data.get('account_number', 'N/A')),
                             ("Account Type", account_data.get('account_type', 'N/A')),
-                            ("Balance", f"₹{account_data.get('balance', 0):,.2f}"),
+                            ("Balance", format_money(account_data.get('balance', 0))),
                             ("Status", account_data.get('status', 'N/A')),
                             ("Created At", account_data.get('created_at', 'N/A')),
                         ]
@@ -881,22 +562,18 @@ def show_user_management():
                 current_status = user_data.get("status", "Active")
                 if current_status == "Blocked":
                     if st.button("Unblock User", key="unblock_user", use_container_width=True):
-                        users_data[selected_user_id]["status"] = "Active"
-                        success, message = save_json_data(USERS_FILE, users_data)
-                        if success:
+                        if storage.update_user(selected_user_id, {"status": "Active"}):
                             st.success("User unblocked successfully")
                             st.rerun()
                         else:
-                            st.error(message)
+                            st.error("User not found")
                 else:
                     if st.button("Block User", key="block_user", use_container_width=True):
-                        users_data[selected_user_id]["status"] = "Blocked"
-                        success, message = save_json_data(USERS_FILE, users_data)
-                        if success:
+                        if storage.update_user(selected_user_id, {"status": "Blocked"}):
                             st.success("User blocked successfully")
                             st.rerun()
                         else:
-                            st.error(message)
+                            st.error("User not found")
                 
                 st.markdown('</div>', unsafe_allow_html=True)
                 st.markdown('</div>', unsafe_allow_html=True)
@@ -906,195 +583,30 @@ def show_user_management():
 def show_transaction_monitoring():
     st.subheader("Transaction Monitoring")
     
-    # Load transaction data directly from JSON file
-    all_transactions_dict = load_json_data(TRANSACTIONS_FILE)
-    users_data = load_json_data(USERS_FILE) # Need user data for names
-    accounts_data = load_json_data(ACCOUNTS_FILE) # Load account data for account numbers
-
-    if not all_transactions_dict:
-        st.info("No transactions found in transactions.json")
-        return
-
-    processed_transactions = []
-    # Assuming transactions_data structure is {user_id: [ {id, type, amount, description, timestamp}, ... ]}
-    for user_id, tx_list in all_transactions_dict.items():
-        if not isinstance(tx_list, list):
-            continue
-        for tx in tx_list:
-            tx_copy = tx.copy()
-            # Map fields
-            tx_copy['transaction_id'] = tx_copy.get('id', '')
-            tx_copy['user_id'] = user_id
-            user_info = users_data.get(user_id, {})
-            tx_copy['user_name'] = user_info.get('full_name', 'Unknown User')
-            # Add account number from accounts.json
-            account_info = accounts_data.get(user_id, {})
-            tx_copy['account_number'] = account_info.get('account_number', 'N/A')
-            # Ensure other essential fields have defaults
-            tx_copy.setdefault('type', 'N/A')
-            tx_copy.setdefault('amount', 0)
-            tx_copy.setdefault('description', 'N/A')
-            tx_copy.setdefault('timestamp', None)
-            processed_transactions.append(tx_copy)
-
-    if not processed_transactions:
-        st.info("No transactions available to display.")
+    # Cards, charts and the table are all built from one snapshot of the columnar ledger,
+    # which is backfilled from the storage backend and appended to on every posting
+    ledger_columns = get_ledger_columns()
+    columns = ledger_columns.columns()
+    users_data = storage.get_users() # Need user data for names
+    accounts_data = storage.get_accounts() # Load account data for account numbers
+
+    if len(columns["epoch"]) == 0:
+        st.info("No transactions found")
         return
 
-    # Create DataFrame for display
-    df = pd.DataFrame(processed_transactions)
-    # Map actual account numbers from accounts_data into DataFrame
-    df['account_number'] = df['user_id'].apply(lambda uid: accounts_data.get(uid, {}).get('account_number', 'N/A'))
+    # One row per posting, with user names and account numbers joined in
+    df = columns_frame(columns, ledger_columns.users(), ledger_columns.descriptions(), users_data, accounts_data)
 
-    # Post-processing checks for DataFrame (optional but safer)
-    if df.empty:
-        st.info("No processable transactions found.")
-        return
-
-    # Ensure essential columns exist after DataFrame creation, assign defaults if needed
-    for col in ['transaction_id', 'user_name', 'account_number', 'type', 'description']:
-        if col not in df.columns: df[col] = 'N/A'
-    if 'amount' not in df.columns: df['amount'] = 0
-    if 'timestamp' not in df.columns: df['timestamp'] = pd.NaT # Use NaT for missing timestamps
-    
     # Format the DataFrame
     if not df.empty:
-        # Add custom CSS to make better use of space
-        st.markdown("""
-        <style>
-        .block-container {
-            padding-top: 1rem;
-            padding-bottom: 0rem;
-            margin-top: 0px;
-            max-width: 100% !important;
-            padding-left: 1rem !important;
-            padding-right: 1rem !important;
-        }
-        .element-container {
-            margin-bottom: 0.5rem;
-        }
-        .stDataFrame {
-            height: 650px;
-            overflow: auto;
-            width: 100% !important;
-        }
-        .stDataFrame [data-testid="stDataFrameResizable"] {
-            width: 100% !important;
-            max-width: none !important;
-        }
-        /* Stat cards styling */
-        .stat-card-container {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        .stat-card {
-            flex: 1;
-            padding: 20px 25px;
-            border-radius: 8px;
-            background-color: #262730;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            border-left: 5px solid #4CAF50;
-        }
-        .stat-card.debit {
-            border-left: 5px solid #F44336;
-        }
-        .stat-card h4 {
-            margin: 0;
-            color: #ffffff;
-            font-size: 18px;
-            font-weight: 500;
-        }
-        .stat-card p {
-            margin: 10px 0 0 0;
-            font-size: 28px;
-            font-weight: bold;
-            color: #ffffff;
-        }
-        /* Analytics container */
-        .analytics-container {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        .chart-container {
-            flex: 1;
-            background-color: #1E1E1E;
-            border-radius: 8px;
-            padding: 15px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }
-        .section-header {
-            font-size: 24px;
-            font-weight: 600;
-            margin-top: 30px;
-            margin-bottom: 20px;
-            color: #ffffff;
-        }
-        /* Tab styling */
-        div[data-testid="stHorizontalBlock"] {
-            gap: 0px !important;
-        }
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 0px;
-        }
-        .stTabs [data-baseweb="tab"] {
-            padding: 10px 24px;
-            background-color: #2C2C3C;
-        }
-        .stTabs [data-baseweb="tab"][aria-selected="true"] {
-            background-color: #4F4FD3 !important;
-            color: white !important;
-        }
-        /* Filter section */
-        .filter-section {
-            background-color: #1E1E1E;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-        }
-        /* Sort panel styling */
-        .sort-panel {
-            background-color: #1E1E1E;
-            border-radius: 8px;
-            padding: 15px;
-            margin-bottom: 15px;
-        }
-        /* Styling for labels */
-        .sort-label {
-            color: #7f8fa6 !important;
-            font-size: 14px !important;
-            font-weight: 500 !important;
-            margin-bottom: 8px !important;
-        }
-        /* Dropdown styling */
-        .stSelectbox [data-baseweb="select"] {
-            background-color: #232838 !important;
-            border-radius: 4px !important;
-            border: none !important;
-            padding: 5px !important;
-        }
-        .stSelectbox [data-baseweb="select"] div {
-            background-color: #232838 !important;
-            color: white !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
-        df["amount_formatted"] = df.apply(
-            lambda row: f"+₹{row['amount']:,.2f}" if row["type"] == "credit" else f"-₹{row['amount']:,.2f}",
-            axis=1
-        )
-        
-        # Sort by timestamp (newest first)
-        df = df.sort_values("timestamp", ascending=False)
+        # Sort by timestamp (newest first); rows are in posting order, which breaks ties within a second
+        df = df.sort_values(["timestamp", "transaction_id"], ascending=False)
         
         # Add summary statistics at the top
         total_transactions = len(df)
-        total_credit = df[df["type"] == "credit"]["amount"].sum()
-        total_debit = df[df["type"] == "debit"]["amount"].sum()
+        type_totals = ledger_columns.type_totals(columns)
+        total_credit = type_totals["credit"]["amount"]
+        total_debit = type_totals["debit"]["amount"]
         
         # Use HTML for the stat cards to ensure consistent layout
         st.markdown(f"""
@@ -1105,11 +617,11 @@ def show_transaction_monitoring():
             </div>
             <div class="stat-card">
                 <h4>Total Credits</h4>
-                <p>₹{total_credit:,.2f}</p>
+                <p>{format_money(total_credit)}</p>
             </div>
             <div class="stat-card debit">
                 <h4>Total Debits</h4>
-                <p>₹{total_debit:,.2f}</p>
+                <p>{format_money(total_debit)}</p>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -1185,14 +697,20 @@ def show_transaction_monitoring():
                     mock_dates.append({'date_only': d, 'type': 'debit', 'amount': 10000 - (i * 1000)})
                 date_summary = pd.DataFrame(mock_dates)
             else:
-                # Group by date and type
-                df["date_only"] = df["timestamp"].dt.date
+                # Aggregate the memory-mapped ledger columns instead of grouping every transaction
+                days, credit, debit, credit_count, debit_count = ledger_columns.daily_totals(columns)
                 
                 # Create summary by type
-                type_summary = df.groupby("type")["amount"].sum().reset_index()
+                type_summary = pd.DataFrame({
+                    'type': ['credit', 'debit'],
+                    'amount': [credit.sum() / 100, debit.sum() / 100]
+                })
                 
                 # Create summary by date
-                date_summary = df.groupby(["date_only", "type"])["amount"].sum().reset_index()
+                date_summary = pd.concat([
+                    pd.DataFrame({'date_only': days[counts > 0], 'type': tx_type, 'amount': amounts[counts > 0] / 100})
+                    for tx_type, amounts, counts in (('credit', credit, credit_count), ('debit', debit, debit_count))
+                ], ignore_index=True)
             
             st.markdown('<div class="analytics-container">', unsafe_allow_html=True)
             
@@ -1265,12 +783,12 @@ def show_transaction_monitoring():
         if transaction_type != "All":
             filtered_df = filtered_df[filtered_df["type"].str.lower() == transaction_type.lower()]
         
-        # Apply amount filter
+        # Apply amount filter (entered in rupees, stored in paise)
         if min_amount > 0:
-            filtered_df = filtered_df[filtered_df["amount"] >= min_amount]
+            filtered_df = filtered_df[filtered_df["amount"] >= min_amount * 100]
         
         if max_amount > 0:
-            filtered_df = filtered_df[filtered_df["amount"] <= max_amount]
+            filtered_df = filtered_df[filtered_df["amount"] <= max_amount * 100]
         
         # Display transactions in a card
         if filtered_df.empty:
@@ -1315,7 +833,7 @@ def show_transaction_monitoring():
                 filtered_df['sort_amount'] = filtered_df['amount']
                 sort_col = 'sort_amount'
             elif sort_field == "date":
-                sort_col = 'timestamp'
+                sort_col = ['timestamp', 'transaction_id']
             else:
                 # For other fields, use the display columns
                 sort_col = {
@@ -1342,7 +860,7 @@ def show_transaction_monitoring():
             # Display transactions in a table with increased height
             st.markdown('<div style="background-color:#1E1E1E; padding:15px; border-radius:8px; box-shadow:0 4px 10px rgba(0,0,0,0.15);">', unsafe_allow_html=True)
             # Prepare simplified columns for display to match the screenshot
-            display_df = filtered_df[["user_name", "account_number", "type", "amount_formatted", "description", "date"]].rename(
+            display_df = with_display_columns(filtered_df)[["user_name", "account_number", "type", "amount_formatted", "description", "date"]].rename(
                 columns={
                     "user_name": "name",
                     "account_number": "account",
@@ -1365,7 +883,7 @@ def show_transaction_monitoring():
             st.markdown('<div class="section-header">Suspicious Transactions</div>', unsafe_allow_html=True)
             
             # Find large transactions (over ₹50,000)
-            large_transactions = filtered_df[filtered_df["amount"] > 50000]
+            large_transactions = filtered_df[filtered_df["amount"] > 50000 * 100]
             
             if large_transactions.empty:
                 st.markdown('<div style="background-color:#1E1E1E; padding:20px; border-radius:8px; box-shadow:0 4px 10px rgba(0,0,0,0.15); text-align:center; margin-top:10px;">', unsafe_allow_html=True)
@@ -1376,7 +894,7 @@ def show_transaction_monitoring():
                 st.warning(f"{len(large_transactions)} potentially suspicious transactions (over ₹50,000)")
                 
                 # Display suspicious transactions
-                display_sus = large_transactions[["user_name", "account_number", "type", "amount_formatted", "description", "date"]].rename(
+                display_sus = with_display_columns(large_transactions)[["user_name", "account_number", "type", "amount_formatted", "description", "date"]].rename(
                     columns={
                         "user_name": "name",
                         "account_number": "account",
@@ -1394,106 +912,57 @@ def show_transaction_monitoring():
                 )
                 st.markdown('</div>', unsafe_allow_html=True)
 
+CONTACT_MESSAGE_LIMITS = [50, 100, 500]
+
 def show_contact_messages():
     st.subheader("Contact Form Messages")
     
-    # Custom CSS for contact messages section
-    st.markdown("""
-    <style>
-    .message-card {
-        background-color: #1E1E1E;
-        border-radius: 10px;
-        padding: 20px;
-        margin-bottom: 15px;
-        border-left: 4px solid #4F4FD3;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-    }
-    .message-header {
-        display: flex;
-        justify-content: space-between;
-        margin-bottom: 10px;
-        border-bottom: 1px solid #333;
-        padding-bottom: 10px;
-    }
-    .sender-info {
-        font-weight: bold;
-    }
-    .message-subject {
-        color: #4F4FD3;
-        margin-bottom: 10px;
-        font-weight: 600;
-    }
-    .message-content {
-        background-color: #262730;
-        padding: 15px;
-        border-radius: 6px;
-        margin-bottom: 10px;
-    }
-    .message-meta {
-        color: #999;
-        font-size: 0.9em;
-        text-align: right;
-    }
-    .message-actions {
-        display: flex;
-        justify-content: flex-end;
-        gap: 10px;
-        margin-top: 10px;
-    }
-    .filter-container {
-        background-color: #262730;
-        padding: 15px;
-        border-radius: 8px;
-        margin-bottom: 20px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Load contact messages from JSON file
-    contact_messages = load_json_data(CONTACT_MESSAGES_FILE)
+    # Only the index of the message store is read until a date range is chosen
+    store = get_contact_store()
+    oldest, newest = store.date_range()
     
-    if not contact_messages or "messages" not in contact_messages or not contact_messages["messages"]:
+    if oldest is None:
         st.info("No contact messages found.")
         return
     
-    messages_list = contact_messages["messages"]
-    
-    # Convert to DataFrame for easier filtering and display
-    df = pd.DataFrame(messages_list)
-    
-    # Sort by timestamp (newest first)
-    if "timestamp" in df.columns:
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df = df.sort_values("timestamp", ascending=False)
+    min_date, max_date = oldest.date(), newest.date()
     
     # Display filters in a container
     with st.container():
         st.markdown('<div class="filter-container">', unsafe_allow_html=True)
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
         with col1:
+            # Date range filter, defaulting to the last 30 days with messages
+            date_range = st.date_input("Date Range",
+                                      value=(max(min_date, max_date - timedelta(days=30)), max_date),
+                                      min_value=min_date,
+                                      max_value=max_date)
+            
+            if len(date_range) == 2:
+                start_date, end_date = date_range
+            else:
+                start_date, end_date = min_date, max_date
+        
+        with col2:
+            # Only the newest messages in the range are loaded
+            limit = st.selectbox("Show Newest", options=CONTACT_MESSAGE_LIMITS, index=0)
+        
+        start = datetime.combine(start_date, datetime.min.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        
+        messages_list = store.between(start, end, limit=limit)
+        total = store.count_between(start, end)
+        
+        df = pd.DataFrame(messages_list)
+        
+        with col3:
             # Filter by subject
             if "subject" in df.columns:
-                unique_subjects = sorted(df["subject"].unique())
+                unique_subjects = sorted(df["subject"].dropna().unique())
                 selected_subject = st.selectbox("Filter by Subject", 
                                                 options=["All"] + list(unique_subjects),
                                                 index=0)
-            
-        with col2:
-            # Date range filter
-            if "timestamp" in df.columns:
-                min_date = df["timestamp"].min().date()
-                max_date = df["timestamp"].max().date()
-                
-                date_range = st.date_input("Date Range",
-                                          value=(min_date, max_date),
-                                          min_value=min_date,
-                                          max_value=max_date)
-                
-                if len(date_range) == 2:
-                    start_date, end_date = date_range
-                else:
-                    start_date, end_date = min_date, max_date
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1503,14 +972,8 @@ def show_contact_messages():
     if "subject" in df.columns and selected_subject != "All":
         filtered_df = filtered_df[filtered_df["subject"] == selected_subject]
     
-    if "timestamp" in df.columns and len(date_range) == 2:
-        filtered_df = filtered_df[
-            (filtered_df["timestamp"].dt.date >= start_date) & 
-            (filtered_df["timestamp"].dt.date <= end_date)
-        ]
-    
     # Display message count
-    st.write(f"Displaying {len(filtered_df)} of {len(df)} messages")
+    st.write(f"Displaying {len(filtered_df)} of {total} messages")
     
     # Display messages as cards
     for _, message in filtered_df.iterrows():
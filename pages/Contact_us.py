@@ -1,8 +1,7 @@
 import streamlit as st
 import webbrowser
-import json
-import os
 from datetime import datetime
+from utils.messages import get_contact_store
 
 # Page configuration
 st.set_page_config(page_title="Contact Us - Horizonite Bank", layout="wide")
@@ -563,7 +562,7 @@ with right_col:
             elif not terms:
                 st.error("Please agree to our privacy policy and terms of service.")
             else:
-                # Save the contact form data to a JSON file
+                # Save the contact form data
                 contact_data = {
                     "full_name": full_name,
                     "email": email,
@@ -573,29 +572,8 @@ with right_col:
                     "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 }
                 
-                # Define the path for the JSON file
-                json_file_path = "data/contact_messages.json"
-                
-                # Create directory if it doesn't exist
-                os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
-                
-                # Check if file exists and load existing data
-                if os.path.exists(json_file_path):
-                    with open(json_file_path, "r") as f:
-                        try:
-                            all_contacts = json.load(f)
-                        except json.JSONDecodeError:
-                            # If the file is empty or has invalid JSON
-                            all_contacts = {"messages": []}
-                else:
-                    all_contacts = {"messages": []}
-                
-                # Add new message to the list
-                all_contacts["messages"].append(contact_data)
-                
-                # Save the updated data back to the file
-                with open(json_file_path, "w") as f:
-                    json.dump(all_contacts, f, indent=4)
+                # Append the message to the contact message store
+                get_contact_store().append(contact_data)
                 
                 st.success("Thank you for your message! Our team will get back to you shortly.")
     
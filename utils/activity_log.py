@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+# Base directory for activity logs
+DATA_DIR = "data"
+LOG_DIR = os.path.join(DATA_DIR, "logs")
+
+# Queue bound and flush thresholds of the background writer
+QUEUE_MAX_ENTRIES = 10000
+FLUSH_MAX_ENTRIES = 256
+FLUSH_MAX_BYTES = 256 * 1024
+FLUSH_INTERVAL = 1.0
+
+class ActivityLogger:
+    """
+    Buffered JSON-lines activity log.
+
+    log() only puts the entry on a bounded queue, so callers never wait on
+    disk. A background thread drains the queue and appends entries in
+    batches, flushing once FLUSH_MAX_ENTRIES entries or FLUSH_MAX_BYTES bytes
+    are buffered or FLUSH_INTERVAL seconds have passed. Entries go to
+    <prefix>_YYYYMMDD.jsonl by their timestamp, so files rotate daily. Each
+    batch is a single O_APPEND write, so several processes can share a file.
+    If the queue is full the entry is dropped and counted rather than blocking.
+    """
+
+    def __init__(self, directory=LOG_DIR, prefix="activity_log", max_entries=QUEUE_MAX_ENTRIES):
+        self.directory = directory
+        self.prefix = prefix
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_entries)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-logger", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def log(self, entry):
+        """
+        Queue one entry (a JSON-serializable dictionary with an ISO "timestamp")
+        Returns False if the entry was dropped because the queue is full
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every entry queued so far has been written
+        Returns True if the writer caught up within `timeout` seconds
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _path_for(self, entry):
+        day = str(entry.get("timestamp", ""))[:10].replace("-", "") or datetime.now().strftime("%Y%m%d")
+        return os.path.join(self.directory, f"{self.prefix}_{day}.jsonl")
+
+    def _write(self, batch):
+        # Group the batch by day so each file gets one append
+        files = {}
+        for entry in batch:
+            try:
+                line = json.dumps(entry, default=str) + "\n"
+            except (TypeError, ValueError) as e:
+                print(f"Error logging activity: {e}")
+                continue
+            files.setdefault(self._path_for(entry), []).append(line)
+
+        os.makedirs(self.directory, exist_ok=True)
+        for path, lines in files.items():
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, "".join(lines).encode())
+            finally:
+                os.close(fd)
+
+    def _run(self):
+        while True:
+            batch = []
+            waiters = []
+            size = 0
+            deadline = None
+
+            # Collect until a size threshold, the flush interval or a flush() request
+            while len(batch) < FLUSH_MAX_ENTRIES and size < FLUSH_MAX_BYTES:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                size += len(str(item))
+                if deadline is None:
+                    deadline = time.monotonic() + FLUSH_INTERVAL
+
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    print(f"Error logging activity: {e}")
+
+            for waiter in waiters:
+                waiter.set()
+
+_logger = None
+_logger_lock = threading.Lock()
+
+# Function to get the shared activity logger
+def get_activity_logger():
+    """
+    Get the process-wide activity logger for data/logs
+    """
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = ActivityLogger()
+    return _logger
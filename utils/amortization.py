@@ -0,0 +1,260 @@
+import math
+from functools import lru_cache
+import numpy as np
+
+# Number of cached schedules (one per principal, rate and tenure combination)
+SCHEDULE_CACHE_SIZE = 256
+
+# A balance below one paisa (in rupees) counts as paid off; float residue is no debt
+PAID_OFF_TOLERANCE = 0.01
+
+# Function to calculate EMI
+def calculate_emi(principal, rate, time):
+    """
+    Calculate the monthly EMI of a loan
+    rate is the annual interest rate in percent, time the tenure in years
+    """
+    months = time * 12  # Total number of months
+    rate = rate / (12 * 100)  # Monthly interest rate
+
+    if rate == 0:
+        return principal / months
+
+    return (principal * rate * (1 + rate) ** months) / ((1 + rate) ** months - 1)
+
+# Function to calculate EMIs for many loans at once
+def calculate_emi_grid(principals, rates, tenures):
+    """
+    Calculate EMI, total payment and total interest for arrays of loans.
+    principals, rates (annual percent) and tenures (years) follow NumPy
+    broadcasting, so a full comparison grid is e.g.
+    calculate_emi_grid(principals[:, None, None], rates[None, :, None], tenures[None, None, :]).
+    A zero rate gives principal / months, as in calculate_emi.
+    Returns dictionary with emi, total_payment and total_interest arrays
+    """
+    principals, rates, tenures = np.broadcast_arrays(
+        np.asarray(principals, dtype=float),
+        np.asarray(rates, dtype=float),
+        np.asarray(tenures, dtype=float)
+    )
+    months = tenures * 12
+    monthly_rates = rates / (12 * 100)
+
+    # Zero-rate loans are divided through by a safe rate and overwritten below
+    zero_rate = monthly_rates == 0
+    safe_rates = np.where(zero_rate, 1.0, monthly_rates)
+    growth = (1 + safe_rates) ** months
+    emi = np.where(zero_rate, principals / months, principals * safe_rates * growth / (growth - 1))
+
+    total_payment = emi * months
+    return {
+        "emi": emi,
+        "total_payment": total_payment,
+        "total_interest": total_payment - principals,
+    }
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _schedule(principal, rate, tenure_months):
+    emi = calculate_emi(principal, rate, tenure_months / 12)
+    monthly_rate = rate / (12 * 100)
+    months = np.arange(1, tenure_months + 1)
+
+    # Closed-form outstanding balance after each payment
+    if monthly_rate == 0:
+        balance = principal - emi * months
+    else:
+        growth = (1 + monthly_rate) ** months
+        balance = principal * growth - emi * (growth - 1) / monthly_rate
+    balance = np.maximum(balance, 0.0)
+    balance[-1] = 0.0  # The last payment clears the loan exactly
+
+    # Interest accrues on the balance carried into the month
+    opening = np.concatenate(([float(principal)], balance[:-1]))
+    interest = opening * monthly_rate
+
+    schedule = {
+        "month": months,
+        "opening": opening,
+        "payment": np.full(tenure_months, emi),
+        "principal": opening - balance,
+        "interest": interest,
+        "balance": balance,
+    }
+
+    # Schedules are shared between callers through the cache
+    for column in schedule.values():
+        column.setflags(write=False)
+
+    return schedule
+
+# Function to build an amortization schedule
+def amortization_schedule(principal, rate, tenure_months):
+    """
+    Get the month-by-month amortization schedule of a fixed-rate loan.
+    Every column is computed in closed form as a NumPy array, and schedules
+    are cached by (principal, rate, tenure_months), so repeated requests for
+    the same loan are free. The arrays are read-only; copy them to modify.
+    Returns dictionary with month, opening, payment, principal, interest and balance arrays
+    """
+    return _schedule(float(principal), float(rate), int(tenure_months))
+
+# Function to sample the outstanding balance at given months
+def balance_at(schedule, months):
+    """
+    Get the outstanding balance after each of `months` (0 = loan start);
+    months past the end of the schedule have a zero balance
+    Returns a NumPy array
+    """
+    balance = np.concatenate((schedule["opening"][:1], schedule["balance"]))
+    return balance[np.minimum(np.asarray(months), len(schedule["balance"]))]
+
+# Function to find how many EMIs clear a balance
+def _remaining_months(balance, monthly_rate, emi):
+    """
+    Get the number of payments of `emi` that clear `balance`,
+    or None if the EMI does not even cover the interest
+    """
+    if monthly_rate == 0:
+        return math.ceil(balance / emi - 1e-9)
+
+    remaining = 1 - balance * monthly_rate / emi
+    if remaining <= 0:
+        return None
+    return math.ceil(-math.log(remaining) / math.log(1 + monthly_rate) - 1e-9)
+
+# Function to build the schedule of a run of months with a fixed rate and EMI
+def _segment(balance, rate, emi, start_month, count):
+    monthly_rate = rate / (12 * 100)
+    steps = np.arange(1, count + 1)
+
+    if monthly_rate == 0:
+        closing = balance - emi * steps
+    else:
+        growth = (1 + monthly_rate) ** steps
+        closing = balance * growth - emi * (growth - 1) / monthly_rate
+    closing = np.maximum(closing, 0.0)
+
+    opening = np.concatenate(([balance], closing[:-1]))
+    interest = opening * monthly_rate
+
+    return {
+        "month": steps + start_month,
+        "opening": opening,
+        "emi": np.full(count, float(emi)),
+        "payment": opening + interest - closing,
+        "principal": opening - closing,
+        "interest": interest,
+        "prepayment": np.zeros(count),
+        "balance": closing,
+        "rate": np.full(count, float(rate)),
+    }
+
+# Function to simulate a loan with prepayments and rate resets
+def simulate_loan(principal, rate, tenure_months, events=()):
+    """
+    Simulate a loan through a sequence of events, each a dictionary with:
+      month   - the month (1 = first EMI) after whose payment the event applies
+      type    - "prepayment" (with "amount") or "rate_change" (with "rate", annual percent)
+      reduce  - "tenure" (keep the EMI, finish earlier) or "emi" (keep the end date), default "tenure"
+    The schedule is built in segments between events: each event costs a
+    closed-form balance lookup and one re-plan of the EMI or tenure, and the
+    months before it are never recomputed. Events on or after the last EMI
+    change nothing, and a balance below PAID_OFF_TOLERANCE counts as paid off.
+    Returns dictionary of NumPy arrays with month, opening, emi (the planned
+    instalment), payment, principal, interest, prepayment, balance and rate
+    """
+    balance = float(principal)
+    emi = calculate_emi(principal, rate, tenure_months / 12)
+    end_month = int(tenure_months)
+    month = 0
+    segments = []
+
+    for event in sorted(events, key=lambda event: event["month"]):
+        if event["month"] < 1:
+            raise ValueError("Loan events apply after an EMI, so month must be at least 1")
+        # An event on or after the last EMI has nothing left to change
+        if event["month"] >= end_month or balance < PAID_OFF_TOLERANCE:
+            break
+
+        # Run the current plan up to the event
+        if event["month"] > month:
+            segments.append(_segment(balance, rate, emi, month, event["month"] - month))
+            month = event["month"]
+            balance = float(segments[-1]["balance"][-1])
+            if balance < PAID_OFF_TOLERANCE:
+                segments[-1]["balance"][-1] = 0.0
+                end_month = month
+                break
+
+        if event["type"] == "prepayment":
+            amount = min(float(event["amount"]), balance)
+            segments[-1]["prepayment"][-1] += amount
+            segments[-1]["balance"][-1] -= amount
+            balance -= amount
+            if balance < PAID_OFF_TOLERANCE:
+                segments[-1]["balance"][-1] = 0.0
+                end_month = month
+                break
+        elif event["type"] == "rate_change":
+            rate = float(event["rate"])
+        else:
+            raise ValueError(f"Unknown loan event type: {event['type']}")
+
+        # Re-plan the rest of the loan from the current balance
+        remaining = None
+        if event.get("reduce", "tenure") == "tenure":
+            remaining = _remaining_months(balance, rate / (12 * 100), emi)
+        if remaining is None:
+            emi = calculate_emi(balance, rate, (end_month - month) / 12)
+        else:
+            end_month = month + remaining
+
+    if balance >= PAID_OFF_TOLERANCE and end_month > month:
+        segments.append(_segment(balance, rate, emi, month, end_month - month))
+        segments[-1]["balance"][-1] = 0.0  # The last payment clears the loan exactly
+
+    if not segments:
+        return {column: np.zeros(0) for column in _segment(0.0, rate, 0.0, 0, 0)}
+
+    return {
+        column: np.concatenate([segment[column] for segment in segments])
+        for column in segments[0]
+    }
+
+# Function to simulate every loan of a user
+def simulate_loans(loans):
+    """
+    Simulate a batch of loan records, e.g. user_data["loans"]. Each loan needs
+    "amount", "interest_rate" (annual percent) and "tenure_months", and may
+    carry an "events" list in the format of simulate_loan; other loans are skipped.
+    A zero interest rate is valid and is repaid in equal instalments.
+    The fixed-rate baselines of all loans are computed in one calculate_emi_grid call.
+    Returns dictionary of loan_id -> summary with emi, months, total_interest
+    and interest_saved (against the loan without events)
+    """
+    loans = [
+        loan for loan in loans
+        if all(loan.get(field) is not None for field in ("amount", "interest_rate", "tenure_months"))
+        and loan["tenure_months"] > 0
+    ]
+    if not loans:
+        return {}
+
+    baseline = calculate_emi_grid(
+        [loan["amount"] for loan in loans],
+        [loan["interest_rate"] for loan in loans],
+        [loan["tenure_months"] / 12 for loan in loans]
+    )
+
+    summaries = {}
+    for i, loan in enumerate(loans):
+        schedule = simulate_loan(loan["amount"], loan["interest_rate"], loan["tenure_months"], loan.get("events", ()))
+        total_interest = float(schedule["interest"].sum())
+        summaries[loan.get("loan_id", i)] = {
+            "emi": float(schedule["emi"][-1]) if len(schedule["emi"]) else 0.0,
+            "months": len(schedule["month"]),
+            "total_interest": total_interest,
+            "interest_saved": float(baseline["total_interest"][i]) - total_interest,
+        }
+
+    return summaries
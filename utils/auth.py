@@ -9,7 +9,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from utils.security import hash_password, verify_password
-from utils.db import load_user_data, save_user_data, get_all_users
+from utils.db import load_user_data, save_user_data, find_user_by_email, claim_email, release_email, claim_account_numbers, release_account_numbers
 
 # Function to login user
 def login_user(email, password):
@@ -17,21 +17,14 @@ def login_user(email, password):
     Authenticate a user with email and password
     Returns (success, user_id, message)
     """
-    # Get all users
-    users = get_all_users()
-    
     # Find user by email
-    user_id = None
-    for uid, user_data in users.items():
-        if user_data.get("email") == email:
-            user_id = uid
-            break
+    user_id = find_user_by_email(email)
     
     if not user_id:
         return False, None, "Invalid email or password"
     
     # Load user data
-    user_data = load_user_data(user_id)
+    user_data = load_user_data(user_id, for_update=True)
     
     # Check if account is locked
     if user_data.get("security", {}).get("login_attempts", 0) >= 5:
@@ -73,22 +66,28 @@ def register_user(user_data):
     if not re.match(r"[^@]+@[^@]+\.[^@]+", user_data.get("email", "")):
         return False, "Invalid email format"
     
-    # Check if email already exists
-    users = get_all_users()
-    for uid, data in users.items():
-        if data.get("email") == user_data.get("email"):
-            return False, "Email already registered"
-    
     # Generate user ID if not provided
     if "user_id" not in user_data:
         user_data["user_id"] = str(uuid.uuid4())
     
+    # Reserve the email and account numbers, which fails if they are already registered
+    if not claim_email(user_data["email"], user_data["user_id"]):
+        return False, "Email already registered"
+    
+    if not claim_account_numbers(user_data):
+        release_email(user_data["user_id"])
+        return False, "Account number already in use, please try again"
+    
     # Set creation timestamp
     user_data["created_at"] = datetime.now().isoformat()
     
     # Save user data
     success, message = save_user_data(user_data)
     
+    if not success:
+        release_email(user_data["user_id"])
+        release_account_numbers(user_data["user_id"])
+    
     return success, message
 
 # Function to generate OTP
@@ -157,13 +156,7 @@ def reset_password(email):
     Returns (success, message)
     """
     # Find user by email
-    users = get_all_users()
-    user_id = None
-    
-    for uid, user_data in users.items():
-        if user_data.get("email") == email:
-            user_id = uid
-            break
+    user_id = find_user_by_email(email)
     
     if not user_id:
         return False, "Email not found"
@@ -172,7 +165,7 @@ def reset_password(email):
     temp_password = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
     
     # Update user data
-    user_data = load_user_data(user_id)
+    user_data = load_user_data(user_id, for_update=True)
     user_data["password"] = hash_password(temp_password)
     user_data["security"]["password_reset"] = True
     user_data["security"]["last_password_change"] = datetime.now().isoformat()
@@ -195,7 +188,7 @@ def change_password(user_id, current_password, new_password):
     Returns (success, message)
     """
     # Load user data
-    user_data = load_user_data(user_id)
+    user_data = load_user_data(user_id, for_update=True)
     
     if not user_data:
         return False, "User not found"
@@ -222,7 +215,7 @@ def toggle_2fa(user_id, enable):
     Returns (success, message).
     """
     # Load user data
-    user_data = load_user_data(user_id)
+    user_data = load_user_data(user_id, for_update=True)
     
     if not user_data:
         return False, "User not found"
@@ -0,0 +1,249 @@
+import os
+import mmap
+import struct
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from utils.journal import JOURNAL_FSYNC
+
+# Base directory for binary transaction logs
+DATA_DIR = "data"
+BINLOG_DIR = os.path.join(DATA_DIR, "binlog")
+
+# File header: magic, committed record count, running credit and debit totals (paise)
+MAGIC = b"HZTXLOG1"
+HEADER = struct.Struct("<8sQqq")
+
+# One fixed-width record per posting: id, timestamp (microseconds), amount and
+# balance after the posting (paise), description offset and length in the heap, type code
+RECORD = struct.Struct("<QqqqQIB3x")
+
+# Transaction type <-> code in a record
+TYPE_CODES = {"credit": 1, "debit": 2}
+TYPE_NAMES = {code: tx_type for tx_type, code in TYPE_CODES.items()}
+
+# Records allocated when a log is created; later the file doubles
+INITIAL_CAPACITY = 1024
+
+# Timestamps are stored as microseconds since this (naive) instant
+EPOCH = datetime(1970, 1, 1)
+
+# Function to convert a timestamp to stored microseconds
+def to_micros(value):
+    """
+    Convert a datetime, ISO-8601 string or epoch number to microseconds since
+    1970-01-01 on the local wall clock, the way posting timestamps are stored
+    """
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value)
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+# Function to convert stored microseconds back to an ISO timestamp
+def from_micros(micros):
+    """Get the ISO-8601 timestamp of stored microseconds."""
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+class _EpochKeys:
+    """Sequence view over the timestamps of a mapped log, for bisect."""
+
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        return RECORD.unpack_from(self.data, HEADER.size + position * RECORD.size)[1]
+
+class BinaryTransactionLog:
+    """
+    Fixed-width binary transaction log of one account.
+
+    records.bin starts with a HEADER and holds one RECORD per posting in
+    posting order, memory-mapped and over-allocated so the file doubles as it
+    grows. Descriptions are appended to a separate string heap,
+    descriptions.heap, and records point into it by offset and length.
+    Because every record has the same size, record i lives at a fixed offset:
+    the last N postings or any [start, stop) slice are decoded without
+    touching the rest of the history, and a time range is found by bisecting
+    the timestamps, which append() keeps non-decreasing. The header also
+    keeps running credit and debit totals.
+
+    An append writes the description, then the record, then the header; the
+    record count in the header is the commit point, so a torn append is
+    ignored and its heap bytes are cut off the next time the log is opened.
+    Writes are serialized by a thread lock; one process writes a log.
+    """
+
+    def __init__(self, directory, fsync=JOURNAL_FSYNC):
+        self.directory = directory
+        self.fsync = fsync
+        self.records_file = os.path.join(directory, "records.bin")
+        self.heap_file = os.path.join(directory, "descriptions.heap")
+        self._lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(self.records_file):
+            temp_path = self.records_file + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, 0, 0, 0))
+                f.truncate(HEADER.size + INITIAL_CAPACITY * RECORD.size)
+            os.replace(temp_path, self.records_file)
+
+        self._records = open(self.records_file, 'r+b')
+        self._heap = os.fdopen(os.open(self.heap_file, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        self._map()
+
+        magic, self._count, credit, debit = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.records_file} is not a transaction log")
+        self.totals = {"credit": credit, "debit": debit}
+
+        # Drop heap bytes of an append that never reached the header
+        self._heap_end = 0
+        if self._count:
+            record = self._unpack(self._count - 1)
+            self._heap_end = record[4] + record[5]
+        self._heap.truncate(self._heap_end)
+
+    def _map(self):
+        self._data = mmap.mmap(self._records.fileno(), 0)
+        self._capacity = (len(self._data) - HEADER.size) // RECORD.size
+
+    def _grow(self):
+        """Double the record capacity and remap the file."""
+        self._data.close()
+        self._records.truncate(HEADER.size + 2 * self._capacity * RECORD.size)
+        self._map()
+
+    def _flush(self, offset, size):
+        # msync needs a page-aligned start
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self._data.flush(start, offset + size - start)
+
+    def _unpack(self, position):
+        return RECORD.unpack_from(self._data, HEADER.size + position * RECORD.size)
+
+    def _decode(self, record):
+        tx_id, micros, amount, _, offset, length, code = record
+        self._heap.seek(offset)
+        return {
+            "id": tx_id,
+            "type": TYPE_NAMES[code],
+            "amount": amount,
+            "description": self._heap.read(length).decode("utf-8"),
+            "timestamp": from_micros(micros)
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def balance(self):
+        """Get the balance after the last posting, or None if the log is empty."""
+        with self._lock:
+            return self._unpack(self._count - 1)[3] if self._count else None
+
+    def last_timestamp(self):
+        """Get the stored microseconds of the last posting, or None if the log is empty."""
+        with self._lock:
+            return self._unpack(self._count - 1)[1] if self._count else None
+
+    def append(self, transaction, balance_after):
+        """
+        Append one credit or debit posting with the balance after it.
+        The transaction's timestamp must not be earlier than the last posting's.
+        """
+        tx_type = transaction["type"]
+        if tx_type not in TYPE_CODES:
+            raise ValueError(f"Unsupported transaction type: {tx_type}")
+
+        description = str(transaction.get("description", "")).encode("utf-8")
+
+        with self._lock:
+            micros = to_micros(transaction["timestamp"])
+            if self._count and micros < self._unpack(self._count - 1)[1]:
+                raise ValueError("Postings must be appended in time order")
+
+            self._heap.seek(self._heap_end)
+            self._heap.write(description)
+            self._heap.flush()
+            if self.fsync:
+                os.fsync(self._heap.fileno())
+
+            if self._count >= self._capacity:
+                self._grow()
+
+            offset = HEADER.size + self._count * RECORD.size
+            RECORD.pack_into(
+                self._data, offset,
+                transaction["id"], micros, transaction["amount"], balance_after,
+                self._heap_end, len(description), TYPE_CODES[tx_type]
+            )
+            if self.fsync:
+                self._flush(offset, RECORD.size)
+
+            self.totals[tx_type] += transaction["amount"]
+            HEADER.pack_into(self._data, 0, MAGIC, self._count + 1, self.totals["credit"], self.totals["debit"])
+            if self.fsync:
+                self._flush(0, HEADER.size)
+
+            self._count += 1
+            self._heap_end += len(description)
+
+    def slice(self, start, stop):
+        """Get the postings at positions [start, stop) in posting order."""
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(self._count)
+            return [self._decode(self._unpack(position)) for position in range(start, stop)]
+
+    def tail(self, n):
+        """Get the last n postings in posting order."""
+        with self._lock:
+            return self.slice(max(0, self._count - n), self._count)
+
+    def position_at(self, timestamp):
+        """Get the position of the first posting at or after a timestamp."""
+        with self._lock:
+            return bisect_left(_EpochKeys(self._data, self._count), to_micros(timestamp))
+
+    def between(self, start, end):
+        """Get the postings with start <= timestamp < end in posting order."""
+        with self._lock:
+            return self.slice(self.position_at(start), self.position_at(end))
+
+    def range_totals(self, start, end):
+        """
+        Sum credits and debits with start <= timestamp < end
+        Only the records in the range are read; descriptions are not
+        Returns dictionary with credit/debit totals and counts
+        """
+        result = {"credit": 0, "debit": 0, "credit_count": 0, "debit_count": 0}
+
+        with self._lock:
+            lo = self.position_at(start)
+            hi = self.position_at(end)
+            window = self._data[HEADER.size + lo * RECORD.size:HEADER.size + hi * RECORD.size]
+
+        for record in RECORD.iter_unpack(window):
+            tx_type = TYPE_NAMES[record[6]]
+            result[tx_type] += record[2]
+            result[f"{tx_type}_count"] += 1
+
+        return result
+
+    def close(self):
+        with self._lock:
+            self._data.flush()
+            self._data.close()
+            self._records.close()
+            self._heap.close()
@@ -0,0 +1,108 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+# Upper bound on the total size (in file bytes) of cached JSON documents
+CACHE_MAX_BYTES = int(os.environ.get("HORIZONITE_JSON_CACHE_BYTES", 64 * 1024 * 1024))
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+_total_bytes = 0
+
+def _signature(stat_result):
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+def _evict(file_path):
+    global _total_bytes
+    entry = _entries.pop(file_path, None)
+    if entry is not None:
+        _total_bytes -= entry[2]
+    return entry is not None
+
+# Function to get the signature of a file
+def file_signature(file_path):
+    """
+    Get the (mtime_ns, size, inode) signature that cache entries are validated by;
+    every atomic save of a file changes it
+    Returns None if the file does not exist
+    """
+    try:
+        return _signature(os.stat(file_path))
+    except FileNotFoundError:
+        return None
+
+# Function to load a JSON file through the shared read cache
+def load_json_cached(file_path):
+    """
+    Load a JSON file, reusing the parsed document while the file is unchanged.
+    Entries are validated by (mtime_ns, size, inode), so an unchanged file costs
+    a stat() instead of a parse. The returned object is shared between callers:
+    copy it before mutating, or save it straight away through a write path that
+    calls invalidate().
+    Raises FileNotFoundError / json.JSONDecodeError like json.load
+    """
+    global _total_bytes
+
+    key = os.path.abspath(file_path)
+    signature = _signature(os.stat(key))
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == signature:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[1]
+        _stats["misses"] += 1
+
+    # Take the signature from the open file so it matches the bytes we parse
+    with open(key, 'rb') as f:
+        signature = _signature(os.fstat(f.fileno()))
+        data = json.loads(f.read())
+
+    size = signature[1]
+    with _lock:
+        _evict(key)
+        if size <= CACHE_MAX_BYTES:
+            _entries[key] = (signature, data, size)
+            _total_bytes += size
+            while _total_bytes > CACHE_MAX_BYTES:
+                _evict(next(iter(_entries)))
+                _stats["evictions"] += 1
+
+    return data
+
+# Function to drop a file from the read cache
+def invalidate(file_path):
+    """
+    Drop a cached document; write paths call this after (or instead of) writing
+    """
+    with _lock:
+        if _evict(os.path.abspath(file_path)):
+            _stats["invalidations"] += 1
+
+# Function to empty the read cache
+def clear():
+    """
+    Drop every cached document
+    """
+    with _lock:
+        for key in list(_entries):
+            _evict(key)
+
+# Function to get cache counters
+def cache_stats():
+    """
+    Get hit/miss counters and current size of the read cache, for tuning
+    Returns a dictionary
+    """
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return dict(
+            _stats,
+            entries=len(_entries),
+            bytes=_total_bytes,
+            max_bytes=CACHE_MAX_BYTES,
+            hit_rate=_stats["hits"] / lookups if lookups else 0.0
+        )
@@ -0,0 +1,83 @@
+import os
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from utils.lazy import get_pyplot
+
+# Upper bound on the total size of cached chart images
+CHART_CACHE_MAX_BYTES = int(os.environ.get("HORIZONITE_CHART_CACHE_BYTES", 32 * 1024 * 1024))
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_total_bytes = 0
+
+def _encode(value):
+    # NumPy arrays and other buffers are hashed by content, not by their (truncated) repr
+    if hasattr(value, "tobytes"):
+        return [str(getattr(value, "dtype", "")), list(getattr(value, "shape", ())), hashlib.sha256(value.tobytes()).hexdigest()]
+    return repr(value)
+
+# Function to compute the cache key of a chart
+def chart_key(draw_func, args, kwargs, fmt):
+    """
+    Get a content hash of a chart: the drawing function (which fixes the
+    style), the plotted data passed to it, the active matplotlib style
+    (rcParams, which plt.style.use changes globally) and the output format
+    """
+    style = sorted((name, repr(value)) for name, value in get_pyplot().rcParams.items())
+    payload = json.dumps(
+        [draw_func.__module__, draw_func.__qualname__, args, kwargs, style, fmt],
+        sort_keys=True, default=_encode
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# Function to render a chart through the cache
+def render_chart(draw_func, *args, fmt="png", **kwargs):
+    """
+    Render draw_func(*args, **kwargs), which must build and return a
+    matplotlib figure, to PNG or SVG bytes. Unchanged charts (same function
+    and data) are served from a bounded LRU cache without touching
+    matplotlib, and every figure drawn is closed.
+    Returns the image bytes
+    """
+    global _total_bytes
+
+    key = chart_key(draw_func, args, kwargs, fmt)
+
+    with _lock:
+        image = _entries.get(key)
+        if image is not None:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return image
+        _stats["misses"] += 1
+
+    fig = draw_func(*args, **kwargs)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, facecolor=fig.get_facecolor(), bbox_inches="tight")
+        image = buffer.getvalue()
+    finally:
+        get_pyplot().close(fig)
+
+    with _lock:
+        if key not in _entries and len(image) <= CHART_CACHE_MAX_BYTES:
+            _entries[key] = image
+            _total_bytes += len(image)
+            while _total_bytes > CHART_CACHE_MAX_BYTES:
+                _total_bytes -= len(_entries.popitem(last=False)[1])
+                _stats["evictions"] += 1
+
+    return image
+
+# Function to get chart cache counters
+def chart_cache_stats():
+    """
+    Get hit/miss counters and current size of the chart cache
+    Returns a dictionary
+    """
+    with _lock:
+        return dict(_stats, entries=len(_entries), bytes=_total_bytes, max_bytes=CHART_CACHE_MAX_BYTES)
@@ -0,0 +1,326 @@
+import os
+import sys
+import json
+import calendar
+import threading
+from datetime import datetime
+from utils.lazy import get_numpy
+
+# Base directory for columnar stores
+DATA_DIR = "data"
+COLUMNAR_DIR = os.path.join(DATA_DIR, "columnar")
+
+# Column name -> NumPy dtype name
+COLUMNS = {
+    "epoch": "int64",        # seconds since 1970-01-01 of the (naive) transaction timestamp
+    "amount": "int64",       # paise
+    "type": "uint8",         # TYPE_CODES
+    "user": "int32",         # code into the users dictionary
+    "description": "int32",  # code into the descriptions dictionary
+}
+
+# Transaction type -> code in the type column (0 for anything else)
+TYPE_CODES = {"credit": 1, "debit": 2}
+
+# Rows allocated the first time a column file is created; later it doubles
+INITIAL_CAPACITY = 1024
+
+# Function to convert an ISO timestamp to epoch seconds
+def to_epoch(timestamp):
+    """
+    Get the seconds since 1970-01-01 of a naive ISO timestamp, counted as if
+    it were UTC so that epoch // 86400 is the day of the timestamp
+    """
+    return calendar.timegm(datetime.fromisoformat(timestamp).timetuple())
+
+class _Dictionary:
+    """Append-only value <-> code dictionary stored as one JSON value per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.values = []
+        self.codes = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    self._add(json.loads(line))
+
+    def _add(self, value):
+        self.codes[value] = len(self.values)
+        self.values.append(value)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(value) + "\n")
+            self._add(value)
+            code = self.codes[value]
+        return code
+
+    def reset(self, values):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.writelines(json.dumps(value) + "\n" for value in values)
+        os.replace(temp_path, self.path)
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self._add(value)
+
+class ColumnarLedger:
+    """
+    Columnar copy of a ledger for analytics.
+
+    Each column in COLUMNS is a .npy file, and users and descriptions are
+    dictionary-encoded into append-only JSON-lines files. meta.json holds the
+    number of valid rows. The .npy files are over-allocated and grow by
+    doubling, so appending a posting writes one slot per column and then
+    bumps the length. Readers memory-map the files read-only and slice them
+    to the committed length, so aggregations never parse JSON. If the store
+    is missing, it is backfilled from `source_func`, which yields
+    (user, transaction) pairs for the whole ledger; after a crash,
+    `python -m utils.columnar rebuild` recomputes it the same way.
+    """
+
+    def __init__(self, name, source_func):
+        self.name = name
+        self.source_func = source_func
+        self.directory = os.path.join(COLUMNAR_DIR, name)
+        self.meta_file = os.path.join(self.directory, "meta.json")
+        self._lock = threading.RLock()
+        self._length = None
+        self._writable = {}
+        self._users = None
+        self._descriptions = None
+
+    def _column_path(self, column):
+        return os.path.join(self.directory, f"{column}.npy")
+
+    def _read_length(self):
+        try:
+            with open(self.meta_file, 'r') as f:
+                return json.load(f)["length"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def _write_length(self, length):
+        temp_path = self.meta_file + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({"length": length}, f)
+        os.replace(temp_path, self.meta_file)
+
+    def _ensure_loaded(self):
+        if self._length is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._users = _Dictionary(os.path.join(self.directory, "users.jsonl"))
+        self._descriptions = _Dictionary(os.path.join(self.directory, "descriptions.jsonl"))
+
+        length = self._read_length()
+        if length is None or not all(os.path.exists(self._column_path(column)) for column in COLUMNS):
+            self._rebuild_locked()
+        else:
+            self._length = length
+
+    def _encode(self, user, transaction):
+        """Get the column values of one posting, or None if it is not a dated credit/debit."""
+        tx_type = transaction.get("type")
+        if tx_type not in TYPE_CODES or not transaction.get("timestamp"):
+            return None
+        return {
+            "epoch": to_epoch(transaction["timestamp"]),
+            "amount": int(transaction.get("amount", 0)),
+            "type": TYPE_CODES[tx_type],
+            "user": self._users.encode(str(user)),
+            "description": self._descriptions.encode(str(transaction.get("description", ""))),
+        }
+
+    def _open_writable(self, capacity=None):
+        """Open every column for writing, reallocating them to `capacity` rows if given."""
+        np = get_numpy()
+        from numpy.lib.format import open_memmap
+
+        for column, dtype in COLUMNS.items():
+            path = self._column_path(column)
+            current = self._writable.get(column)
+            if capacity is None and current is not None:
+                continue
+
+            if capacity is None:
+                self._writable[column] = open_memmap(path, mode='r+')
+                continue
+
+            # Copy into a larger file and swap it in; readers keep their old mapping
+            temp_path = os.path.join(self.directory, f"{column}.tmp.npy")
+            grown = open_memmap(temp_path, mode='w+', dtype=np.dtype(dtype), shape=(capacity,))
+            if current is not None:
+                grown[:self._length] = current[:self._length]
+            grown.flush()
+            os.replace(temp_path, path)
+            self._writable[column] = grown
+
+    def _rebuild_locked(self):
+        rows = {column: [] for column in COLUMNS}
+        self._users.reset([])
+        self._descriptions.reset([])
+
+        for user, transaction in self.source_func():
+            values = self._encode(user, transaction)
+            if values is not None:
+                for column, value in values.items():
+                    rows[column].append(value)
+
+        length = len(rows["epoch"])
+        self._writable = {}
+        self._length = 0
+        self._open_writable(max(INITIAL_CAPACITY, 2 * length))
+        for column, values in rows.items():
+            self._writable[column][:length] = values
+            self._writable[column].flush()
+
+        self._length = length
+        self._write_length(length)
+
+    def load(self):
+        """
+        Load the store, backfilling it from history if it is missing.
+        Writers call this before posting so a backfill never counts a posting twice.
+        """
+        with self._lock:
+            self._ensure_loaded()
+        return self
+
+    def record(self, user, transaction):
+        """Append one posting; anything but a dated credit or debit is skipped."""
+        with self._lock:
+            self._ensure_loaded()
+            values = self._encode(user, transaction)
+            if values is None:
+                return
+
+            self._open_writable()
+            capacity = len(self._writable["epoch"])
+            if self._length >= capacity:
+                self._open_writable(2 * capacity)
+
+            # Writes land in the shared page cache, so readers see them without a flush;
+            # the row becomes visible to them once the length is committed
+            for column, value in values.items():
+                self._writable[column][self._length] = value
+
+            self._length += 1
+            self._write_length(self._length)
+
+    def rebuild(self):
+        """Recompute every column from history and replace the stored ones."""
+        with self._lock:
+            if self._users is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._users = _Dictionary(os.path.join(self.directory, "users.jsonl"))
+                self._descriptions = _Dictionary(os.path.join(self.directory, "descriptions.jsonl"))
+            self._rebuild_locked()
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return self._length
+
+    def columns(self):
+        """
+        Get read-only memory-mapped views of every column, sliced to the committed rows
+        Returns dictionary of column name -> NumPy array
+        """
+        np = get_numpy()
+        with self._lock:
+            self._ensure_loaded()
+            length = self._length
+            return {column: np.load(self._column_path(column), mmap_mode='r')[:length] for column in COLUMNS}
+
+    def users(self):
+        """Get the users dictionary; the user column holds indexes into it."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._users.values)
+
+    def descriptions(self):
+        """Get the descriptions dictionary; the description column holds indexes into it."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._descriptions.values)
+
+    def type_totals(self, columns=None):
+        """
+        Get the total amount and count of each transaction type
+        Pass the result of columns() to aggregate that snapshot
+        Returns dictionary like {"credit": {"amount": paise, "count": n}, "debit": {...}}
+        """
+        np = get_numpy()
+        if columns is None:
+            columns = self.columns()
+        counts = np.bincount(columns["type"], minlength=max(TYPE_CODES.values()) + 1)
+        return {
+            tx_type: {"amount": int(columns["amount"][columns["type"] == code].sum()), "count": int(counts[code])}
+            for tx_type, code in TYPE_CODES.items()
+        }
+
+    def daily_totals(self, columns=None):
+        """
+        Get credit and debit totals per day, over days that have postings
+        Pass the result of columns() to aggregate that snapshot
+        Returns (days as datetime64[D], credit paise, debit paise, credit count, debit count)
+        """
+        np = get_numpy()
+        if columns is None:
+            columns = self.columns()
+        days = columns["epoch"] // 86400
+        if len(days) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty.astype("datetime64[D]"), empty, empty, empty, empty
+
+        first = days.min()
+        offsets = days - first
+        size = int(offsets.max()) + 1
+
+        totals = []
+        for code in (TYPE_CODES["credit"], TYPE_CODES["debit"]):
+            mask = columns["type"] == code
+            amounts = np.zeros(size, dtype=np.int64)
+            np.add.at(amounts, offsets[mask], columns["amount"][mask])
+            counts = np.bincount(offsets[mask], minlength=size)
+            totals.append((amounts, counts))
+
+        (credit, credit_count), (debit, debit_count) = totals
+        present = (credit_count + debit_count) > 0
+        dates = (np.arange(size, dtype=np.int64) + first).astype("datetime64[D]")
+        return dates[present], credit[present], debit[present], credit_count[present], debit_count[present]
+
+# Function to iterate over the Home.py ledger
+def _ledger_source():
+    from utils.storage import get_storage
+    return get_storage().iter_all_transactions()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Function to get the columnar copy of the Home.py ledger
+def get_ledger_columns():
+    """
+    Get the columnar store for the transactions kept by utils.storage
+    """
+    with _stores_lock:
+        if "ledger" not in _stores:
+            _stores["ledger"] = ColumnarLedger("ledger", _ledger_source)
+        return _stores["ledger"]
+
+if __name__ == "__main__":
+    # python -m utils.columnar rebuild backfills the columnar store from history
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("Usage: python -m utils.columnar rebuild")
+
+    store = get_ledger_columns()
+    store.rebuild()
+    print(f"Rebuilt {store.name} columns: {len(store)} postings, {len(store.users())} users, {len(store.descriptions())} descriptions")
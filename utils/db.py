@@ -4,19 +4,211 @@ import glob
 import uuid
 import shutil
 import tempfile
+import threading
+import copy
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime
+from utils.index import PersistentIndex
+from utils.locks import user_lock, users_lock
+from utils.journal import TransactionJournal
+from utils.cache import load_json_cached, invalidate, file_signature
+from utils.rollups import get_account_rollups
+from utils.ledger_index import to_epoch
 
 # Base directory for data
 DATA_DIR = "data"
 USERS_DIR = os.path.join(DATA_DIR, "users")
+INDEX_DIR = os.path.join(DATA_DIR, "indexes")
+JOURNAL_DIR = os.path.join(DATA_DIR, "journal")
+
+# Number of users whose balance checkpoints are kept in memory
+BALANCE_CACHE_USERS = int(os.environ.get("HORIZONITE_BALANCE_CACHE_USERS", 1024))
 
 # Ensure directories exist
 os.makedirs(USERS_DIR, exist_ok=True)
 
+# Function to iterate over all stored user documents
+def iter_user_files():
+    """
+    Yield every user data dictionary stored in USERS_DIR
+    Used to rebuild the lookup indexes
+    """
+    for file_path in glob.glob(os.path.join(USERS_DIR, "*.json")):
+        try:
+            with open(file_path, 'r') as f:
+                yield json.load(f)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+
+# Function to build the account number index from scratch
+def build_account_index():
+    """
+    Scan all user files
+    Returns dictionary of account_number -> [user_id, account_index]
+    """
+    index = {}
+    for user_data in iter_user_files():
+        for i, account in enumerate(user_data.get("accounts", [])):
+            if account.get("account_number"):
+                index[account["account_number"]] = [user_data["user_id"], i]
+    return index
+
+# Persistent account_number -> [user_id, account_index] index
+ACCOUNT_INDEX = PersistentIndex(
+    os.path.join(INDEX_DIR, "account_numbers.jsonl"),
+    build_account_index,
+    owner_func=lambda value: value[0]
+)
+
+# Function to normalize an email address for lookups
+def normalize_email(email):
+    """
+    Normalize an email address so lookups are case-insensitive
+    """
+    return (email or "").strip().lower()
+
+# Function to build the email index from scratch
+def build_email_index():
+    """
+    Scan all user files
+    Returns dictionary of normalized email -> user_id
+    """
+    index = {}
+    for user_data in iter_user_files():
+        email = normalize_email(user_data.get("email"))
+        if email:
+            index.setdefault(email, user_data["user_id"])
+    return index
+
+# Persistent normalized email -> user_id index
+EMAIL_INDEX = PersistentIndex(
+    os.path.join(INDEX_DIR, "emails.jsonl"),
+    build_email_index,
+    owner_func=lambda value: value
+)
+
+# Function to keep the lookup indexes in step with a saved user
+def update_indexes(user_data):
+    """
+    Update index entries for a user that was just saved
+    Entries held by another user are left to that user
+    Returns the list of account numbers and emails that could not be claimed
+    """
+    conflicts = ACCOUNT_INDEX.replace_owner(user_data["user_id"], _account_entries(user_data))
+    
+    email = normalize_email(user_data.get("email"))
+    conflicts += EMAIL_INDEX.replace_owner(user_data["user_id"], {email: user_data["user_id"]} if email else {})
+    return conflicts
+
+# Function to list the account index entries of a user
+def _account_entries(user_data):
+    return {
+        account["account_number"]: [user_data["user_id"], i]
+        for i, account in enumerate(user_data.get("accounts", []))
+        if account.get("account_number")
+    }
+
+# Function to reserve an email address for a user
+def claim_email(email, user_id):
+    """
+    Reserve a normalized email for a user, enforcing uniqueness
+    Returns True if the email is now held by user_id
+    """
+    email = normalize_email(email)
+    
+    if not email:
+        return False
+    
+    return EMAIL_INDEX.insert_unique(email, user_id)
+
+# Function to release an email address reserved by a user
+def release_email(user_id):
+    """
+    Drop every email index entry held by a user
+    """
+    EMAIL_INDEX.replace_owner(user_id, {})
+
+# Function to reserve the account numbers of a new user
+def claim_account_numbers(user_data):
+    """
+    Reserve every account number of a user, enforcing uniqueness
+    Returns True if all of them are now held by the user; otherwise none are
+    """
+    entries = _account_entries(user_data)
+    
+    for account_number, entry in entries.items():
+        if not ACCOUNT_INDEX.insert_unique(account_number, entry):
+            release_account_numbers(user_data["user_id"])
+            return False
+    
+    return True
+
+# Function to release the account numbers reserved by a user
+def release_account_numbers(user_id):
+    """
+    Drop every account number index entry held by a user
+    """
+    ACCOUNT_INDEX.replace_owner(user_id, {})
+
+# Function to find a user by email
+def find_user_by_email(email):
+    """
+    Find a user by email using the email index
+    Returns user_id or None if not found
+    """
+    email = normalize_email(email)
+    
+    if not email:
+        return None
+    
+    for attempt in range(2):
+        user_id = EMAIL_INDEX.get(email)
+        
+        if user_id is None:
+            return None
+        
+        # Verify the entry, rebuilding the index once if it is stale
+        user_data = load_user_data(user_id)
+        if user_data and normalize_email(user_data.get("email")) == email:
+            return user_id
+        
+        if attempt == 0:
+            EMAIL_INDEX.rebuild()
+    
+    return None
+
+# Function to find an account by account number
+def find_account(account_number):
+    """
+    Find the owner of an account number using the account index
+    Returns (user_id, account_index) tuple or (None, None) if not found
+    """
+    for attempt in range(2):
+        entry = ACCOUNT_INDEX.get(account_number)
+
+        if entry is None:
+            return None, None
+
+        user_id, account_index = entry
+        user_data = load_user_data(user_id)
+        accounts = (user_data or {}).get("accounts", [])
+
+        # Verify the entry, rebuilding the index once if it is stale
+        if account_index < len(accounts) and accounts[account_index].get("account_number") == account_number:
+            return user_id, account_index
+
+        if attempt == 0:
+            ACCOUNT_INDEX.rebuild()
+
+    return None, None
+
 # Function to load user data
-def load_user_data(user_id):
+def load_user_data(user_id, for_update=False):
     """
-    Load user data from JSON file
+    Load user data from JSON file through the shared read cache
+    The returned dictionary is shared; pass for_update=True to get a
+    private copy before mutating it
     Returns user data dictionary or None if not found
     """
     if not user_id:
@@ -25,18 +217,44 @@ def load_user_data(user_id):
     file_path = os.path.join(USERS_DIR, f"{user_id}.json")
     
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
+        user_data = load_json_cached(file_path)
+        return copy.deepcopy(user_data) if for_update else user_data
+    except FileNotFoundError:
         return None
     except Exception as e:
         print(f"Error loading user data: {e}")
         return None
 
+# Function to check a cached copy of user data against the stored document
+def revalidate_user_data(user_id, cached_data=None, cached_signature=None):
+    """
+    Revalidate a cached copy of user data (e.g. kept in a session) with one stat().
+    The copy is returned as is while the file is unchanged; otherwise the
+    document is reloaded, and the copy is still kept if its version matches.
+    Returns (user_data, signature); user_data is None if the user is not found
+    """
+    signature = file_signature(os.path.join(USERS_DIR, f"{user_id}.json"))
+    
+    if signature is None:
+        return None, None
+    
+    if cached_data is not None and signature == cached_signature:
+        return cached_data, signature
+    
+    user_data = load_user_data(user_id)
+    
+    if (cached_data is not None and user_data is not None
+            and cached_data.get("version") is not None
+            and cached_data.get("version") == user_data.get("version")):
+        return cached_data, signature
+    
+    return user_data, signature
+
 # Function to save user data
 def save_user_data(user_data):
     """
     Save user data to JSON file
+    Every save stamps the document with a version one higher than the stored one
     Returns (success, message) tuple
     """
     if not user_data or "user_id" not in user_data:
@@ -45,27 +263,40 @@ def save_user_data(user_data):
     user_id = user_data["user_id"]
     file_path = os.path.join(USERS_DIR, f"{user_id}.json")
     
-    # Use atomic write to prevent data corruption
-    try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp_file:
-            # Write data to temporary file
-            json.dump(user_data, temp_file, indent=4)
-        
-        # Replace the original file with the temporary file
-        shutil.move(temp_file.name, file_path)
-        
-        return True, "User data saved successfully"
-    except Exception as e:
-        # Clean up temporary file if it exists
-        if 'temp_file' in locals():
-            try:
-                os.unlink(temp_file.name)
-            except:
-                pass
-        
-        print(f"Error saving user data: {e}")
-        return False, f"Error saving user data: {str(e)}"
+    # Use atomic write to prevent data corruption; the lock makes the version bump atomic
+    with user_lock(user_id):
+        try:
+            # Bump the version past whatever is stored, so readers can tell this write apart
+            stored = load_user_data(user_id)
+            user_data["version"] = max(user_data.get("version") or 0, (stored or {}).get("version") or 0) + 1
+            
+            # Create a temporary file next to the target so the move is an atomic rename
+            with tempfile.NamedTemporaryFile(mode='w', dir=USERS_DIR, suffix=".tmp", delete=False) as temp_file:
+                # Write data to temporary file
+                json.dump(user_data, temp_file, indent=4)
+            
+            # Replace the original file with the temporary file
+            shutil.move(temp_file.name, file_path)
+            invalidate(file_path)
+            
+            # Keep lookup indexes up to date; new users claim their entries first (see utils.auth.register_user)
+            conflicts = update_indexes(user_data)
+            if conflicts:
+                print(f"Index entries of {user_id} held by another user: {', '.join(conflicts)}")
+            
+            return True, "User data saved successfully"
+        except Exception as e:
+            invalidate(file_path)
+            
+            # Clean up temporary file if it exists
+            if 'temp_file' in locals():
+                try:
+                    os.unlink(temp_file.name)
+                except:
+                    pass
+            
+            print(f"Error saving user data: {e}")
+            return False, f"Error saving user data: {str(e)}"
 
 # Function to get all users
 def get_all_users():
@@ -88,38 +319,53 @@ def atomic_transaction(user_id, transaction_func, *args, **kwargs):
     Perform an atomic transaction on user data
     transaction_func should be a function that takes user_data as first argument
     and returns (success, modified_user_data, message)
+    The user is locked for the whole transaction (see utils.locks)
     
     Returns (success, message) tuple
     """
     if not user_id:
         return False, "Invalid user ID"
     
-    # Load user data
-    user_data = load_user_data(user_id)
-    
-    if not user_data:
-        return False, "User not found"
-    
-    # Perform transaction
-    success, modified_user_data, message = transaction_func(user_data, *args, **kwargs)
-    
-    if not success:
-        return False, message
-    
-    # Save modified user data
-    save_success, save_message = save_user_data(modified_user_data)
-    
-    if not save_success:
-        return False, save_message
+    # Hold the user's lock across load -> mutate -> save so concurrent
+    # sessions cannot lose each other's updates
+    with user_lock(user_id):
+        # Load a private copy of the user data
+        user_data = load_user_data(user_id, for_update=True)
+        
+        if not user_data:
+            return False, "User not found"
+        
+        # Perform transaction
+        success, modified_user_data, message = transaction_func(user_data, *args, **kwargs)
+        
+        if not success:
+            return False, message
+        
+        # Save modified user data
+        save_success, save_message = save_user_data(modified_user_data)
+        
+        if not save_success:
+            return False, save_message
     
     return True, message
 
+# Function to add committed postings to the account rollups
+def _record_rollups(rollups, user_id, postings):
+    """
+    Add postings that have been saved to the user's and the bank's rollup buckets
+    """
+    for posting in postings:
+        rollups.record(user_id, posting)
+
 # Function to add transaction
 def add_transaction(user_id, account_index, transaction_type, amount, description):
     """
-    Add a transaction to user account
+    Add a transaction of `amount` paise to user account
     Returns (success, message) tuple
     """
+    rollups = get_account_rollups().load()
+    posted = []
+    
     def transaction_func(user_data):
         if "accounts" not in user_data or account_index >= len(user_data["accounts"]):
             return False, user_data, "Account not found"
@@ -151,10 +397,14 @@ def add_transaction(user_id, account_index, transaction_type, amount, descriptio
             account["transactions"] = []
         
         account["transactions"].append(transaction)
+        posted.append(transaction)
         
         return True, user_data, "Transaction added successfully"
     
-    return atomic_transaction(user_id, transaction_func)
+    success, message = atomic_transaction(user_id, transaction_func)
+    if success:
+        _record_rollups(rollups, user_id, posted)
+    return success, message
 
 # Function to add loan
 def add_loan(user_id, loan_data):
@@ -162,6 +412,9 @@ def add_loan(user_id, loan_data):
     Add a loan to user
     Returns (success, message) tuple
     """
+    rollups = get_account_rollups().load()
+    posted = []
+    
     def transaction_func(user_data):
         if "loans" not in user_data:
             user_data["loans"] = []
@@ -201,10 +454,14 @@ def add_loan(user_id, loan_data):
                     account["transactions"] = []
                 
                 account["transactions"].append(transaction)
+                posted.append(transaction)
         
         return True, user_data, "Loan added successfully"
     
-    return atomic_transaction(user_id, transaction_func)
+    success, message = atomic_transaction(user_id, transaction_func)
+    if success:
+        _record_rollups(rollups, user_id, posted)
+    return success, message
 
 # Function to update loan status
 def update_loan_status(user_id, loan_id, status):
@@ -212,6 +469,9 @@ def update_loan_status(user_id, loan_id, status):
     Update loan status
     Returns (success, message) tuple
     """
+    rollups = get_account_rollups().load()
+    posted = []
+    
     def transaction_func(user_data):
         if "loans" not in user_data:
             return False, user_data, "No loans found"
@@ -255,73 +515,343 @@ def update_loan_status(user_id, loan_id, status):
                     account["transactions"] = []
                 
                 account["transactions"].append(transaction)
+                posted.append(transaction)
         
         return True, user_data, "Loan status updated successfully"
     
-    return atomic_transaction(user_id, transaction_func)
+    success, message = atomic_transaction(user_id, transaction_func)
+    if success:
+        _record_rollups(rollups, user_id, posted)
+    return success, message
+
+# Function to project every loan of a user
+def get_loan_projections(user_id):
+    """
+    Simulate all loans of a user with their prepayments and rate resets
+    (see utils.amortization.simulate_loans); amortization is linear in the
+    principal, so the summaries are in paise like the loan records
+    Returns dictionary of loan_id -> summary
+    """
+    # NumPy is only needed here, so it is not imported with utils.db
+    from utils.amortization import simulate_loans
+    
+    user_data = load_user_data(user_id)
+    
+    if not user_data:
+        return {}
+    
+    return simulate_loans(user_data.get("loans", []))
+
+_checkpoints = OrderedDict()
+_checkpoints_lock = threading.Lock()
+
+# Function to build the balance checkpoints of an account
+def _balance_checkpoints(account):
+    """
+    Get (epochs, balances, opening) for the postings of an account in posting order.
+    epochs are made non-decreasing (a posting stamped earlier than its predecessor
+    counts at its predecessor's time) so they can be bisected. balances are the
+    postings' balance_after, replayed from the previous posting where it is missing,
+    and opening is the balance before the first posting.
+    """
+    postings = [tx for tx in account.get("transactions", []) if tx.get("timestamp")]
+    deltas = [tx.get("amount", 0) if tx.get("type") == "credit" else -tx.get("amount", 0) for tx in postings]
+    
+    # Work back to the opening balance from the first stored balance_after,
+    # or from the current balance if no posting has one
+    opening = account.get("balance", 0) - sum(deltas)
+    for i, tx in enumerate(postings):
+        if tx.get("balance_after") is not None:
+            opening = tx["balance_after"] - sum(deltas[:i + 1])
+            break
+    
+    epochs = []
+    balances = []
+    balance = opening
+    for tx, delta in zip(postings, deltas):
+        epoch = to_epoch(tx["timestamp"])
+        epochs.append(max(epoch, epochs[-1]) if epochs else epoch)
+        balance = tx["balance_after"] if tx.get("balance_after") is not None else balance + delta
+        balances.append(balance)
+    
+    return epochs, balances, opening
+
+# Function to get the balance checkpoints of every account of a user
+def _user_checkpoints(user_id):
+    """
+    Get the balance checkpoints of each account of a user, in account order.
+    They are built once per version of the user file and kept for the
+    BALANCE_CACHE_USERS most recently used users
+    Returns list of (epochs, balances, opening) or None if the user is not found
+    """
+    signature = file_signature(os.path.join(USERS_DIR, f"{user_id}.json"))
+    
+    if signature is None:
+        return None
+    
+    with _checkpoints_lock:
+        entry = _checkpoints.get(user_id)
+        if entry is not None and entry[0] == signature:
+            _checkpoints.move_to_end(user_id)
+            return entry[1]
+    
+    user_data = load_user_data(user_id)
+    
+    if not user_data:
+        return None
+    
+    checkpoints = [_balance_checkpoints(account) for account in user_data.get("accounts", [])]
+    
+    with _checkpoints_lock:
+        _checkpoints[user_id] = (signature, checkpoints)
+        _checkpoints.move_to_end(user_id)
+        while len(_checkpoints) > BALANCE_CACHE_USERS:
+            _checkpoints.popitem(last=False)
+    
+    return checkpoints
+
+# Function to look up a balance in an account's checkpoints
+def _balance_at(checkpoints, epoch):
+    epochs, balances, opening = checkpoints
+    position = bisect_right(epochs, epoch)
+    return balances[position - 1] if position else opening
+
+# Function to get the balance of an account at a point in time
+def as_of_balance(user_id, account_index, timestamp):
+    """
+    Get the balance of an account as of `timestamp`: the balance_after of the
+    last posting at or before it (the opening balance if there is none),
+    found by binary search over the account's time-ordered postings.
+    timestamp may be a datetime, ISO string or epoch seconds
+    Returns balance in paise, or None if the account is not found
+    """
+    checkpoints = _user_checkpoints(user_id)
+    
+    if checkpoints is None or not 0 <= account_index < len(checkpoints):
+        return None
+    
+    return _balance_at(checkpoints[account_index], to_epoch(timestamp))
+
+# Function to get many point-in-time balances at once
+def as_of_balances(queries):
+    """
+    Get point-in-time balances for statement runs and month-end reports.
+    queries is an iterable of (account_number, timestamp) pairs; each account
+    is located and each user's checkpoints are loaded once for the whole
+    batch, and every balance is then one binary search
+    Returns list of balances in paise (None for unknown accounts) in query order
+    """
+    accounts = {}
+    users = {}
+    results = []
+    
+    for account_number, timestamp in queries:
+        if account_number not in accounts:
+            accounts[account_number] = find_account(account_number)
+        user_id, account_index = accounts[account_number]
+        
+        if user_id is not None and user_id not in users:
+            users[user_id] = _user_checkpoints(user_id)
+        checkpoints = users.get(user_id)
+        
+        if checkpoints is None or account_index >= len(checkpoints):
+            results.append(None)
+        else:
+            results.append(_balance_at(checkpoints[account_index], to_epoch(timestamp)))
+    
+    return results
+
+# Journal of transfers, written before the two user files are saved
+TRANSFER_JOURNAL = TransactionJournal(JOURNAL_DIR, prefix="transfers")
+_transfers_recovered = False
+_recovery_lock = threading.Lock()
+
+# Function to apply one journaled transfer posting if it is missing
+def _apply_posting(user_data, account_index, posting):
+    """
+    Add a journaled posting to an account unless it is already there
+    Returns True if the account was changed
+    """
+    account = user_data["accounts"][account_index]
+    transactions = account.setdefault("transactions", [])
+    
+    if any(tx.get("transaction_id") == posting["transaction_id"] for tx in transactions):
+        return False
+    
+    if posting["type"] == "credit":
+        account["balance"] += posting["amount"]
+    else:
+        account["balance"] -= posting["amount"]
+    
+    transactions.append(dict(posting, balance_after=account["balance"]))
+    return True
+
+# Function to finish transfers interrupted by a crash
+def recover_transfers():
+    """
+    Re-apply any journaled transfer whose postings did not reach both user
+    files, then fold the checked journal segments away. If a user file
+    cannot be saved, the segments are kept so the next recovery retries.
+    Returns the number of transfers that had to be repaired
+    """
+    rollups = get_account_rollups().load()
+    
+    with _recovery_lock:
+        upto = TRANSFER_JOURNAL.rotate()
+        repaired = 0
+        complete = True
+        
+        for record in TRANSFER_JOURNAL.replay(upto=upto):
+            sender_id, sender_index = record["from"]
+            recipient_id, recipient_index = record["to"]
+            debit, credit = record["postings"]
+            
+            with users_lock(sender_id, recipient_id):
+                sender_data = load_user_data(sender_id, for_update=True)
+                recipient_data = sender_data if recipient_id == sender_id else load_user_data(recipient_id, for_update=True)
+                
+                if not sender_data or not recipient_data:
+                    print(f"Cannot recover transfer {record['transfer_id']}: user not found")
+                    continue
+                
+                # Postings re-applied to each file, recorded in the rollups once saved
+                applied = {sender_id: [], recipient_id: []}
+                if _apply_posting(sender_data, sender_index, debit):
+                    applied[sender_id].append(debit)
+                if _apply_posting(recipient_data, recipient_index, credit):
+                    applied[recipient_id].append(credit)
+                
+                for owner_id, owner_data in {recipient_id: recipient_data, sender_id: sender_data}.items():
+                    if not applied[owner_id]:
+                        continue
+                    if save_user_data(owner_data)[0]:
+                        _record_rollups(rollups, owner_id, applied[owner_id])
+                    else:
+                        complete = False
+                
+                if applied[sender_id] or applied[recipient_id]:
+                    repaired += 1
+        
+        if complete:
+            TRANSFER_JOURNAL.mark_compacted(upto)
+        return repaired
 
 # Function to transfer funds
 def transfer_funds(user_id, from_account_index, to_account_number, amount, description):
     """
-    Transfer funds between accounts
+    Transfer `amount` paise between accounts as one double-entry commit.
+    Both users are locked in a deterministic order, a balanced debit/credit
+    pair is written to the transfer journal, and both user files are saved.
+    The journal record commits the transfer: if a user file cannot be saved
+    after it, the transfer is still reported as successful and
+    recover_transfers() applies the missing postings from the journal.
     Returns (success, message) tuple
     """
-    # First, debit from sender's account
-    debit_success, debit_message = add_transaction(
-        user_id, 
-        from_account_index, 
-        "debit", 
-        amount, 
-        f"Transfer to {to_account_number}: {description}"
-    )
-    
-    if not debit_success:
-        return False, debit_message
-    
-    # Find recipient by account number
-    recipient_id = None
-    recipient_account_index = None
-    
-    users = get_all_users()
-    for uid, user_data in users.items():
-        if "accounts" in user_data:
-            for i, account in enumerate(user_data["accounts"]):
-                if account.get("account_number") == to_account_number:
-                    recipient_id = uid
-                    recipient_account_index = i
-                    break
-            if recipient_id:
-                break
+    global _transfers_recovered
+    
+    if not user_id:
+        return False, "Invalid user ID"
+    
+    if amount <= 0:
+        return False, "Invalid amount"
+    
+    # Finish any transfer interrupted by a previous crash before posting new ones
+    if not _transfers_recovered:
+        recover_transfers()
+        _transfers_recovered = True
+    
+    rollups = get_account_rollups().load()
+    
+    for attempt in range(2):
+        # Find recipient by account number
+        entry = ACCOUNT_INDEX.get(to_account_number)
+        
+        if entry is None:
+            return False, "Recipient account not found"
+        
+        recipient_id, recipient_account_index = entry
+        
+        with users_lock(user_id, recipient_id):
+            sender_data = load_user_data(user_id, for_update=True)
+            recipient_data = sender_data if recipient_id == user_id else load_user_data(recipient_id, for_update=True)
+            
+            if not sender_data:
+                return False, "User not found"
+            
+            recipient_accounts = (recipient_data or {}).get("accounts", [])
+            if (recipient_account_index >= len(recipient_accounts)
+                    or recipient_accounts[recipient_account_index].get("account_number") != to_account_number):
+                # Stale index entry: rebuild once and look the recipient up again
+                if attempt == 0:
+                    ACCOUNT_INDEX.rebuild()
+                    continue
+                return False, "Recipient account not found"
+            
+            if "accounts" not in sender_data or from_account_index >= len(sender_data["accounts"]):
+                return False, "Account not found"
+            
+            sender_account = sender_data["accounts"][from_account_index]
+            recipient_account = recipient_accounts[recipient_account_index]
+            
+            if sender_account is recipient_account:
+                return False, "Cannot transfer to the same account"
+            
+            if sender_account["balance"] < amount:
+                return False, "Insufficient balance"
+            
+            transfer_id = str(uuid.uuid4())
+            timestamp = datetime.now().isoformat()
+            
+            # Balanced pair of ledger entries sharing the transfer reference
+            debit = {
+                "transaction_id": str(uuid.uuid4()),
+                "type": "debit",
+                "amount": amount,
+                "description": f"Transfer to {to_account_number}: {description}",
+                "timestamp": timestamp,
+                "reference": transfer_id
+            }
+            credit = {
+                "transaction_id": str(uuid.uuid4()),
+                "type": "credit",
+                "amount": amount,
+                "description": f"Transfer from {sender_account['account_number']}: {description}",
+                "timestamp": timestamp,
+                "reference": transfer_id
+            }
+            
+            # The journal record is the commit point for both files
+            segment_closed = TRANSFER_JOURNAL.append({
+                "transfer_id": transfer_id,
+                "timestamp": timestamp,
+                "amount": amount,
+                "from": [user_id, from_account_index],
+                "to": [recipient_id, recipient_account_index],
+                "postings": [debit, credit]
+            })
+            
+            _apply_posting(sender_data, from_account_index, debit)
+            _apply_posting(recipient_data, recipient_account_index, credit)
+            
+            save_success, save_message = save_user_data(sender_data)
+            if save_success:
+                _record_rollups(rollups, user_id, [debit, credit] if recipient_data is sender_data else [debit])
+            if save_success and recipient_data is not sender_data:
+                save_success, save_message = save_user_data(recipient_data)
+                if save_success:
+                    _record_rollups(rollups, recipient_id, [credit])
+        
+        if not save_success:
+            # The transfer is committed in the journal, so it must not be reported as failed;
+            # recovery applies the postings that did not reach the user files
+            print(f"Transfer {transfer_id} committed but not saved: {save_message}")
+            _transfers_recovered = False
+            threading.Thread(target=recover_transfers, name="transfer-recovery", daemon=True).start()
+            return True, "Transfer completed; your balance will be updated shortly"
+        
+        if segment_closed:
+            threading.Thread(target=recover_transfers, name="transfer-journal-compaction", daemon=True).start()
+        
+        return True, "Transfer completed successfully"
     
-    if not recipient_id:
-        # Rollback the debit transaction
-        add_transaction(
-            user_id,
-            from_account_index,
-            "credit",
-            amount,
-            f"Reversal of failed transfer to {to_account_number}: Recipient not found"
-        )
-        return False, "Recipient account not found"
-    
-    # Credit to recipient's account
-    credit_success, credit_message = add_transaction(
-        recipient_id,
-        recipient_account_index,
-        "credit",
-        amount,
-        f"Transfer from {load_user_data(user_id)['accounts'][from_account_index]['account_number']}: {description}"
-    )
-    
-    if not credit_success:
-        # Rollback the debit transaction
-        add_transaction(
-            user_id,
-            from_account_index,
-            "credit",
-            amount,
-            f"Reversal of failed transfer to {to_account_number}: {credit_message}"
-        )
-        return False, f"Error crediting recipient account: {credit_message}"
-    
-    return True, "Transfer completed successfully"
+    return False, "Recipient account not found"
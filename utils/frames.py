@@ -0,0 +1,60 @@
+from utils.lazy import get_numpy, get_pandas
+from utils.money import format_money
+from utils.columnar import TYPE_CODES
+
+# Columns of the flattened transaction frame
+TRANSACTION_COLUMNS = ["transaction_id", "user_id", "user_name", "account_number", "type", "amount", "description", "timestamp"]
+
+# Function to build the transaction frame from a columnar ledger
+def columns_frame(columns, user_ids, descriptions, users=None, accounts=None):
+    """
+    Build a DataFrame with TRANSACTION_COLUMNS from ColumnarLedger.columns()
+    and its users() and descriptions() dictionaries, without parsing any JSON.
+
+    The columnar store keeps no transaction ids, so transaction_id is the row
+    number, and timestamps have whole-second precision. User names and
+    account numbers are joined with a merge on the small per-user table
+    rather than looked up per row. user_id, user_name, account_number and
+    type are categorical, so each distinct value is stored once, and
+    amounts are int64 paise, so sums over them are exact.
+    """
+    pd = get_pandas()
+    np = get_numpy()
+    users = users or {}
+    accounts = accounts or {}
+
+    type_names = np.full(max(TYPE_CODES.values()) + 1, "N/A", dtype=object)
+    for tx_type, code in TYPE_CODES.items():
+        type_names[code] = tx_type
+
+    df = pd.DataFrame({
+        "transaction_id": np.arange(len(columns["epoch"]), dtype=np.int64),
+        "user_code": np.asarray(columns["user"], dtype=np.int32),
+        "type": pd.Categorical(type_names[columns["type"]]),
+        "amount": np.array(columns["amount"], dtype=np.int64),
+        "description": np.array(descriptions, dtype=object)[columns["description"]],
+        "timestamp": pd.to_datetime(np.asarray(columns["epoch"], dtype=np.int64), unit="s"),
+    })
+
+    user_table = pd.DataFrame({
+        "user_code": np.arange(len(user_ids), dtype=np.int32),
+        "user_id": pd.Categorical(user_ids),
+        "user_name": pd.Categorical([users.get(user_id, {}).get("full_name", "Unknown User") for user_id in user_ids]),
+        "account_number": pd.Categorical([accounts.get(user_id, {}).get("account_number", "N/A") for user_id in user_ids]),
+    })
+
+    df = df.merge(user_table, on="user_code", how="left", sort=False)
+    return df[TRANSACTION_COLUMNS]
+
+# Function to add display columns to a transaction frame
+def with_display_columns(df):
+    """
+    Add the formatted "amount_formatted" and "date" columns.
+    Meant for the rows actually shown, since formatting costs one string per row.
+    """
+    np = get_numpy()
+    df = df.copy()
+    signs = np.where(df["type"].astype(object) == "credit", "+", "-")
+    df["amount_formatted"] = [sign + format_money(amount) for sign, amount in zip(signs, df["amount"].to_numpy())]
+    df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
+    return df
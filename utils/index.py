@@ -0,0 +1,265 @@
+import os
+import json
+import uuid
+import threading
+from contextlib import contextmanager
+from utils.cache import file_signature
+
+# fcntl is only available on POSIX; elsewhere only in-process locking applies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class PersistentIndex:
+    """
+    Key -> value index kept in memory and persisted as an append-only
+    JSON-lines log of [key, value] pairs ([key, null] removes a key).
+
+    Updates cost one short appended line, and only when a mapping actually
+    changes. The log is rewritten as a compact snapshot once it has grown to
+    several times the number of live keys. If the log file is missing, the
+    index is rebuilt from `rebuild_func`, which must return the full mapping.
+    `owner_func` maps a value to the owner of its key; it is needed for
+    insert_unique() and replace_owner().
+
+    Several processes can share one index. Every update holds an fcntl lock
+    on <path>.lock and first applies the lines other processes appended, so
+    uniqueness checks see every worker's entries. Lookups apply new lines
+    too, at the cost of a stat() when nothing changed. Each snapshot starts
+    with a [null, generation] line, so a reader notices that the log was
+    replaced and reloads it instead of reading on from its old offset.
+    """
+
+    def __init__(self, path, rebuild_func, owner_func=None):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.rebuild_func = rebuild_func
+        self.owner_func = owner_func
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._data = None
+        self._by_owner = None
+        self._log_lines = 0
+        self._generation = None
+        self._offset = 0
+        self._signature = None
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the fcntl lock shared with other processes; reentrant under self._lock."""
+        if self._lock_file is not None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_file = lock_file
+            try:
+                yield
+            finally:
+                # Closing the file releases the lock
+                self._lock_file = None
+
+    def _apply(self, key, value):
+        """Set (or with value None, remove) one key, keeping the per-owner sets in step."""
+        current = self._data.pop(key, None)
+        if current is not None and self.owner_func is not None:
+            self._by_owner.get(self.owner_func(current), set()).discard(key)
+
+        if value is not None:
+            self._data[key] = value
+            if self.owner_func is not None:
+                self._by_owner.setdefault(self.owner_func(value), set()).add(key)
+
+    def _refresh(self):
+        """Load the log, or apply the lines appended since it was last read."""
+        signature = file_signature(self.path)
+
+        if signature is None:
+            # A missing log is rebuilt from the source data, by one process only
+            with self._file_lock():
+                if file_signature(self.path) is None:
+                    self._rebuild_locked()
+                    return
+            signature = file_signature(self.path)
+
+        if self._data is not None and signature == self._signature:
+            return
+
+        with open(self.path, 'rb') as f:
+            first = f.readline()
+            generation = None
+            if first.endswith(b"\n"):
+                try:
+                    key, value = json.loads(first)
+                    generation = value if key is None else None
+                except ValueError:
+                    pass
+
+            # Start over if this is the first read or the log was replaced by a snapshot
+            if self._data is None or generation != self._generation or os.fstat(f.fileno()).st_size < self._offset:
+                self._data = {}
+                self._by_owner = {}
+                self._log_lines = 0
+                self._generation = generation
+                self._offset = 0
+
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                try:
+                    key, value = json.loads(line)
+                except ValueError:
+                    continue
+                if key is None:
+                    continue
+                self._log_lines += 1
+                self._apply(key, value)
+
+        # Taken before reading, so anything appended since then changes it
+        self._signature = signature
+
+    def _set_data(self, data):
+        self._data = {}
+        self._by_owner = {}
+        for key, value in data.items():
+            self._apply(key, value)
+
+    def _write_snapshot(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        generation = uuid.uuid4().hex
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps([None, generation]).encode() + b"\n")
+            for key, value in self._data.items():
+                f.write(json.dumps([key, value], separators=(",", ":")).encode() + b"\n")
+            self._offset = f.tell()
+        os.replace(temp_path, self.path)
+        self._generation = generation
+        self._log_lines = len(self._data)
+        self._signature = file_signature(self.path)
+
+    def _append(self, entries):
+        """Append entries that were already applied in memory; the file lock must be held."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps([key, value], separators=(",", ":")) + "\n" for key, value in entries).encode()
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self._offset += len(data)
+        self._log_lines += len(entries)
+        self._signature = file_signature(self.path)
+
+        # Compact the log once superseded entries dominate it
+        if self._log_lines > 1024 and self._log_lines > 4 * len(self._data):
+            self._write_snapshot()
+
+    def _rebuild_locked(self, mapping=None):
+        self._set_data(dict(self.rebuild_func() if mapping is None else mapping))
+        self._write_snapshot()
+
+    @contextmanager
+    def _updating(self):
+        """Lock the index in this process and across processes, with other workers' lines applied."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            yield
+
+    def rebuild(self, mapping=None):
+        """Rebuild the whole index (from `mapping` or the source data) and persist it."""
+        with self._lock, self._file_lock():
+            self._rebuild_locked(mapping)
+
+    def get(self, key, default=None):
+        """Look up a key in O(1)."""
+        with self._lock:
+            self._refresh()
+            return self._data.get(key, default)
+
+    def items(self):
+        """Get a snapshot list of all (key, value) pairs."""
+        with self._lock:
+            self._refresh()
+            return list(self._data.items())
+
+    def set_many(self, mapping):
+        """Set several keys at once with a single appended write."""
+        with self._updating():
+            entries = [(key, value) for key, value in mapping.items() if self._data.get(key) != value]
+            for key, value in entries:
+                self._apply(key, value)
+            if entries:
+                self._append(entries)
+
+    def increment_many(self, deltas, empty=None):
+        """
+        Add numeric deltas to the fields of several values with a single appended write,
+        e.g. {"alice|day|2025-05-01": {"credit": 100, "credit_count": 1}}.
+        A missing key starts from a copy of `empty`. The read-modify-write runs under the
+        file lock, so increments from concurrent workers are never lost.
+        """
+        with self._updating():
+            entries = []
+            for key, delta in deltas.items():
+                value = dict(self._data.get(key) or empty or {})
+                for field, amount in delta.items():
+                    value[field] = value.get(field, 0) + amount
+                self._apply(key, value)
+                entries.append((key, value))
+            if entries:
+                self._append(entries)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._data)
+
+    def insert_unique(self, key, value):
+        """
+        Insert a key unless another owner already holds it
+        Returns True if the key now maps to `value`
+        """
+        with self._updating():
+            current = self._data.get(key)
+
+            if current is not None and self.owner_func(current) != self.owner_func(value):
+                return False
+
+            if current != value:
+                self._apply(key, value)
+                self._append([(key, value)])
+
+            return True
+
+    def replace_owner(self, owner, mapping):
+        """
+        Make `mapping` the complete set of keys held by `owner`, removing any
+        other keys it held before. Keys held by a different owner are not taken over.
+        Returns the list of keys that could not be claimed
+        """
+        with self._updating():
+            entries = []
+            conflicts = []
+            old_keys = set(self._by_owner.get(owner, set()))
+
+            for key in old_keys - set(mapping):
+                self._apply(key, None)
+                entries.append((key, None))
+
+            for key, value in mapping.items():
+                current = self._data.get(key)
+                if current is not None and self.owner_func(current) != owner:
+                    conflicts.append(key)
+                    continue
+                if current != value:
+                    self._apply(key, value)
+                    entries.append((key, value))
+
+            if entries:
+                self._append(entries)
+
+            return conflicts
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+
+# fcntl is only available on POSIX; elsewhere only in-process locking applies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Default journal settings
+SEGMENT_MAX_BYTES = int(os.environ.get("HORIZONITE_JOURNAL_SEGMENT_BYTES", 4 * 1024 * 1024))
+JOURNAL_FSYNC = os.environ.get("HORIZONITE_JOURNAL_FSYNC", "1") != "0"
+
+class TransactionJournal:
+    """
+    Append-only JSON-lines journal split into numbered segments.
+
+    Each append writes one line to the active segment (optionally fsync'ed),
+    so a posting costs O(1) no matter how long the history is. Segments that
+    have been folded into a snapshot are recorded in a checkpoint file and
+    deleted; replay() yields every record written after the last checkpoint.
+
+    Several processes can append to one journal. Appends, rotation and
+    compaction hold an fcntl lock on <prefix>.lock, and the active segment is
+    always the newest one on disk: rotating creates the next segment empty,
+    so an appender that finds its segment closed or deleted moves on to the
+    newest one before writing, and no posting lands in a segment that
+    another process has already folded away.
+    """
+
+    def __init__(self, directory, prefix="transactions", segment_max_bytes=SEGMENT_MAX_BYTES, fsync=JOURNAL_FSYNC):
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self.checkpoint_file = os.path.join(directory, f"{prefix}-checkpoint.json")
+        self._segment_pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)\.jsonl$")
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_number = None
+        self._writer_file = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, f"{prefix}.lock"), 'a')
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"{self.prefix}-{number:06d}.jsonl")
+
+    @contextmanager
+    def _locked(self):
+        """Lock the journal in this process and across processes."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def segments(self):
+        """Get the numbers of all segments on disk in ascending order."""
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = self._segment_pattern.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def checkpoint(self):
+        """Get the number of the last segment folded into the snapshot (0 if none)."""
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return json.load(f).get("segment", 0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+    def _active_segment(self):
+        """Get the number of the segment appends go to: the newest on disk, or the one after the checkpoint."""
+        segments = self.segments()
+        return segments[-1] if segments else self.checkpoint() + 1
+
+    def _open_active(self):
+        """Point the open file at the active segment; the journal lock must be held."""
+        number = self._file_number
+
+        # Segments are only deleted up to a closed one, so while ours exists and
+        # the next one does not, ours is still the active segment
+        if (number is None or not os.path.exists(self._segment_path(number))
+                or os.path.exists(self._segment_path(number + 1))):
+            number = self._active_segment()
+
+        if self._file is None or number != self._file_number:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._segment_path(number), 'a')
+            self._file_number = number
+
+    def append(self, record):
+        """
+        Append one record to the active segment
+        Returns True if the append closed the segment (compaction is due)
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        with self._locked():
+            self._open_active()
+
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+            if self._file.tell() >= self.segment_max_bytes:
+                self._rotate_locked()
+                return True
+
+        return False
+
+    def _rotate_locked(self):
+        active = self._active_segment()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_number = None
+
+        # Creating the next segment is what tells other processes this one is closed
+        open(self._segment_path(active + 1), 'a').close()
+        return active
+
+    def rotate(self):
+        """
+        Close the active segment so that new appends go to a fresh one
+        Returns the number of the last closed segment
+        """
+        with self._locked():
+            active = self._active_segment()
+            path = self._segment_path(active)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return active - 1
+            return self._rotate_locked()
+
+    def replay(self, upto=None):
+        """
+        Yield every record written after the last checkpoint, in append order.
+        A torn final line left by a crash is skipped.
+        """
+        checkpoint = self.checkpoint()
+
+        for number in self.segments():
+            if number <= checkpoint or (upto is not None and number > upto):
+                continue
+
+            with open(self._segment_path(number), 'r') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Skipping corrupt journal line in segment {number}")
+
+    def mark_compacted(self, segment):
+        """Record that all segments up to and including `segment` are in the snapshot, and delete them."""
+        with self._locked():
+            temp_path = self.checkpoint_file + ".tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({"segment": segment}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.checkpoint_file)
+
+            for number in self.segments():
+                if number <= segment:
+                    try:
+                        os.unlink(self._segment_path(number))
+                    except FileNotFoundError:
+                        pass
+
+    def claim_writer(self):
+        """
+        Make this process the journal's only writer, for owners that fold
+        their own in-memory view into the snapshot (see JSONStorage)
+        Raises RuntimeError if another process already holds the claim
+        """
+        with self._lock:
+            if self._writer_file is not None or fcntl is None:
+                return
+
+            writer_file = open(os.path.join(self.directory, f"{self.prefix}.writer"), 'a')
+            try:
+                fcntl.flock(writer_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                writer_file.close()
+                raise RuntimeError(f"Another process is already writing the {self.prefix} journal in {self.directory}")
+
+            # Held until the process exits
+            self._writer_file = writer_file
+
+    def close(self):
+        """Close the active segment file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._file_number = None
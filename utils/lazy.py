@@ -0,0 +1,60 @@
+import importlib
+
+# Heavy third-party modules are imported on first use, so pages that do not
+# chart or tabulate (login, home) never pay for them on a cold start
+_modules = {}
+
+def _load(name):
+    module = _modules.get(name)
+    if module is None:
+        module = _modules[name] = importlib.import_module(name)
+    return module
+
+# Function to get pandas
+def get_pandas():
+    """
+    Import pandas on first use
+    """
+    return _load("pandas")
+
+# Function to get numpy
+def get_numpy():
+    """
+    Import numpy on first use
+    """
+    return _load("numpy")
+
+# Function to get matplotlib.pyplot
+def get_pyplot():
+    """
+    Import matplotlib.pyplot on first use
+    """
+    return _load("matplotlib.pyplot")
+
+# Function to get plotly.express
+def get_plotly_express():
+    """
+    Import plotly.express on first use
+    """
+    return _load("plotly.express")
+
+# Function to get plotly.graph_objects
+def get_plotly_graph_objects():
+    """
+    Import plotly.graph_objects on first use
+    """
+    return _load("plotly.graph_objects")
+
+# Function to get PIL.Image
+def get_pil_image():
+    """
+    Import PIL.Image on first use
+    """
+    return _load("PIL.Image")
+
+# Function to get pyotp
+def get_pyotp():
+    """
+    Import pyotp on first use
+    """
+    return _load("pyotp")
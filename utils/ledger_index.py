@@ -0,0 +1,141 @@
+import bisect
+import datetime
+import threading
+
+# Sort keys maintained for every user; ids break ties so keys are unique
+ORDERINGS = {
+    "time": lambda tx: (tx["timestamp"], tx["id"]),
+    "amount": lambda tx: (tx["amount"], tx["id"]),
+}
+
+# Supported orderings for paginated history: sort name -> (ordering, descending)
+SORTS = {
+    "newest": ("time", True),
+    "oldest": ("time", False),
+    "amount_desc": ("amount", True),
+    "amount_asc": ("amount", False),
+}
+
+class _SortedRows:
+    """Rows kept sorted by a key function, with the keys in a parallel list for bisect."""
+
+    def __init__(self, key_func):
+        self.key_func = key_func
+        self.keys = []
+        self.rows = []
+
+    def add(self, row):
+        """Insert a row in key order. Returns its position."""
+        key = self.key_func(row)
+
+        # Postings usually arrive in key order, so appending is the common case
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.rows.append(row)
+            return len(self.rows) - 1
+
+        position = bisect.bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.rows.insert(position, row)
+        return position
+
+    def page(self, cursor, limit, descending):
+        if descending:
+            end = len(self.keys) if cursor is None else bisect.bisect_left(self.keys, tuple(cursor))
+            return self.rows[max(0, end - limit):end][::-1]
+
+        start = 0 if cursor is None else bisect.bisect_right(self.keys, tuple(cursor))
+        return self.rows[start:start + limit]
+
+# Function to convert a datetime, ISO string or number to epoch seconds
+def to_epoch(value):
+    """
+    Convert a datetime, ISO-8601 string or epoch number to epoch seconds
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.timestamp()
+
+class UserTransactionIndex:
+    """
+    Per-user transaction index for keyset pagination and time-range queries.
+
+    Rows are kept sorted by (timestamp, id) and by (amount, id), for all
+    transactions and separately per type, so a page for any sort and type
+    filter is found by binary search in O(log n + limit). The time-ordered
+    rows carry a parallel list of parsed epoch values, so a [start, end)
+    window is located by binary search as well. Running credit and debit
+    totals are kept alongside.
+    """
+
+    def __init__(self, transactions=()):
+        self._lock = threading.Lock()
+        self._lists = {}
+        self._epochs = []
+        self.totals = {"credit": 0, "debit": 0}
+        self.count = 0
+
+        for transaction in transactions:
+            self.add(transaction)
+
+    def _sorted_rows(self, ordering, tx_type):
+        rows = self._lists.get((ordering, tx_type))
+        if rows is None:
+            rows = self._lists[(ordering, tx_type)] = _SortedRows(ORDERINGS[ordering])
+        return rows
+
+    def add(self, transaction):
+        """Add one transaction to every ordering."""
+        with self._lock:
+            for ordering in ORDERINGS:
+                position = self._sorted_rows(ordering, None).add(transaction)
+                self._sorted_rows(ordering, transaction["type"]).add(transaction)
+
+                # Timestamps are parsed once, when the posting is indexed
+                if ordering == "time":
+                    self._epochs.insert(position, to_epoch(transaction["timestamp"]))
+
+            if transaction["type"] in self.totals:
+                self.totals[transaction["type"]] += transaction["amount"]
+            self.count += 1
+
+    def page(self, cursor=None, limit=20, tx_type=None, sort="newest"):
+        """
+        Get one page of transactions after `cursor`
+        Returns (rows, next_cursor); next_cursor is None on the last page
+        """
+        ordering, descending = SORTS[sort]
+
+        with self._lock:
+            rows = self._sorted_rows(ordering, tx_type).page(cursor, limit + 1, descending)
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, list(ORDERINGS[ordering](rows[-1]))
+
+        return rows, None
+
+    def range_totals(self, start, end):
+        """
+        Sum credits and debits with start <= timestamp < end in O(log n + k)
+        start/end may be datetimes, ISO strings or epoch seconds
+        Returns dictionary with credit/debit totals and counts
+        """
+        result = {"credit": 0, "debit": 0, "credit_count": 0, "debit_count": 0}
+
+        with self._lock:
+            rows = self._sorted_rows("time", None).rows
+            lo = bisect.bisect_left(self._epochs, to_epoch(start))
+            hi = bisect.bisect_left(self._epochs, to_epoch(end))
+            window = rows[lo:hi]
+
+        for transaction in window:
+            if transaction["type"] in ("credit", "debit"):
+                result[transaction["type"]] += transaction["amount"]
+                result[f"{transaction['type']}_count"] += 1
+
+        return result
@@ -0,0 +1,87 @@
+import os
+import zlib
+import threading
+from contextlib import contextmanager
+
+# fcntl is only available on POSIX; elsewhere only in-process locking applies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Base directory for lock files
+DATA_DIR = "data"
+LOCK_DIR = os.path.join(DATA_DIR, "locks")
+
+# Number of in-process lock stripes shared by all users
+LOCK_STRIPES = 64
+
+_stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+_held = threading.local()
+
+# Function to map a user to a lock stripe
+def _stripe_for(user_id):
+    return zlib.crc32(str(user_id).encode()) % LOCK_STRIPES
+
+# Function to lock several users at once
+@contextmanager
+def users_lock(*user_ids):
+    """
+    Lock one or more users for the duration of the with-block.
+
+    Threads in this process are serialized through a striped lock table and
+    other processes through an advisory fcntl lock on data/locks/<user_id>.lock.
+    Locks are always taken in a deterministic order so that two callers locking
+    the same pair of users cannot deadlock. Users already locked by the current
+    thread are skipped, so nested locking of the same user is safe. Locking
+    new users while the thread already holds others would bypass that order
+    (and could wait on a stripe the thread holds itself), so it raises
+    RuntimeError; lock every user needed in the outermost call instead.
+    """
+    held = getattr(_held, "users", None)
+    if held is None:
+        held = _held.users = set()
+
+    user_ids = sorted({str(user_id) for user_id in user_ids} - held)
+
+    if user_ids and held:
+        raise RuntimeError(
+            f"Cannot lock {', '.join(user_ids)} while holding {', '.join(sorted(held))}; "
+            "lock all users in one users_lock call"
+        )
+    stripes = sorted({_stripe_for(user_id) for user_id in user_ids})
+    acquired_stripes = []
+    lock_files = []
+
+    try:
+        for stripe in stripes:
+            _stripes[stripe].acquire()
+            acquired_stripes.append(stripe)
+
+        if fcntl is not None:
+            os.makedirs(LOCK_DIR, exist_ok=True)
+            for user_id in user_ids:
+                lock_file = open(os.path.join(LOCK_DIR, f"{user_id}.lock"), 'a')
+                lock_files.append(lock_file)
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+        held.update(user_ids)
+        yield
+    finally:
+        held.difference_update(user_ids)
+
+        for lock_file in reversed(lock_files):
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            finally:
+                lock_file.close()
+
+        for stripe in reversed(acquired_stripes):
+            _stripes[stripe].release()
+
+# Function to lock a single user
+def user_lock(user_id):
+    """
+    Lock a single user for the duration of the with-block
+    """
+    return users_lock(user_id)
@@ -0,0 +1,293 @@
+import os
+import json
+import struct
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+# fcntl is only available on POSIX; elsewhere only in-process locking applies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Base directory for contact messages
+DATA_DIR = "data"
+MESSAGES_DIR = os.path.join(DATA_DIR, "contact_messages")
+LEGACY_MESSAGES_FILE = os.path.join(DATA_DIR, "contact_messages.json")
+
+# Segment size before appends move on to a new segment
+SEGMENT_MAX_BYTES = int(os.environ.get("HORIZONITE_MESSAGES_SEGMENT_BYTES", 4 * 1024 * 1024))
+
+# One index record per message: segment number, byte offset, line length, timestamp key
+INDEX_RECORD = struct.Struct("<IQId")
+
+class _IndexKeys:
+    """Sequence view over the timestamp keys of an open index file, for bisect."""
+
+    def __init__(self, f, count):
+        self.f = f
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        self.f.seek(position * INDEX_RECORD.size)
+        return INDEX_RECORD.unpack(self.f.read(INDEX_RECORD.size))[3]
+
+class ContactMessageStore:
+    """
+    Append-only contact message store.
+
+    Messages are JSON lines in numbered segments, and messages.idx holds one
+    fixed-width record per message (segment, offset, length, timestamp key) in
+    append order. A submission is one line plus one index record, so it costs
+    O(1) however many messages exist. Readers only touch the index records and
+    lines they need: tail() reads the last N records, and between() bisects
+    the timestamp keys. Keys are made non-decreasing at append time (a message
+    stamped earlier than its predecessor is keyed at the predecessor's time),
+    so bisecting stays valid.
+
+    Appends are serialized by a thread lock and an fcntl lock on the index.
+    An append interrupted between the line and its index record is repaired
+    by the next append: complete lines are indexed and a torn line is cut off.
+    """
+
+    def __init__(self, directory=MESSAGES_DIR, prefix="messages", segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_max_bytes = segment_max_bytes
+        self.index_file = os.path.join(directory, f"{prefix}.idx")
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"{self.prefix}-{number:06d}.jsonl")
+
+    @staticmethod
+    def _timestamp_key(message):
+        try:
+            return datetime.fromisoformat(str(message.get("timestamp"))).timestamp()
+        except (TypeError, ValueError):
+            return datetime.now().timestamp()
+
+    def _last_record(self, index):
+        index.seek(0, os.SEEK_END)
+        size = index.tell() - index.tell() % INDEX_RECORD.size
+        if size == 0:
+            return None
+        index.seek(size - INDEX_RECORD.size)
+        return INDEX_RECORD.unpack(index.read(INDEX_RECORD.size))
+
+    def _repair_locked(self, index):
+        """Drop a torn index record and index any complete lines written after the last record."""
+        index.seek(0, os.SEEK_END)
+        size = index.tell()
+        if size % INDEX_RECORD.size:
+            index.truncate(size - size % INDEX_RECORD.size)
+
+        last = self._last_record(index)
+        if last is None:
+            segment, end, key = 1, 0, 0.0
+        else:
+            segment, offset, length, key = last
+            end = offset + length
+
+        path = self._segment_path(segment)
+        while os.path.exists(path):
+            if os.path.getsize(path) > end:
+                with open(path, 'r+b') as f:
+                    f.seek(end)
+                    offset = end
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            key = max(key, self._timestamp_key(json.loads(line)))
+                        except (json.JSONDecodeError, AttributeError):
+                            pass
+                        last = (segment, offset, len(line), key)
+                        index.write(INDEX_RECORD.pack(*last))
+                        offset += len(line)
+                    f.truncate(offset)
+                index.flush()
+
+            # Later segments exist only if this one was full
+            segment, end = segment + 1, 0
+            path = self._segment_path(segment)
+
+        return last
+
+    def _locked_index(self):
+        index = open(self.index_file, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(index.fileno(), fcntl.LOCK_EX)
+        return index
+
+    def _append_locked(self, index, messages):
+        last = self._repair_locked(index)
+        if last is None:
+            segment, end, key = 1, 0, 0.0
+        else:
+            segment, offset, length, key = last
+            end = offset + length
+
+        if end >= self.segment_max_bytes:
+            segment, end = segment + 1, 0
+
+        records = []
+        with open(self._segment_path(segment), 'ab') as f:
+            for message in messages:
+                line = (json.dumps(message, separators=(",", ":")) + "\n").encode()
+                key = max(key, self._timestamp_key(message))
+                records.append(INDEX_RECORD.pack(segment, end, len(line), key))
+                f.write(line)
+                end += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index.seek(0, os.SEEK_END)
+        position = index.tell() // INDEX_RECORD.size
+        index.write(b"".join(records))
+        index.flush()
+        return position
+
+    def append(self, message):
+        """
+        Append one message (a dictionary with a "timestamp")
+        Returns the position of the message in the store
+        """
+        with self._lock, self._locked_index() as index:
+            return self._append_locked(index, [message])
+
+    def import_legacy(self, file_path=LEGACY_MESSAGES_FILE):
+        """
+        Move the messages of an old contact_messages.json into an empty store.
+        The old file is renamed to <name>.migrated.
+        Returns the number of messages imported
+        """
+        if not os.path.exists(file_path):
+            return 0
+
+        with self._lock, self._locked_index() as index:
+            # Another process may have imported it while we waited
+            if not os.path.exists(file_path):
+                return 0
+            if self._repair_locked(index) is not None:
+                return 0
+
+            try:
+                with open(file_path, 'r') as f:
+                    messages = json.load(f).get("messages", [])
+            except (json.JSONDecodeError, AttributeError):
+                messages = []
+
+            messages = sorted(messages, key=self._timestamp_key)
+            if messages:
+                self._append_locked(index, messages)
+            os.replace(file_path, file_path + ".migrated")
+            return len(messages)
+
+    def _read(self, index, positions):
+        """Load the messages at the given index positions, in the given order."""
+        records = []
+        for position in positions:
+            index.seek(position * INDEX_RECORD.size)
+            records.append(INDEX_RECORD.unpack(index.read(INDEX_RECORD.size)))
+
+        messages = []
+        segments = {}
+        try:
+            for segment, offset, length, _ in records:
+                f = segments.get(segment)
+                if f is None:
+                    f = segments[segment] = open(self._segment_path(segment), 'rb')
+                f.seek(offset)
+                messages.append(json.loads(f.read(length)))
+        finally:
+            for f in segments.values():
+                f.close()
+        return messages
+
+    def _open_index(self):
+        try:
+            index = open(self.index_file, 'rb')
+        except FileNotFoundError:
+            return None, 0
+        index.seek(0, os.SEEK_END)
+        return index, index.tell() // INDEX_RECORD.size
+
+    def count(self):
+        """Get the number of stored messages."""
+        try:
+            return os.path.getsize(self.index_file) // INDEX_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def date_range(self):
+        """
+        Get the (oldest, newest) timestamp keys as datetimes
+        Returns (None, None) for an empty store
+        """
+        index, count = self._open_index()
+        if not count:
+            if index is not None:
+                index.close()
+            return None, None
+        with index:
+            keys = _IndexKeys(index, count)
+            return datetime.fromtimestamp(keys[0]), datetime.fromtimestamp(keys[count - 1])
+
+    def tail(self, n):
+        """Get the newest `n` messages, newest first."""
+        index, count = self._open_index()
+        if index is None:
+            return []
+        with index:
+            return self._read(index, range(count - 1, max(count - n, 0) - 1, -1))
+
+    def between(self, start, end, limit=None):
+        """
+        Get the messages keyed at or after `start` and before `end` (datetimes), newest first
+        With `limit`, only the newest `limit` of them are returned
+        """
+        index, count = self._open_index()
+        if index is None:
+            return []
+        with index:
+            keys = _IndexKeys(index, count)
+            first = bisect_left(keys, start.timestamp())
+            last = bisect_left(keys, end.timestamp(), lo=first)
+            if limit is not None:
+                first = max(first, last - limit)
+            return self._read(index, range(last - 1, first - 1, -1))
+
+    def count_between(self, start, end):
+        """Get the number of messages keyed at or after `start` and before `end`."""
+        index, count = self._open_index()
+        if index is None:
+            return 0
+        with index:
+            keys = _IndexKeys(index, count)
+            first = bisect_left(keys, start.timestamp())
+            return bisect_left(keys, end.timestamp(), lo=first) - first
+
+_store = None
+_store_lock = threading.Lock()
+
+# Function to get the shared contact message store
+def get_contact_store():
+    """
+    Get the process-wide contact message store, importing a legacy
+    contact_messages.json into it on first use
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = ContactMessageStore()
+                store.import_legacy()
+                _store = store
+    return _store
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import glob
+import shutil
+import sqlite3
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from utils.cache import invalidate
+
+# fcntl is only available on POSIX; elsewhere only in-process locking applies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Money is stored as whole paise (int64) in every persisted record
+PAISE_PER_RUPEE = 100
+
+# Base directory for data
+DATA_DIR = "data"
+MONEY_FILE = os.path.join(DATA_DIR, "money.json")
+
+# Converted copies are staged next to the originals with this suffix
+STAGING_SUFFIX = ".paise"
+
+# Record fields that hold an amount of money
+MONEY_FIELDS = ("amount", "balance", "balance_after", "emi")
+
+# Function to convert rupees to paise
+def to_paise(amount):
+    """
+    Convert an amount in rupees (int, float, string or Decimal) to whole paise,
+    rounding half away from zero
+    """
+    paise = (Decimal(str(amount)) * PAISE_PER_RUPEE).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return int(paise)
+
+# Function to convert paise to rupees
+def to_rupees(paise):
+    """
+    Convert whole paise to rupees, for charts and calculations that need a float
+    """
+    return paise / PAISE_PER_RUPEE
+
+# Function to format an amount of money
+def format_money(paise):
+    """
+    Format whole paise as rupees, e.g. 123456789 -> "₹1,234,567.89"
+    Formatting is done on the integer, so there is no float rounding
+    """
+    paise = int(paise)
+    rupees, remainder = divmod(abs(paise), PAISE_PER_RUPEE)
+    return f"{'-' if paise < 0 else ''}₹{rupees:,}.{remainder:02d}"
+
+# Function to convert the money fields of a record
+def _convert(value):
+    """Convert every MONEY_FIELDS number in nested dictionaries and lists from rupees to paise."""
+    if isinstance(value, dict):
+        return {
+            key: to_paise(item) if key in MONEY_FIELDS and isinstance(item, (int, float)) and not isinstance(item, bool)
+            else _convert(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_convert(item) for item in value]
+    return value
+
+def _stage_json(file_path):
+    """Write the converted copy of a JSON file to <file>.paise; the original is left alone."""
+    try:
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+    with open(file_path + STAGING_SUFFIX, 'w') as f:
+        json.dump(_convert(data), f, indent=4)
+    return True
+
+def _stage_jsonl(file_path):
+    """Write the converted copy of a JSON-lines file to <file>.paise; the original is left alone."""
+    lines = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            try:
+                lines.append(json.dumps(_convert(json.loads(line)), separators=(",", ":")) + "\n")
+            except json.JSONDecodeError:
+                # A torn line is kept as it is; replay skips it
+                lines.append(line)
+
+    with open(file_path + STAGING_SUFFIX, 'w') as f:
+        f.writelines(lines)
+    return True
+
+def _migrate_sqlite(db_path):
+    """Rebuild the accounts and transactions tables with INTEGER paise columns."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(transactions)")}
+        if columns.get("amount", "").upper() != "REAL":
+            return False
+
+        # Indexes go with the old tables; SQLiteStorage recreates them on open
+        conn.executescript("""
+            PRAGMA foreign_keys=OFF;
+            BEGIN;
+            CREATE TABLE accounts_paise (
+                username TEXT PRIMARY KEY REFERENCES users(username),
+                account_number TEXT UNIQUE NOT NULL,
+                balance INTEGER NOT NULL DEFAULT 0,
+                account_type TEXT,
+                status TEXT,
+                created_at TEXT
+            );
+            INSERT INTO accounts_paise
+                SELECT username, account_number, CAST(ROUND(balance * 100) AS INTEGER), account_type, status, created_at
+                FROM accounts;
+            DROP TABLE accounts;
+            ALTER TABLE accounts_paise RENAME TO accounts;
+
+            CREATE TABLE transactions_paise (
+                username TEXT NOT NULL REFERENCES users(username),
+                id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                description TEXT,
+                timestamp TEXT NOT NULL,
+                PRIMARY KEY (username, id)
+            );
+            INSERT INTO transactions_paise
+                SELECT username, id, type, CAST(ROUND(amount * 100) AS INTEGER), description, timestamp
+                FROM transactions;
+            DROP TABLE transactions;
+            ALTER TABLE transactions_paise RENAME TO transactions;
+            COMMIT;
+            PRAGMA foreign_keys=ON;
+        """)
+        return True
+    finally:
+        conn.close()
+
+# Function to read the migration state
+def _read_state(money_file):
+    try:
+        with open(money_file, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _write_state(money_file, state):
+    os.makedirs(os.path.dirname(money_file) or ".", exist_ok=True)
+    temp_path = money_file + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(temp_path, money_file)
+
+# Function to migrate stored rupee amounts to paise
+def migrate_to_paise(data_dir=DATA_DIR):
+    """
+    Convert every persisted amount under data_dir from rupees to paise:
+    the users/accounts/transactions JSON files, the journals, the SQLite
+    database and the per-user documents. Rollups and the columnar ledger
+    are removed so they are backfilled from the converted history.
+
+    The migration is safe to rerun. Converted copies are first staged as
+    <file>.paise while the originals are left alone, then the list of staged
+    files is recorded in money.json, and only then are the copies swapped in.
+    A rerun after a crash either stages again from untouched originals or
+    finishes the recorded swaps, so no amount is converted twice. Once done,
+    money.json records {"unit": "paise"} and later calls do nothing.
+    Returns the number of files converted
+    """
+    money_file = os.path.join(data_dir, "money.json")
+    state = _read_state(money_file)
+    if state.get("unit") == "paise":
+        return 0
+
+    staged = state.get("staged")
+    if staged is None:
+        staged = []
+        json_files = [os.path.join(data_dir, name) for name in ("accounts.json", "transactions.json")]
+        json_files += sorted(glob.glob(os.path.join(data_dir, "users", "*.json")))
+        for file_path in json_files:
+            if _stage_json(file_path):
+                staged.append(os.path.relpath(file_path, data_dir))
+
+        for file_path in sorted(glob.glob(os.path.join(data_dir, "journal", "*.jsonl"))):
+            if _stage_jsonl(file_path):
+                staged.append(os.path.relpath(file_path, data_dir))
+
+        # The commit point: from here on the staged copies replace the originals
+        _write_state(money_file, {"unit": "rupees", "staged": staged})
+
+    for name in staged:
+        file_path = os.path.join(data_dir, name)
+        if os.path.exists(file_path + STAGING_SUFFIX):
+            os.replace(file_path + STAGING_SUFFIX, file_path)
+            invalidate(file_path)
+    converted = len(staged)
+
+    # The SQLite tables are converted in one transaction, and only while their columns are REAL
+    db_path = os.path.join(data_dir, "horizonite.db")
+    if os.path.exists(db_path):
+        converted += _migrate_sqlite(db_path)
+
+    # Derived stores are rebuilt from history on next use
+    for file_path in glob.glob(os.path.join(data_dir, "rollups", "*.jsonl")):
+        os.unlink(file_path)
+    shutil.rmtree(os.path.join(data_dir, "columnar"), ignore_errors=True)
+
+    _write_state(money_file, {"unit": "paise"})
+    return converted
+
+_checked = False
+_checked_lock = threading.Lock()
+
+# Function to make sure stored amounts are in paise
+def ensure_paise(data_dir=DATA_DIR):
+    """
+    Run migrate_to_paise once per install; entry points call this before any
+    store is opened. data/money.json records that amounts are stored in paise;
+    the migration is serialized across processes with an fcntl lock.
+    Returns the number of files converted
+    """
+    global _checked
+
+    if _checked:
+        return 0
+
+    with _checked_lock:
+        if _checked:
+            return 0
+
+        converted = 0
+        money_file = os.path.join(data_dir, "money.json")
+        if _read_state(money_file).get("unit") != "paise":
+            os.makedirs(os.path.join(data_dir, "locks"), exist_ok=True)
+            with open(os.path.join(data_dir, "locks", "money.lock"), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+                # Does nothing if another process finished the migration while we waited
+                converted = migrate_to_paise(data_dir)
+
+        _checked = True
+        return converted
+
+if __name__ == "__main__":
+    # python -m utils.money migrate converts an existing install to paise
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("Usage: python -m utils.money migrate")
+
+    if _read_state(MONEY_FILE).get("unit") == "paise":
+        print("Amounts are already stored in paise")
+    else:
+        converted = ensure_paise()
+        print(f"Converted {converted} data files; amounts are now stored in paise")
@@ -0,0 +1,163 @@
+import os
+import sys
+import threading
+from utils.index import PersistentIndex
+
+# Base directory for rollup stores
+DATA_DIR = "data"
+ROLLUP_DIR = os.path.join(DATA_DIR, "rollups")
+
+# Bucket granularities: name -> length of the ISO timestamp prefix that identifies the bucket
+GRANULARITIES = {"day": 10, "month": 7}
+
+# Function to create an empty bucket
+def empty_bucket():
+    """
+    Get a zeroed rollup bucket
+    """
+    return {"credit": 0, "debit": 0, "credit_count": 0, "debit_count": 0}
+
+class RollupStore:
+    """
+    Materialized per-user and bank-wide rollups of a ledger.
+
+    Every posting updates four buckets (the user's and the bank's, by day
+    and by month) holding credit/debit sums and counts, so dashboards read a
+    handful of buckets instead of scanning raw history. Buckets live in two
+    PersistentIndex logs; if they are missing they are backfilled from
+    `source_func`, which yields (user, transaction) pairs for the whole ledger.
+    Buckets are incremented under the index's file lock, so several worker
+    processes can post at once.
+    """
+
+    def __init__(self, name, source_func):
+        self.name = name
+        self.source_func = source_func
+        self._lock = threading.RLock()
+        self.users = PersistentIndex(
+            os.path.join(ROLLUP_DIR, f"{name}-users.jsonl"),
+            lambda: self._backfill()[0]
+        )
+        self.bank = PersistentIndex(
+            os.path.join(ROLLUP_DIR, f"{name}-bank.jsonl"),
+            lambda: self._backfill()[1]
+        )
+
+    def _bucket_keys(self, user, timestamp):
+        for granularity, length in GRANULARITIES.items():
+            bucket = timestamp[:length]
+            yield f"{user}|{granularity}|{bucket}", f"{granularity}|{bucket}"
+
+    def _backfill(self):
+        """Compute every bucket from the full ledger history."""
+        users = {}
+        bank = {}
+
+        for user, transaction in self.source_func():
+            if transaction.get("type") not in ("credit", "debit") or not transaction.get("timestamp"):
+                continue
+            for user_key, bank_key in self._bucket_keys(user, transaction["timestamp"]):
+                for buckets, key in ((users, user_key), (bank, bank_key)):
+                    bucket = buckets.setdefault(key, empty_bucket())
+                    bucket[transaction["type"]] += transaction["amount"]
+                    bucket[f"{transaction['type']}_count"] += 1
+
+        return users, bank
+
+    def load(self):
+        """
+        Load the buckets, backfilling them from history if they are missing.
+        Writers call this before posting so a backfill never counts a posting twice.
+        """
+        len(self.users)
+        len(self.bank)
+        return self
+
+    def record(self, user, transaction):
+        """Add one posting to the user's and the bank's day and month buckets."""
+        tx_type = transaction.get("type")
+        if tx_type not in ("credit", "debit"):
+            return
+
+        delta = {tx_type: transaction["amount"], f"{tx_type}_count": 1}
+        user_deltas = {}
+        bank_deltas = {}
+        for user_key, bank_key in self._bucket_keys(user, transaction["timestamp"]):
+            user_deltas[user_key] = delta
+            bank_deltas[bank_key] = delta
+
+        # Each index adds the deltas under its file lock, so other workers' postings are kept
+        with self._lock:
+            self.users.increment_many(user_deltas, empty_bucket())
+            self.bank.increment_many(bank_deltas, empty_bucket())
+
+    def user_bucket(self, user, granularity, bucket):
+        """
+        Get one bucket of a user, e.g. user_bucket("alice", "month", "2025-05")
+        Returns dictionary with credit/debit totals and counts
+        """
+        return dict(self.users.get(f"{user}|{granularity}|{bucket}") or empty_bucket())
+
+    def bank_buckets(self, granularity):
+        """
+        Get every bank-wide bucket of a granularity
+        Returns dictionary of bucket -> totals, in chronological order
+        """
+        prefix = f"{granularity}|"
+        return dict(sorted(
+            (key[len(prefix):], dict(value))
+            for key, value in self.bank.items()
+            if key.startswith(prefix)
+        ))
+
+    def rebuild(self):
+        """Recompute every bucket from history and replace the stored rollups."""
+        with self._lock:
+            users, bank = self._backfill()
+            self.users.rebuild(users)
+            self.bank.rebuild(bank)
+
+# Function to iterate over the Home.py ledger
+def _ledger_source():
+    from utils.storage import get_storage
+    return get_storage().iter_all_transactions()
+
+# Function to iterate over the per-user account ledger of utils.db
+def _accounts_source():
+    from utils.db import iter_user_files
+    for user_data in iter_user_files():
+        for account in user_data.get("accounts", []):
+            for transaction in account.get("transactions", []):
+                yield user_data["user_id"], transaction
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _get_store(name, source_func):
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = RollupStore(name, source_func)
+        return _stores[name]
+
+# Function to get the rollups of the Home.py ledger
+def get_ledger_rollups():
+    """
+    Get the rollup store for users, accounts and transactions kept by utils.storage
+    """
+    return _get_store("ledger", _ledger_source)
+
+# Function to get the rollups of the utils.db account ledger
+def get_account_rollups():
+    """
+    Get the rollup store for the accounts kept in data/users/
+    """
+    return _get_store("accounts", _accounts_source)
+
+if __name__ == "__main__":
+    # python -m utils.rollups rebuild backfills every rollup store from history
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("Usage: python -m utils.rollups rebuild")
+
+    for store in (get_ledger_rollups(), get_account_rollups()):
+        store.rebuild()
+        print(f"Rebuilt {store.name} rollups: {len(store.users)} user buckets, {len(store.bank)} bank buckets")
@@ -0,0 +1,819 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import threading
+import copy
+import datetime
+from urllib.parse import quote, unquote
+from utils.cache import load_json_cached, invalidate
+from utils.journal import TransactionJournal
+from utils.ledger_index import UserTransactionIndex, SORTS, to_epoch
+from utils.money import ensure_paise
+from utils.binlog import BinaryTransactionLog, to_micros, from_micros
+
+# Base directory for data
+DATA_DIR = "data"
+USERS_FILE = os.path.join(DATA_DIR, "users.json")
+ACCOUNTS_FILE = os.path.join(DATA_DIR, "accounts.json")
+TRANSACTIONS_FILE = os.path.join(DATA_DIR, "transactions.json")
+SQLITE_FILE = os.path.join(DATA_DIR, "horizonite.db")
+JOURNAL_DIR = os.path.join(DATA_DIR, "journal")
+BINLOG_DIR = os.path.join(DATA_DIR, "binlog")
+
+# Storage backend: "json" for small installs, "sqlite" for larger ones,
+# "binary" for high-volume accounts
+STORAGE_BACKEND = os.environ.get("HORIZONITE_STORAGE", "json").lower()
+
+# Columns stored for each user and account in the SQLite backend
+USER_FIELDS = ["password", "email", "full_name", "address", "phone", "status", "created_at"]
+ACCOUNT_FIELDS = ["account_number", "balance", "account_type", "status", "created_at"]
+
+# Function to load data from a JSON file
+def load_data(file_path, for_update=False):
+    """
+    Load data from a JSON file through the shared read cache.
+    Pass for_update=True to get a private copy that is safe to mutate.
+    """
+    try:
+        data = load_json_cached(file_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return copy.deepcopy(data) if for_update else data
+
+# Function to save data to a JSON file
+def save_data(data, file_path):
+    """Save data to a JSON file."""
+    # Write to a temporary file first so readers never see a half-written file
+    temp_path = file_path + ".tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(temp_path, file_path)
+    finally:
+        invalidate(file_path)
+
+class JSONStorage:
+    """
+    Storage backend keeping users and accounts in JSON files.
+
+    Transactions are appended to a JSON-lines journal instead of rewriting
+    transactions.json on every posting. At startup the journal is replayed
+    on top of the last snapshot (transactions.json and the balances in
+    accounts.json); a background compaction folds closed journal segments
+    back into that snapshot. Compaction writes this process's in-memory
+    view, so only one process may post: the first posting claims the
+    journal (TransactionJournal.claim_writer), and posting from a second
+    process raises RuntimeError. Suits small, single-process installs; use
+    the sqlite backend for several worker processes.
+    """
+
+    name = "json"
+
+    def __init__(self, data_dir=DATA_DIR, journal_dir=None):
+        self.users_file = os.path.join(data_dir, "users.json")
+        self.accounts_file = os.path.join(data_dir, "accounts.json")
+        self.transactions_file = os.path.join(data_dir, "transactions.json")
+        self._lock = threading.RLock()
+        self._compacting = False
+
+        # Initialize data files if they don't exist
+        os.makedirs(data_dir, exist_ok=True)
+        for file_path in [self.users_file, self.accounts_file, self.transactions_file]:
+            if not os.path.exists(file_path):
+                save_data({}, file_path)
+
+        self.journal = TransactionJournal(journal_dir or os.path.join(data_dir, "journal"))
+        self._replay()
+
+    def _replay(self):
+        """Rebuild transactions and balances from the snapshot plus the journal."""
+        self._indexes = {}
+        self._transactions = load_data(self.transactions_file, for_update=True)
+        self._balances = {
+            username: account.get("balance", 0)
+            for username, account in load_data(self.accounts_file).items()
+        }
+
+        for record in self.journal.replay():
+            username = record.pop("username")
+            balance_after = record.pop("balance_after")
+            tx_list = self._transactions.setdefault(username, [])
+
+            # Records already folded into the snapshot are skipped, which
+            # keeps replay idempotent if a compaction was interrupted
+            if record["id"] > len(tx_list):
+                tx_list.append(record)
+            self._balances[username] = balance_after
+
+    def get_user(self, username):
+        """Get a user record (including the password hash) or None."""
+        user = load_data(self.users_file).get(username)
+        return dict(user) if user is not None else None
+
+    def create_user(self, username, user, account):
+        """
+        Create a user together with their account
+        Returns (success, message) tuple
+        """
+        with self._lock:
+            users = load_data(self.users_file, for_update=True)
+
+            if username in users:
+                return False, "Username already exists"
+
+            users[username] = user
+            save_data(users, self.users_file)
+
+            accounts = load_data(self.accounts_file, for_update=True)
+            accounts[username] = account
+            save_data(accounts, self.accounts_file)
+
+            self._balances[username] = account.get("balance", 0)
+
+        return True, "Registration successful"
+
+    def update_user(self, username, fields):
+        """Update fields of a user record. Returns True if the user exists."""
+        with self._lock:
+            users = load_data(self.users_file, for_update=True)
+
+            if username not in users:
+                return False
+
+            users[username].update(fields)
+            save_data(users, self.users_file)
+
+        return True
+
+    def get_account(self, username):
+        """Get the account of a user or None."""
+        account = load_data(self.accounts_file).get(username)
+
+        if account is None:
+            return None
+
+        account = dict(account)
+        with self._lock:
+            account["balance"] = self._balances.get(username, account.get("balance", 0))
+        return account
+
+    def get_users(self):
+        """Get every user record (including the password hash), keyed by username."""
+        return {username: dict(user) for username, user in load_data(self.users_file).items()}
+
+    def get_accounts(self):
+        """Get every account with its current balance, keyed by username."""
+        return {username: self.get_account(username) for username in load_data(self.accounts_file)}
+
+    def get_transactions(self, username):
+        """Get all transactions of a user in posting order."""
+        with self._lock:
+            return list(self._transactions.get(username, []))
+
+    def iter_all_transactions(self):
+        """Yield (username, transaction) for every transaction in the ledger."""
+        with self._lock:
+            snapshot = [(username, list(tx_list)) for username, tx_list in self._transactions.items()]
+        for username, tx_list in snapshot:
+            for transaction in tx_list:
+                yield username, transaction
+
+    def _index_for(self, username):
+        """Get the user's transaction index, building it on first use."""
+        index = self._indexes.get(username)
+        if index is None:
+            index = self._indexes[username] = UserTransactionIndex(self._transactions.get(username, []))
+        return index
+
+    def get_transactions_page(self, username, cursor=None, limit=20, tx_type=None, sort="newest"):
+        """
+        Get one page of a user's transactions using keyset pagination
+        Returns (transactions, next_cursor); next_cursor is None on the last page
+        """
+        with self._lock:
+            index = self._index_for(username)
+        return index.page(cursor, limit, tx_type, sort)
+
+    def get_transaction_totals(self, username):
+        """Get the total credit and debit amounts of a user."""
+        with self._lock:
+            return dict(self._index_for(username).totals)
+
+    def get_range_totals(self, username, start, end):
+        """
+        Get credit and debit totals and counts of a user for start <= timestamp < end
+        """
+        with self._lock:
+            index = self._index_for(username)
+        return index.range_totals(start, end)
+
+    def add_transaction(self, username, transaction_type, amount, description):
+        """Post a transaction of `amount` paise and update the account balance. Returns the transaction."""
+        # Postings from another process would be missing from this one's compactions
+        self.journal.claim_writer()
+
+        with self._lock:
+            tx_list = self._transactions.setdefault(username, [])
+
+            transaction = {
+                "id": len(tx_list) + 1,
+                "type": transaction_type,
+                "amount": amount,
+                "description": description,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+
+            balance = self._balances.get(username, 0)
+            balance = balance + amount if transaction_type == "credit" else balance - amount
+
+            # The journal line is the commit point; memory is updated after it
+            segment_closed = self.journal.append(
+                dict(transaction, username=username, balance_after=balance)
+            )
+
+            tx_list.append(transaction)
+            self._balances[username] = balance
+            if username in self._indexes:
+                self._indexes[username].add(transaction)
+
+            if segment_closed and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, name="journal-compaction", daemon=True).start()
+
+        return transaction
+
+    def compact(self):
+        """Fold every closed journal segment into transactions.json and accounts.json."""
+        try:
+            with self._lock:
+                upto = self.journal.rotate()
+                transactions = {username: list(tx_list) for username, tx_list in self._transactions.items()}
+                balances = dict(self._balances)
+
+            # Only compaction writes transactions.json, so this can run unlocked
+            save_data(transactions, self.transactions_file)
+
+            with self._lock:
+                accounts = load_data(self.accounts_file, for_update=True)
+                for username, balance in balances.items():
+                    if username in accounts:
+                        accounts[username]["balance"] = balance
+                save_data(accounts, self.accounts_file)
+
+            self.journal.mark_compacted(upto)
+        except Exception as e:
+            print(f"Error compacting transaction journal: {e}")
+        finally:
+            self._compacting = False
+
+class SQLiteStorage:
+    """
+    Storage backend keeping users, accounts and transactions in indexed SQLite tables.
+    The database runs in WAL mode so readers never block the single writer.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path=SQLITE_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    email TEXT,
+                    full_name TEXT,
+                    address TEXT,
+                    phone TEXT,
+                    status TEXT,
+                    created_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+                CREATE TABLE IF NOT EXISTS accounts (
+                    username TEXT PRIMARY KEY REFERENCES users(username),
+                    account_number TEXT UNIQUE NOT NULL,
+                    balance INTEGER NOT NULL DEFAULT 0,
+                    account_type TEXT,
+                    status TEXT,
+                    created_at TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS transactions (
+                    username TEXT NOT NULL REFERENCES users(username),
+                    id INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    amount INTEGER NOT NULL,
+                    description TEXT,
+                    timestamp TEXT NOT NULL,
+                    PRIMARY KEY (username, id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_transactions_user_time
+                    ON transactions(username, timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_transactions_user_type_time
+                    ON transactions(username, type, timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_transactions_user_amount
+                    ON transactions(username, amount, id);
+            """)
+
+    def _connect(self):
+        """Get the connection of the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def get_user(self, username):
+        """Get a user record (including the password hash) or None."""
+        row = self._connect().execute(
+            "SELECT * FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        user = dict(row)
+        user.pop("username")
+        if user.get("status") is None:
+            user.pop("status")
+        return user
+
+    def create_user(self, username, user, account):
+        """
+        Create a user together with their account
+        Returns (success, message) tuple
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO users (username, {', '.join(USER_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' * len(USER_FIELDS))})",
+                    [username] + [user.get(field) for field in USER_FIELDS]
+                )
+                conn.execute(
+                    f"INSERT INTO accounts (username, {', '.join(ACCOUNT_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' * len(ACCOUNT_FIELDS))})",
+                    [username] + [account.get(field) for field in ACCOUNT_FIELDS]
+                )
+        except sqlite3.IntegrityError:
+            if self.get_user(username) is not None:
+                return False, "Username already exists"
+            return False, "Account number already in use, please try again"
+
+        return True, "Registration successful"
+
+    def update_user(self, username, fields):
+        """Update fields of a user record. Returns True if the user exists."""
+        fields = {key: value for key, value in fields.items() if key in USER_FIELDS}
+        if not fields:
+            return self.get_user(username) is not None
+
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE users SET {', '.join(f'{key} = ?' for key in fields)} WHERE username = ?",
+                list(fields.values()) + [username]
+            )
+
+        return cursor.rowcount > 0
+
+    def get_account(self, username):
+        """Get the account of a user or None."""
+        row = self._connect().execute(
+            "SELECT * FROM accounts WHERE username = ?", (username,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        account = dict(row)
+        account.pop("username")
+        return account
+
+    def get_users(self):
+        """Get every user record (including the password hash), keyed by username."""
+        users = {}
+        for row in self._connect().execute("SELECT * FROM users ORDER BY username"):
+            user = dict(row)
+            if user.get("status") is None:
+                user.pop("status")
+            users[user.pop("username")] = user
+        return users
+
+    def get_accounts(self):
+        """Get every account with its current balance, keyed by username."""
+        accounts = {}
+        for row in self._connect().execute("SELECT * FROM accounts ORDER BY username"):
+            account = dict(row)
+            accounts[account.pop("username")] = account
+        return accounts
+
+    def get_transactions(self, username):
+        """Get all transactions of a user in posting order."""
+        rows = self._connect().execute(
+            "SELECT id, type, amount, description, timestamp FROM transactions "
+            "WHERE username = ? ORDER BY id", (username,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_all_transactions(self):
+        """Yield (username, transaction) for every transaction in the ledger."""
+        rows = self._connect().execute(
+            "SELECT username, id, type, amount, description, timestamp FROM transactions ORDER BY username, id"
+        )
+        for row in rows:
+            transaction = dict(row)
+            yield transaction.pop("username"), transaction
+
+    def get_transactions_page(self, username, cursor=None, limit=20, tx_type=None, sort="newest"):
+        """
+        Get one page of a user's transactions using keyset pagination
+        Returns (transactions, next_cursor); next_cursor is None on the last page
+        """
+        ordering, descending = SORTS[sort]
+        column = "timestamp" if ordering == "time" else "amount"
+        direction = "DESC" if descending else "ASC"
+
+        query = "SELECT id, type, amount, description, timestamp FROM transactions WHERE username = ?"
+        params = [username]
+
+        if tx_type is not None:
+            query += " AND type = ?"
+            params.append(tx_type)
+
+        if cursor is not None:
+            query += f" AND ({column}, id) {'<' if descending else '>'} (?, ?)"
+            params.extend(cursor)
+
+        query += f" ORDER BY {column} {direction}, id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in self._connect().execute(query, params).fetchall()]
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, [rows[-1][column], rows[-1]["id"]]
+
+        return rows, None
+
+    def get_transaction_totals(self, username):
+        """Get the total credit and debit amounts of a user."""
+        totals = {"credit": 0, "debit": 0}
+        rows = self._connect().execute(
+            "SELECT type, SUM(amount) FROM transactions WHERE username = ? GROUP BY type", (username,)
+        ).fetchall()
+        for tx_type, total in rows:
+            if tx_type in totals:
+                totals[tx_type] = total
+        return totals
+
+    def get_range_totals(self, username, start, end):
+        """
+        Get credit and debit totals and counts of a user for start <= timestamp < end
+        """
+        result = {"credit": 0, "debit": 0, "credit_count": 0, "debit_count": 0}
+
+        # Stored timestamps are local ISO strings, which sort chronologically
+        start = datetime.datetime.fromtimestamp(to_epoch(start)).isoformat()
+        end = datetime.datetime.fromtimestamp(to_epoch(end)).isoformat()
+
+        rows = self._connect().execute(
+            "SELECT type, SUM(amount), COUNT(*) FROM transactions "
+            "WHERE username = ? AND timestamp >= ? AND timestamp < ? GROUP BY type",
+            (username, start, end)
+        ).fetchall()
+        for tx_type, total, count in rows:
+            if tx_type in ("credit", "debit"):
+                result[tx_type] = total
+                result[f"{tx_type}_count"] = count
+        return result
+
+    def add_transaction(self, username, transaction_type, amount, description):
+        """Post a transaction of `amount` paise and update the account balance. Returns the transaction."""
+        conn = self._connect()
+
+        # BEGIN IMMEDIATE takes the write lock up front so the id cannot race
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            next_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) + 1 FROM transactions WHERE username = ?", (username,)
+            ).fetchone()[0]
+
+            transaction = {
+                "id": next_id,
+                "type": transaction_type,
+                "amount": amount,
+                "description": description,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+
+            conn.execute(
+                "INSERT INTO transactions (username, id, type, amount, description, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (username, next_id, transaction_type, amount, description, transaction["timestamp"])
+            )
+
+            delta = amount if transaction_type == "credit" else -amount
+            conn.execute(
+                "UPDATE accounts SET balance = balance + ? WHERE username = ?", (delta, username)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return transaction
+
+    def import_json(self, json_storage):
+        """
+        Copy every user, account and transaction from a JSON backend
+        Returns the number of users imported
+        """
+        users = load_data(json_storage.users_file)
+        accounts = {username: json_storage.get_account(username) for username in load_data(json_storage.accounts_file)}
+        transactions = {username: json_storage.get_transactions(username) for username in users}
+
+        conn = self._connect()
+        with conn:
+            for username, user in users.items():
+                conn.execute(
+                    f"INSERT OR REPLACE INTO users (username, {', '.join(USER_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' * len(USER_FIELDS))})",
+                    [username] + [user.get(field) for field in USER_FIELDS]
+                )
+
+            for username, account in accounts.items():
+                conn.execute(
+                    f"INSERT OR REPLACE INTO accounts (username, {', '.join(ACCOUNT_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' * len(ACCOUNT_FIELDS))})",
+                    [username] + [account.get(field) for field in ACCOUNT_FIELDS]
+                )
+
+            for username, tx_list in transactions.items():
+                conn.executemany(
+                    "INSERT OR REPLACE INTO transactions (username, id, type, amount, description, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (username, tx["id"], tx["type"], tx["amount"], tx.get("description", ""), tx["timestamp"])
+                        for tx in tx_list
+                    ]
+                )
+
+        return len(users)
+
+class BinaryStorage(JSONStorage):
+    """
+    Storage backend for high-volume accounts.
+
+    Users and accounts stay in the JSON files, and each user's transactions
+    are appended to a fixed-width binary log in data/binlog/<username>/
+    (see utils.binlog.BinaryTransactionLog). Nothing is replayed at startup:
+    the balance is the last posting's balance_after, totals come from the
+    log header, and since transaction ids are record positions + 1, the
+    newest and oldest pages are sliced from the log by offset. Time ranges
+    are found by bisecting the log's timestamps. Type-filtered and
+    amount-sorted pages fall back to a UserTransactionIndex built from the
+    decoded log the first time they are asked for. Suits single-process installs.
+    """
+
+    name = "binary"
+
+    def __init__(self, data_dir=DATA_DIR, binlog_dir=None):
+        self.users_file = os.path.join(data_dir, "users.json")
+        self.accounts_file = os.path.join(data_dir, "accounts.json")
+        self.binlog_dir = binlog_dir or os.path.join(data_dir, "binlog")
+        self._lock = threading.RLock()
+        self._balances = {}
+        self._indexes = {}
+        self._logs = {}
+
+        # Initialize data files if they don't exist
+        os.makedirs(self.binlog_dir, exist_ok=True)
+        for file_path in [self.users_file, self.accounts_file]:
+            if not os.path.exists(file_path):
+                save_data({}, file_path)
+
+    def _log_dir(self, username):
+        return os.path.join(self.binlog_dir, quote(username, safe=""))
+
+    def _log(self, username, create=False):
+        """
+        Get the user's transaction log, opening it on first use
+        Returns None if the user has no log yet and create is False
+        """
+        log = self._logs.get(username)
+        if log is None:
+            directory = self._log_dir(username)
+            if not create and not os.path.exists(directory):
+                return None
+
+            log = self._logs[username] = BinaryTransactionLog(directory)
+            if len(log):
+                self._balances[username] = log.balance()
+        return log
+
+    @staticmethod
+    def _append(log, transaction, balance_after):
+        """Append a posting, stamping it no earlier than the last one so the log stays time-ordered."""
+        last = log.last_timestamp()
+        if last is not None and to_micros(transaction["timestamp"]) < last:
+            transaction["timestamp"] = from_micros(last)
+        log.append(transaction, balance_after)
+
+    def get_account(self, username):
+        """Get the account of a user or None."""
+        with self._lock:
+            self._log(username)
+        return super().get_account(username)
+
+    def get_transactions(self, username):
+        """Get all transactions of a user in posting order."""
+        with self._lock:
+            log = self._log(username)
+            return log.slice(0, len(log)) if log is not None else []
+
+    def iter_all_transactions(self):
+        """Yield (username, transaction) for every transaction in the ledger."""
+        for name in sorted(os.listdir(self.binlog_dir)):
+            with self._lock:
+                log = self._log(unquote(name))
+                count = len(log)
+
+            # Decode in chunks so the whole ledger is never held in memory
+            for start in range(0, count, 1000):
+                for transaction in log.slice(start, min(start + 1000, count)):
+                    yield unquote(name), transaction
+
+    def get_transactions_page(self, username, cursor=None, limit=20, tx_type=None, sort="newest"):
+        """
+        Get one page of a user's transactions using keyset pagination
+        Returns (transactions, next_cursor); next_cursor is None on the last page
+        """
+        ordering, descending = SORTS[sort]
+
+        with self._lock:
+            log = self._log(username)
+            if log is None:
+                return [], None
+
+            if tx_type is not None or ordering != "time":
+                index = self._indexes.get(username)
+                if index is None:
+                    index = self._indexes[username] = UserTransactionIndex(log.slice(0, len(log)))
+                return index.page(cursor, limit, tx_type, sort)
+
+            # The cursor's id is the position just past the previous page
+            count = len(log)
+            if descending:
+                end = count if cursor is None else cursor[1] - 1
+                start = max(0, end - limit)
+                rows = log.slice(start, end)[::-1]
+                more = start > 0
+            else:
+                start = 0 if cursor is None else cursor[1]
+                rows = log.slice(start, start + limit)
+                more = start + limit < count
+
+        if more and rows:
+            return rows, [rows[-1]["timestamp"], rows[-1]["id"]]
+
+        return rows, None
+
+    def get_transaction_totals(self, username):
+        """Get the total credit and debit amounts of a user."""
+        with self._lock:
+            log = self._log(username)
+            return dict(log.totals) if log is not None else {"credit": 0, "debit": 0}
+
+    def get_range_totals(self, username, start, end):
+        """
+        Get credit and debit totals and counts of a user for start <= timestamp < end
+        """
+        with self._lock:
+            log = self._log(username)
+            if log is None:
+                return {"credit": 0, "debit": 0, "credit_count": 0, "debit_count": 0}
+            return log.range_totals(start, end)
+
+    def add_transaction(self, username, transaction_type, amount, description):
+        """Post a transaction of `amount` paise and update the account balance. Returns the transaction."""
+        with self._lock:
+            log = self._log(username, create=True)
+
+            transaction = {
+                "id": len(log) + 1,
+                "type": transaction_type,
+                "amount": amount,
+                "description": description,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+
+            balance = self._balances.get(username)
+            if balance is None:
+                balance = (load_data(self.accounts_file).get(username) or {}).get("balance", 0)
+            balance = balance + amount if transaction_type == "credit" else balance - amount
+
+            # The log header is the commit point; memory is updated after it
+            self._append(log, transaction, balance)
+
+            self._balances[username] = balance
+            if username in self._indexes:
+                self._indexes[username].add(transaction)
+
+        return transaction
+
+    def import_json(self, json_storage):
+        """
+        Rewrite every user's transaction log from a JSON backend.
+        Users and accounts are read from the JSON backend's files; run this
+        while the app is stopped. Transaction ids become positions in
+        timestamp order, which they already are unless the clock went back.
+        Returns the number of users imported
+        """
+        users = load_data(json_storage.users_file)
+
+        with self._lock:
+            for username in users:
+                account = json_storage.get_account(username) or {}
+
+                # The log is kept in time order, so postings are renumbered in timestamp order
+                tx_list = sorted(json_storage.get_transactions(username), key=lambda tx: (to_micros(tx["timestamp"]), tx["id"]))
+
+                # Walk forward from the opening balance so each posting gets its balance_after
+                balance = account.get("balance", 0) - sum(
+                    tx["amount"] if tx["type"] == "credit" else -tx["amount"] for tx in tx_list
+                )
+
+                log = self._logs.pop(username, None)
+                if log is not None:
+                    log.close()
+                shutil.rmtree(self._log_dir(username), ignore_errors=True)
+
+                log = BinaryTransactionLog(self._log_dir(username), fsync=False)
+                for position, tx in enumerate(tx_list):
+                    balance += tx["amount"] if tx["type"] == "credit" else -tx["amount"]
+                    self._append(log, {
+                        "id": position + 1,
+                        "type": tx["type"],
+                        "amount": tx["amount"],
+                        "description": tx.get("description", ""),
+                        "timestamp": tx["timestamp"]
+                    }, balance)
+                log.close()
+
+                self._balances.pop(username, None)
+                self._indexes.pop(username, None)
+
+        return len(users)
+
+_storage = None
+_storage_lock = threading.Lock()
+
+# Function to get the configured storage backend
+def get_storage():
+    """
+    Get the process-wide storage backend selected by HORIZONITE_STORAGE
+    Returns a JSONStorage, SQLiteStorage or BinaryStorage instance
+    """
+    global _storage
+
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                # Amounts are stored in paise; older installs are converted first
+                ensure_paise()
+
+                if STORAGE_BACKEND == "sqlite":
+                    _storage = SQLiteStorage()
+                elif STORAGE_BACKEND == "binary":
+                    _storage = BinaryStorage()
+                else:
+                    _storage = JSONStorage(journal_dir=JOURNAL_DIR)
+
+    return _storage
+
+if __name__ == "__main__":
+    # python -m utils.storage [sqlite|binary] imports an existing JSON install into that backend
+    target = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+    if target not in ("sqlite", "binary"):
+        sys.exit("Usage: python -m utils.storage [sqlite|binary]")
+
+    ensure_paise()
+    if target == "binary":
+        count = BinaryStorage().import_json(JSONStorage())
+        print(f"Imported {count} users into {BINLOG_DIR}")
+    else:
+        count = SQLiteStorage().import_json(JSONStorage())
+        print(f"Imported {count} users into {SQLITE_FILE}")
@@ -0,0 +1,59 @@
+import os
+import re
+import threading
+import streamlit as st
+
+# Stylesheets live in assets/css/<name>.css
+CSS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "css")
+
+_sheets = {}
+_bundles = {}
+_lock = threading.Lock()
+
+# Function to minify CSS
+def minify_css(css):
+    """
+    Strip comments and redundant whitespace from a stylesheet
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+# Function to load a stylesheet once per process
+def load_stylesheet(name):
+    """
+    Get the minified contents of assets/css/<name>.css, read from disk once per process
+    Raises FileNotFoundError if the stylesheet does not exist
+    """
+    with _lock:
+        css = _sheets.get(name)
+        if css is None:
+            with open(os.path.join(CSS_DIR, f"{name}.css"), 'r') as f:
+                css = _sheets[name] = minify_css(f.read())
+        return css
+
+# Function to build the markup for a set of stylesheets
+def stylesheet_bundle(*names):
+    """
+    Get one <style> element holding the named stylesheets in order,
+    built once per process for each combination
+    """
+    names = tuple(name for name in names if name)
+
+    bundle = _bundles.get(names)
+    if bundle is None:
+        bundle = _bundles[names] = "<style>" + "".join(load_stylesheet(name) for name in names) + "</style>"
+    return bundle
+
+# Function to add stylesheets to the page
+def inject_styles(*names):
+    """
+    Add the named stylesheets to the page as a single element; None entries are skipped.
+
+    Streamlit drops elements that a rerun does not emit again, so this is
+    called on every rerun. Since the bundle is byte-identical between reruns,
+    Streamlit's message cache sends bundles of global.minCachedMessageSize
+    (10 KB) or more to a session once and refers to them by hash afterwards.
+    """
+    st.markdown(stylesheet_bundle(*names), unsafe_allow_html=True)